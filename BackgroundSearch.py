@@ -0,0 +1,150 @@
+from queue import Empty, Queue
+from threading import Thread
+from typing import Tuple, Union
+from OnitamaGame import OnitamaGame
+from Player import Player
+from Turn import Turn
+
+
+class BackgroundSearch:
+    """
+    A BackgroundSearch class that lets an AI player choose its move on a worker
+    thread, so that a GUI can keep handling input while the player thinks. The
+    player searches a copy of the game, made when the search is started, and the
+    chosen Turn is handed back through a queue that is polled without blocking.
+
+    A player can also be left pondering on a worker thread while its opponent
+    thinks, until the search is cancelled when the opponent has moved.
+
+    A search can be cancelled, for example when the game is reset or a move is
+    taken back: the player is asked to stop and whatever it returns is discarded.
+    A new search is only started once the thread of the previous one has ended,
+    so a player is never searched from two threads at once.
+
+    === Attributes ===
+    results: The queue the worker thread puts (search number, Turn or None) into.
+
+    === Private Attributes ===
+    _thread: The worker thread of the last search started, or None.
+    _player: The player of the last search started, or None.
+    _generation: The number of the current search. Results of other searches are stale.
+    _pending: Whether the current search has been started and its result not yet polled.
+    """
+    results: Queue
+    _thread: Union[Thread, None]
+    _player: Union[Player, None]
+    _generation: int
+    _pending: bool
+
+    def __init__(self) -> None:
+        """
+        Initializes a BackgroundSearch with no search running.
+        """
+        self.results = Queue()
+        self._thread = None
+        self._player = None
+        self._generation = 0
+        self._pending = False
+
+    def is_running(self) -> bool:
+        """
+        Returns whether the thread of the last search started, cancelled or not, is still running.
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def is_pending(self) -> bool:
+        """
+        Returns whether a search has been started whose result has not been polled yet.
+        >>> BackgroundSearch().is_pending()
+        False
+        """
+        return self._pending
+
+    def start(self, player: Player, onitama: OnitamaGame) -> bool:
+        """
+        Starts <player> choosing its move in the current position of <onitama> on a
+        worker thread. <player> must have a choose_move method.
+        Returns False without starting if the previous search is still pending or its
+        thread is still running.
+        """
+        return self._start(self._run, player, onitama)
+
+    def ponder(self, player: Player, onitama: OnitamaGame, time_limit: Union[float, None] = None) -> bool:
+        """
+        Starts <player> pondering on the current position of <onitama>, in which it is
+        its opponent's turn, on a worker thread, until cancelled or for at most
+        <time_limit> seconds. <player> must have a ponder method. Pondering has no
+        result; it is pending until cancelled.
+        Returns False without starting if the previous search is still pending or its
+        thread is still running.
+        """
+        return self._start(self._ponder, player, onitama, time_limit)
+
+    def _start(self, target, player: Player, onitama: OnitamaGame, *args) -> bool:
+        """
+        Starts <target> on a worker thread with the search number, <player>, a copy
+        of <onitama> and <args>, unless a search is pending or still running.
+        """
+        if self._pending or self.is_running():
+            return False
+        self._generation += 1
+        self._pending = True
+        self._player = player
+        player.stopped = False
+        game = OnitamaGame.from_state(onitama.get_state())
+        self._thread = Thread(target=target, args=(self._generation, player, game, *args), daemon=True)
+        self._thread.start()
+        return True
+
+    def _run(self, generation: int, player: Player, onitama: OnitamaGame) -> None:
+        """
+        Runs one search on the worker thread and puts its result in the queue.
+        """
+        turn = None
+        try:
+            move = player.choose_move(onitama)
+            if move is not None:
+                turn = Turn(*move, player.player_id)
+        finally:
+            self.results.put((generation, turn))
+
+    def _ponder(self, generation: int, player: Player, onitama: OnitamaGame,
+                time_limit: Union[float, None]) -> None:
+        """
+        Lets a player ponder on the worker thread. Nothing is put in the queue, so
+        the search stays pending until it is cancelled.
+        """
+        player.ponder(onitama, time_limit)
+
+    def poll(self) -> Tuple[bool, Union[Turn, None]]:
+        """
+        Returns whether the current search has finished, and the Turn it chose, or
+        None if it has not finished or there is no legal move. Never blocks.
+        """
+        while self._pending:
+            try:
+                generation, turn = self.results.get_nowait()
+            except Empty:
+                break
+            if generation == self._generation:
+                self._pending = False
+                return True, turn
+        return False, None
+
+    def cancel(self) -> None:
+        """
+        Cancels the current search, if there is one. Its player is asked to stop and
+        its result will be discarded.
+        """
+        if self._pending:
+            self._pending = False
+            self._generation += 1
+            self._player.stopped = True
+
+    def wait(self, timeout: Union[float, None] = None) -> None:
+        """
+        Blocks until the thread of the last search started has ended, or for at most
+        <timeout> seconds.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
@@ -0,0 +1,90 @@
+import time
+import pytest
+from BackgroundSearch import BackgroundSearch
+from OnitamaGame import OnitamaGame
+from PlayerMinimax import PlayerMinimax
+from PlayerMCTS import PlayerMCTS
+from Player import Player, PlayerRandom
+from Pieces import Pieces
+
+
+def wait_for(search: BackgroundSearch, timeout: float = 10.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        finished, turn = search.poll()
+        if finished:
+            return turn
+        time.sleep(0.01)
+    raise AssertionError('search did not finish')
+
+
+@pytest.mark.parametrize('player', [PlayerRandom(Pieces.G1),
+                                    PlayerMinimax(Pieces.G1, time_limit=0.05),
+                                    PlayerMCTS(Pieces.G1, iterations=50, time_limit=None, seed=0)])
+def test_finds_legal_move_without_touching_game(player):
+    onitama = OnitamaGame(5, player, Player(Pieces.G2))
+    state = onitama.get_state()
+    search = BackgroundSearch()
+    assert search.start(player, onitama)
+    assert search.is_pending()
+    turn = wait_for(search)
+    assert not search.is_pending()
+    assert onitama.get_state() == state
+    assert (turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name) in set(onitama.legal_moves())
+    assert turn.player == Pieces.G1
+
+
+@pytest.mark.parametrize('player', [PlayerMinimax(Pieces.G1, time_limit=30.0),
+                                    PlayerMCTS(Pieces.G1, time_limit=30.0, seed=0)])
+def test_stopped_player_returns_at_once(player):
+    onitama = OnitamaGame(7, player, Player(Pieces.G2))
+    player.stopped = True
+    started = time.perf_counter()
+    assert onitama.move(*player.choose_move(onitama))
+    assert time.perf_counter() - started < 5.0
+
+
+def test_cancel_stops_search_and_discards_result():
+    player = PlayerMinimax(Pieces.G1, time_limit=30.0)
+    onitama = OnitamaGame(5, player, Player(Pieces.G2))
+    search = BackgroundSearch()
+    assert search.start(player, onitama)
+    time.sleep(0.05)
+    started = time.perf_counter()
+    search.cancel()
+    search.wait(5.0)
+    assert time.perf_counter() - started < 5.0
+    assert not search.is_running()
+    assert search.poll() == (False, None)
+
+
+def test_start_waits_for_previous_search():
+    player = PlayerMinimax(Pieces.G1, time_limit=30.0)
+    onitama = OnitamaGame(5, player, Player(Pieces.G2))
+    search = BackgroundSearch()
+    assert search.start(player, onitama)
+    assert not search.start(player, onitama)
+    search.cancel()
+    search.wait(5.0)
+    assert search.start(player, onitama)
+    assert not player.stopped
+    search.cancel()
+    search.wait(5.0)
+
+
+def test_ponder_is_pending_until_cancelled():
+    player = PlayerMinimax(Pieces.G2)
+    onitama = OnitamaGame(5, Player(Pieces.G1), player)
+    search = BackgroundSearch()
+    assert search.ponder(player, onitama)
+    time.sleep(0.05)
+    assert search.is_pending() and search.is_running()
+    assert search.poll() == (False, None)
+    search.cancel()
+    search.wait(5.0)
+    assert not search.is_running()
+    assert len(player._tt) > 0
+
+
+if __name__ == "__main__":
+    pytest.main(['BackgroundSearch_Tests.py'])
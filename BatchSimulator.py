@@ -0,0 +1,205 @@
+from typing import List, Tuple, Union
+import numpy as np
+from BitBoard import BitBoard
+from OnitamaGame import OnitamaGame, Move
+from Pieces import Pieces
+from StyleRegistry import StyleRegistry
+
+
+class BatchSimulator:
+    """
+    A BatchSimulator class that plays many independent games of Onitama with
+    uniformly random moves in lockstep, keeping every game in NumPy arrays. Each
+    step computes the legal-move mask of all unfinished games at once from
+    precomputed style destination tables, picks one legal move per game, and
+    makes them all together. It follows the rules of OnitamaGame.move and
+    OnitamaGame.get_winner; a game with no legal move, or that reaches
+    <max_plies>, is a draw.
+
+    A move is indexed by the style's index in OnitamaBoard's order, the origin
+    square (row * size + col) and which of the style's move pairs is used.
+
+    === Attributes ===
+    size: The board size of the games.
+    games: The number of games played at once.
+    max_plies: The number of plies after which a game is a draw.
+    style_names: The names of the styles, in OnitamaBoard's order.
+    board: The token on every square of every game, as 0 for empty and otherwise
+           1 + its index in BitBoard.TOKENS, of shape (games, size * size).
+    owners: The owner of every style of every game, as 0 for the extra style, 1
+            for player1 and 2 for player2, of shape (games, 5).
+    turn: 0 for every game in which it is player1's turn and 1 for player2's.
+    winner: 0 for every game that is drawn or unfinished, 1 if player1 won and 2
+            if player2 won.
+    done: Whether every game is over.
+    plies: The number of plies played in every game.
+
+    === Private Attributes ===
+    _destinations: The destination square of every (player, style, origin, move
+                   pair), or -1 if it is off the board, of shape (2, 5, size * size, 4).
+    _temples: The temple square each player's grandmaster must reach to win.
+    _rng: The random number generator used to pick moves.
+    """
+    size: int
+    games: int
+    max_plies: int
+    style_names: List[str]
+    board: np.ndarray
+    owners: np.ndarray
+    turn: np.ndarray
+    winner: np.ndarray
+    done: np.ndarray
+    plies: np.ndarray
+    _destinations: np.ndarray
+    _temples: np.ndarray
+    _rng: np.random.Generator
+
+    def __init__(self, size: int = 5, games: int = 1024, max_plies: int = 300,
+                 seed: Union[int, None] = None) -> None:
+        """
+        Initializes <games> games of the given <size> in the starting position.
+        """
+        self.size = size
+        self.games = games
+        self.max_plies = max_plies
+        self._rng = np.random.default_rng(seed)
+        onitama = OnitamaGame(size)
+        styles = onitama.get_styles()
+        self.style_names = [style.name for style in styles]
+        squares = size * size
+        pairs = max(len(style.get_moves()) for style in styles)
+        self._destinations = np.full((2, len(styles), squares, pairs), -1, dtype=np.int16)
+        for player, flipped in ((0, True), (1, False)):
+            for index, style in enumerate(styles):
+                table = StyleRegistry.get_destinations(style, flipped, size)
+                for origin, dests in enumerate(table):
+                    for pair, (row_d, col_d) in enumerate(dests):
+                        self._destinations[player, index, origin, pair] = row_d * size + col_d
+        self._temples = np.array([(size - 1) * size + size // 2, size // 2])
+        self.reset(onitama.get_state())
+
+    def reset(self, state: Union[Tuple, None] = None) -> None:
+        """
+        Puts every game in the position of <state>, as returned by
+        OnitamaGame.get_state, or in the starting position if it is None.
+        """
+        if state is None:
+            state = OnitamaGame(self.size).get_state()
+        squares = self.size * self.size
+        start = np.zeros(squares, dtype=np.int8)
+        for code, mask in enumerate(state[3], 1):
+            for square in range(squares):
+                if mask >> square & 1:
+                    start[square] = code
+        owners = [0 if owner == Pieces.EMPTY else 1 if owner == state[1] else 2 for owner in state[4]]
+        self.board = np.tile(start, (self.games, 1))
+        self.owners = np.tile(np.array(owners, dtype=np.int8), (self.games, 1))
+        self.turn = np.full(self.games, 0 if state[5] == state[1] else 1, dtype=np.int8)
+        self.winner = np.zeros(self.games, dtype=np.int8)
+        self.done = np.zeros(self.games, dtype=bool)
+        self.plies = np.zeros(self.games, dtype=np.int32)
+
+    def legal_mask(self, games: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns the legal-move mask of the given <games>, of shape
+        (len(games), 5, size * size, 4), and the destination of every move.
+        """
+        turn = self.turn[games].astype(np.intp)
+        board = self.board[games]
+        own_code = (1 + 2 * turn)[:, None]
+        own = (board == own_code) | (board == own_code + 1)
+        dest = self._destinations[turn]
+        on_board = dest >= 0
+        count = len(games)
+        blocked = np.take_along_axis(own, np.where(on_board, dest, 0).reshape(count, -1),
+                                     axis=1).reshape(dest.shape)
+        styles = self.owners[games] == (turn + 1)[:, None].astype(np.int8)
+        legal = on_board & ~blocked & styles[:, :, None, None] & own[:, None, :, None]
+        return legal, dest
+
+    def step(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Makes one uniformly random legal move in every unfinished game, and ends the
+        games that have no legal move, are won or reach the ply limit. Returns the
+        games that moved and, for each, the index of the style used and the origin
+        and destination squares.
+        """
+        games = np.flatnonzero(~self.done)
+        empty = np.zeros(0, dtype=np.intp)
+        if len(games) == 0:
+            return empty, empty, empty, empty
+        legal, dest = self.legal_mask(games)
+        flat = legal.reshape(len(games), -1)
+        stuck = ~flat.any(axis=1)
+        self.done[games[stuck]] = True
+        keys = self._rng.random(flat.shape)
+        keys[~flat] = -1.0
+        choice = keys.argmax(axis=1)[~stuck]
+        moving = games[~stuck]
+        dest = dest[~stuck].reshape(len(moving), -1)
+        style, origin, _ = np.unravel_index(choice, legal.shape[1:])
+        target = dest[np.arange(len(moving)), choice].astype(np.intp)
+
+        turn = self.turn[moving].astype(np.intp)
+        piece = self.board[moving, origin]
+        captured = self.board[moving, target]
+        self.board[moving, target] = piece
+        self.board[moving, origin] = 0
+        extra = (self.owners[moving] == 0).argmax(axis=1)
+        self.owners[moving, style] = 0
+        self.owners[moving, extra] = turn + 1
+
+        grandmaster = 2 + 2 * turn
+        opponent_grandmaster = 4 - 2 * turn
+        won = (captured == opponent_grandmaster) | ((piece == grandmaster) & (target == self._temples[turn]))
+        self.winner[moving[won]] = turn[won] + 1
+        self.turn[moving] = 1 - turn
+        self.plies[moving] += 1
+        self.done[moving[won | (self.plies[moving] >= self.max_plies)]] = True
+        return moving, style, origin, target
+
+    def run(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Plays every game to the end, and returns the winner and the number of
+        plies of every game.
+        >>> winner, plies = BatchSimulator(5, 100, seed=0).run()
+        >>> bool(((winner >= 0) & (winner <= 2)).all() and (plies > 0).all())
+        True
+        """
+        while not self.done.all():
+            self.step()
+        return self.winner, self.plies
+
+    def to_move(self, style: int, origin: int, target: int) -> Move:
+        """
+        Returns the move of the given style index, origin and destination squares as
+        a tuple that can be passed to OnitamaGame.move.
+        >>> BatchSimulator(5, 1).to_move(0, 2, 7)
+        (0, 2, 1, 2, 'crab')
+        """
+        return (*divmod(int(origin), self.size), *divmod(int(target), self.size), self.style_names[int(style)])
+
+    def legal_moves(self, game: int) -> List[Move]:
+        """
+        Returns the legal moves of one <game>, as tuples that can be passed to
+        OnitamaGame.move.
+        >>> len(BatchSimulator(5, 1).legal_moves(0))
+        10
+        """
+        if self.done[game]:
+            return []
+        legal, dest = self.legal_mask(np.array([game]))
+        return [self.to_move(style, origin, dest[0, style, origin, pair])
+                for style, origin, pair in zip(*np.nonzero(legal[0]))]
+
+    def get_state(self, game: int) -> Tuple:
+        """
+        Returns the position of one <game> in the format of OnitamaGame.get_state.
+        >>> BatchSimulator(7, 2).get_state(1) == OnitamaGame(7).get_state()
+        True
+        """
+        masks = tuple(sum(1 << int(square) for square in np.flatnonzero(self.board[game] == code))
+                      for code in range(1, len(BitBoard.TOKENS) + 1))
+        owners = tuple((Pieces.EMPTY, Pieces.G1, Pieces.G2)[code] for code in self.owners[game])
+        return (self.size, Pieces.G1, Pieces.G2, masks, owners,
+                Pieces.G1 if self.turn[game] == 0 else Pieces.G2)
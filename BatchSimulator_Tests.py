@@ -0,0 +1,47 @@
+import pytest
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+from Player import Player
+
+np = pytest.importorskip('numpy')
+from BatchSimulator import BatchSimulator  # noqa: E402
+
+
+@pytest.mark.parametrize('size', [5, 7])
+def test_matches_scalar_rules(size):
+    simulator = BatchSimulator(size, 64, max_plies=120, seed=size)
+    games = [OnitamaGame(size, Player(Pieces.G1), Player(Pieces.G2)) for _ in range(simulator.games)]
+    while not simulator.done.all():
+        for index in np.flatnonzero(~simulator.done):
+            assert sorted(simulator.legal_moves(index)) == sorted(games[index].legal_moves())
+        moving, style, origin, target = simulator.step()
+        for index, s, o, t in zip(moving, style, origin, target):
+            onitama = games[index]
+            assert onitama.move(*simulator.to_move(s, o, t))
+            assert simulator.get_state(index) == onitama.get_state()
+    for index, onitama in enumerate(games):
+        winner = onitama.get_winner()
+        expected = 0 if winner is None else 1 if winner is onitama.player1 else 2
+        assert simulator.winner[index] == expected
+        assert simulator.plies[index] == len(onitama.onitama_stack)
+        if winner is None:
+            assert simulator.plies[index] == 120 or not list(onitama.legal_moves())
+
+
+def test_reset_from_state():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    onitama.set_board(5, [[' ', ' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ', ' '],
+                          [' ', ' ', 'X', ' ', ' '], [' ', ' ', 'Y', ' ', ' ']])
+    simulator = BatchSimulator(5, 8, seed=0)
+    simulator.reset(onitama.get_state())
+    assert simulator.get_state(3) == onitama.get_state()
+    simulator.step()
+    # X wins by capturing Y on its temple square, and every other move goes on.
+    won = simulator.board[:, 4 * 5 + 2] == 2
+    assert won.any() and not won.all()
+    assert (simulator.winner[won] == 1).all() and simulator.done[won].all()
+    assert (simulator.winner[~won] == 0).all() and not simulator.done[~won].any()
+
+
+if __name__ == "__main__":
+    pytest.main(['BatchSimulator_Tests.py'])
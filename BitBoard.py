@@ -0,0 +1,190 @@
+from typing import Dict, Iterator, List, Set, Tuple, Union
+from Pieces import Pieces
+
+
+class BitBoard:
+    """
+    A BitBoard class storing the tokens of an Onitama board as one integer
+    occupancy mask per piece type. The square at (row, col) is represented
+    by bit number row * size + col of each mask.
+
+    === Attributes ===
+    size : A board's width and height.
+    masks : A mapping from each piece token to the mask of squares it occupies.
+    positions : A mapping from each player's lowercase token to the set of (row, col)
+                squares occupied by that player's monks and grandmaster.
+
+    === Representation Invariants ===
+    - Size is always an odd number greater or equal to 5.
+    - No bit is set in more than one mask.
+    - positions[p] holds exactly the set bits of masks[p] | masks[p.upper()].
+    """
+    TOKENS: Tuple[str, str, str, str] = (Pieces.M1, Pieces.G1, Pieces.M2, Pieces.G2)
+    size: int
+    masks: Dict[str, int]
+    positions: Dict[str, Set[Tuple[int, int]]]
+
+    def __init__(self, size: int, board: Union[List[List[str]], None] = None) -> None:
+        """
+        Constructs an empty BitBoard of the given <size>, filled from <board> if given.
+        >>> b = BitBoard(5, [['x', 'x', 'X', 'x', 'x'], [' '] * 5, [' '] * 5,\
+         [' '] * 5, ['y', 'y', 'Y', 'y', 'y']])
+        >>> b.masks[Pieces.G1]
+        4
+        >>> b.masks[Pieces.M2] == 0b11011 << 20
+        True
+        """
+        self.size = size
+        self.masks = {token: 0 for token in self.TOKENS}
+        self.positions = {Pieces.M1: set(), Pieces.M2: set()}
+        if board is not None:
+            self.set_board(board)
+
+    def bit(self, row: int, col: int) -> int:
+        """
+        Returns the single-bit mask of the square at <row> <col>.
+
+        Precondition: <row> and <col> must be on the board.
+        >>> BitBoard(5).bit(1, 2)
+        128
+        """
+        return 1 << (row * self.size + col)
+
+    def get_token(self, row: int, col: int) -> str:
+        """
+        Returns the token at <row> <col>, or the empty character if there is none.
+
+        Precondition: <row> and <col> must be on the board.
+        >>> b = BitBoard(5)
+        >>> b.set_token(3, 1, Pieces.M2)
+        >>> b.get_token(3, 1)
+        'y'
+        >>> b.get_token(3, 2)
+        ' '
+        """
+        bit = self.bit(row, col)
+        for token in self.TOKENS:
+            if self.masks[token] & bit:
+                return token
+        return Pieces.EMPTY
+
+    def set_token(self, row: int, col: int, token: str) -> None:
+        """
+        Sets the square at <row> <col> to <token>. Any token other than the four
+        piece tokens leaves the square empty.
+
+        Precondition: <row> and <col> must be on the board.
+        >>> b = BitBoard(5)
+        >>> b.set_token(0, 0, Pieces.G1)
+        >>> b.set_token(0, 0, Pieces.M2)
+        >>> b.masks[Pieces.G1], b.masks[Pieces.M2]
+        (0, 1)
+        >>> b.positions[Pieces.M1], b.positions[Pieces.M2]
+        (set(), {(0, 0)})
+        """
+        bit = self.bit(row, col)
+        for key in self.TOKENS:
+            if self.masks[key] & bit:
+                self.masks[key] ^= bit
+                self.positions[key.lower()].discard((row, col))
+        if token in self.masks:
+            self.masks[token] |= bit
+            self.positions[token.lower()].add((row, col))
+
+    def player_mask(self, player_id: str) -> int:
+        """
+        Returns the mask of all squares occupied by the player with <player_id>,
+        i.e. by its grandmaster and its monks.
+        >>> b = BitBoard(5)
+        >>> b.set_token(0, 0, Pieces.M1)
+        >>> b.set_token(0, 2, Pieces.G1)
+        >>> b.set_token(4, 4, Pieces.M2)
+        >>> b.player_mask(Pieces.G1)
+        5
+        >>> b.player_mask('random')
+        0
+        """
+        return self.masks.get(player_id.upper(), 0) | self.masks.get(player_id.lower(), 0)
+
+    def player_positions(self, player_id: str) -> Set[Tuple[int, int]]:
+        """
+        Returns the set of squares occupied by the player with <player_id>. This is
+        the set kept up to date by set_token, so callers must not modify it.
+        >>> b = BitBoard(5)
+        >>> b.set_token(0, 2, Pieces.G1)
+        >>> b.player_positions(Pieces.G1)
+        {(0, 2)}
+        >>> b.player_positions('random')
+        set()
+        """
+        return self.positions.get(player_id.lower(), set())
+
+    def occupied(self) -> int:
+        """
+        Returns the mask of all occupied squares.
+        """
+        mask = 0
+        for token in self.TOKENS:
+            mask |= self.masks[token]
+        return mask
+
+    def squares(self, mask: int) -> Iterator[Tuple[int, int]]:
+        """
+        Yields the (row, col) of every set bit of <mask>, in row-major order.
+        >>> list(BitBoard(5).squares(0b100001 << 5))
+        [(1, 0), (2, 0)]
+        """
+        while mask:
+            low = mask & -mask
+            yield divmod(low.bit_length() - 1, self.size)
+            mask ^= low
+
+    def set_board(self, board: List[List[str]]) -> None:
+        """
+        Replaces the contents of this BitBoard with the tokens in <board>.
+        """
+        masks = {token: 0 for token in self.TOKENS}
+        positions = {Pieces.M1: set(), Pieces.M2: set()}
+        for i, row in enumerate(board):
+            for j, token in enumerate(row):
+                if token in masks:
+                    masks[token] |= 1 << (i * self.size + j)
+                    positions[token.lower()].add((i, j))
+        self.masks = masks
+        self.positions = positions
+
+    def set_masks(self, masks: Dict[str, int]) -> None:
+        """
+        Replaces the contents of this BitBoard with the given per-token <masks>.
+        >>> b = BitBoard(5)
+        >>> b.set_masks({Pieces.M1: 0b11, Pieces.G1: 0, Pieces.M2: 0, Pieces.G2: 1 << 24})
+        >>> b.get_token(0, 1), b.get_token(4, 4)
+        ('x', 'Y')
+        """
+        self.masks = {token: masks.get(token, 0) for token in self.TOKENS}
+        self.positions = {Pieces.M1: set(), Pieces.M2: set()}
+        for token in self.TOKENS:
+            self.positions[token.lower()].update(self.squares(self.masks[token]))
+
+    def to_list(self) -> List[List[str]]:
+        """
+        Returns this BitBoard as a nested list of tokens.
+        >>> b = BitBoard(5)
+        >>> b.set_token(4, 2, Pieces.G2)
+        >>> b.to_list()[4]
+        [' ', ' ', 'Y', ' ', ' ']
+        """
+        board = [[Pieces.EMPTY] * self.size for _ in range(self.size)]
+        for token in self.TOKENS:
+            for row, col in self.squares(self.masks[token]):
+                board[row][col] = token
+        return board
+
+    def copy(self) -> 'BitBoard':
+        """
+        Returns a copy of this BitBoard.
+        """
+        other = BitBoard(self.size)
+        other.masks = self.masks.copy()
+        other.positions = {key: squares.copy() for key, squares in self.positions.items()}
+        return other
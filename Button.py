@@ -7,13 +7,15 @@ from pygame.locals import (
 from OnitamaGame import OnitamaGame
 from Entity import Entity
 
-from typing import Tuple
+from typing import Dict, Tuple
 
 
 class Button(Entity):
     """
     A class to represent a button in Pygame.
     """
+    # Contains the rendered image of this button for each color it has been drawn in.
+    images: Dict[Tuple[int, int, int, int], pygame.Surface]
 
     def __init__(self, screen: pygame.Surface, onitama: OnitamaGame, offset_x: int, offset_y: int, text: str):
         """
@@ -30,27 +32,28 @@ class Button(Entity):
         self.size = self.text_rect.get_size()
         self.color = (255, 255, 255, 100)
         self.highlighted = False
+        self.images = {}
 
     def draw_text(self, color: Tuple[int, int, int, int]) -> None:
         """
         Draw the text on the surface of the button.
+        The image for each color is rendered once and reused.
         """
-        self.img = pygame.Surface((self.width, self.height))
-        self.img.fill(color, special_flags=BLEND_ADD)
-        self.img.blit(self.text_rect, ((self.width -
-                                        self.size[0]) // 2, (self.height - self.size[1]) // 2))
+        self.img = self.images.get(color)
+        if self.img is None:
+            self.img = pygame.Surface((self.width, self.height))
+            self.img.fill(color, special_flags=BLEND_ADD)
+            self.img.blit(self.text_rect, ((self.width -
+                                            self.size[0]) // 2, (self.height - self.size[1]) // 2))
+            self.images[color] = self.img
 
         self.img_rect = self.screen.blit(self.img, self.rect)
 
-    def hover(self, mouse_pos: Tuple[int, int]):
-        if self.img_rect and self.img_rect.collidepoint(mouse_pos):
-            self.draw_text(self.HIGHLIGHTED_COLOR)
-            return True
-        return False
-
     def draw(self):
-        # Highlight the button green if it iss selected.
-        if self.highlighted:
+        # Highlight the button blue if it is hovered and green if it is selected.
+        if self.hovered:
+            self.draw_text(self.HIGHLIGHTED_COLOR)
+        elif self.highlighted:
             self.draw_text(self.COLOR_VALID)
         else:
             self.draw_text(self.color)
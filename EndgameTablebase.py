@@ -0,0 +1,206 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Union
+from OnitamaGame import Move
+
+
+class EndgameTablebase:
+    """
+    An EndgameTablebase class holding the solved value of every position of one
+    board size in which neither player has more than <max_pieces> tokens, under
+    the standard five styles. A value is the number of plies to the end of the game
+    with perfect play: positive if the player to move wins, negative if they lose,
+    and 0 if the game is drawn.
+
+    A tablebase is stored on disk as a 16 byte header (the magic bytes b'ONTB', the
+    format version, the board size, <max_pieces> and the number of entries), then
+    the sorted position hashes as little-endian unsigned 64-bit integers, then the
+    values as little-endian signed 16-bit integers in the same order. The file is
+    memory-mapped rather than read, so only the pages touched by lookups are loaded
+    and the pages are shared between processes.
+
+    === Attributes ===
+    path: The file this tablebase was opened from, or None if it was built in memory.
+    size: The board size the tablebase was built for.
+    max_pieces: The most tokens, grandmaster included, either player may have.
+
+    === Private Attributes ===
+    _mmap: The memory-mapped file, or None if the tablebase is held in memory.
+    _keys: The sorted position hashes.
+    _values: The value of the position at the same index of <_keys>.
+    """
+    MAGIC: bytes = b'ONTB'
+    VERSION: int = 1
+    HEADER: struct.Struct = struct.Struct('<4sBBBxI4x')
+    path: Union[str, None]
+    size: int
+    max_pieces: int
+    _mmap: Union[mmap.mmap, None]
+    _keys: Union[array, memoryview]
+    _values: Union[array, memoryview]
+
+    def __init__(self, size: int, max_pieces: int, entries: Dict[int, int]) -> None:
+        """
+        Initializes an in-memory tablebase for boards of <size> from <entries>
+        mapping position hashes to values.
+        >>> tb = EndgameTablebase(5, 1, {9: -2, 4: 1})
+        >>> len(tb), tb.get(4), tb.get(9), tb.get(5)
+        (2, 1, -2, None)
+        """
+        self.path = None
+        self.size = size
+        self.max_pieces = max_pieces
+        self._mmap = None
+        keys = sorted(entries)
+        self._keys = array('Q', keys)
+        self._values = array('h', [entries[key] for key in keys])
+
+    def __len__(self) -> int:
+        """
+        Returns the number of positions in this tablebase.
+        """
+        return len(self._keys)
+
+    def get(self, key: int) -> Union[int, None]:
+        """
+        Returns the value stored for the position hash <key>, or None if the
+        position is not in this tablebase.
+        """
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return self._values[index]
+        return None
+
+    def covers(self, onitama) -> bool:
+        """
+        Returns whether the current position of <onitama> has few enough tokens to
+        be in this tablebase.
+        """
+        return (onitama.size == self.size
+                and len(onitama.get_positions(onitama.player1.player_id)) <= self.max_pieces
+                and len(onitama.get_positions(onitama.player2.player_id)) <= self.max_pieces)
+
+    def probe(self, onitama) -> Union[int, None]:
+        """
+        Returns the value of the current position of <onitama> for the player whose
+        turn it is, or None if the position is not in this tablebase.
+        """
+        if not self.covers(onitama):
+            return None
+        return self.get(onitama.get_hash())
+
+    def best_move(self, onitama) -> Union[Move, None]:
+        """
+        Returns a move of perfect play in the current position of <onitama>: the
+        quickest win, the slowest loss, or a move that keeps the draw. Returns None
+        if the position is not in this tablebase or there is no legal move.
+        """
+        value = self.probe(onitama)
+        if value is None:
+            return None
+        best = None
+        best_score = None
+        mover = onitama.whose_turn.player_id
+        for move in list(onitama.legal_moves()):
+            onitama.move(*move)
+            winner = onitama.get_winner()
+            child = None if winner is not None else self.get(onitama.get_hash())
+            onitama.undo()
+            if winner is not None:
+                if winner.player_id == mover:
+                    return move
+                continue
+            if child is None:
+                continue
+            # The child's value is for the opponent, so a win for the opponent is a
+            # loss for the mover, and a later end of the game is preferred when losing.
+            if child > 0:
+                score = -(1 << 16) + child
+            elif child < 0:
+                score = (1 << 16) + child
+            else:
+                score = 0
+            if best_score is None or score > best_score:
+                best, best_score = move, score
+        return best
+
+    def save(self, path: str) -> None:
+        """
+        Writes this tablebase to the file at <path>.
+        """
+        keys = array('Q', self._keys)
+        values = array('h', self._values)
+        if sys.byteorder == 'big':
+            keys.byteswap()
+            values.byteswap()
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.size, self.max_pieces, len(keys)))
+            f.write(keys.tobytes())
+            f.write(values.tobytes())
+
+    @classmethod
+    def open(cls, path: str) -> 'EndgameTablebase':
+        """
+        Returns the tablebase stored in the file at <path>, memory-mapped.
+        Raises ValueError if the file is not a tablebase of this format.
+        """
+        with open(path, 'rb') as f:
+            header = f.read(cls.HEADER.size)
+            if len(header) < cls.HEADER.size:
+                raise ValueError(f'{path} is not an endgame tablebase')
+            magic, version, size, max_pieces, count = cls.HEADER.unpack(header)
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(f'{path} is not an endgame tablebase of version {cls.VERSION}')
+            start = cls.HEADER.size
+            middle = start + 8 * count
+            f.seek(0, 2)
+            if f.tell() != middle + 2 * count:
+                raise ValueError(f'{path} is truncated')
+            tablebase = cls(size, max_pieces, {})
+            tablebase.path = path
+            if count == 0:
+                return tablebase
+            if sys.byteorder == 'big':
+                # The file is little-endian, so it must be read and swapped.
+                f.seek(start)
+                tablebase._keys.fromfile(f, count)
+                tablebase._values.fromfile(f, count)
+                tablebase._keys.byteswap()
+                tablebase._values.byteswap()
+                return tablebase
+            tablebase._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(tablebase._mmap)
+        tablebase._keys = view[start:middle].cast('Q')
+        tablebase._values = view[middle:].cast('h')
+        view.release()
+        return tablebase
+
+    @classmethod
+    def open_if_exists(cls, path: str) -> Union['EndgameTablebase', None]:
+        """
+        Returns the tablebase stored at <path>, or None if there is no readable
+        tablebase there.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls.open(path)
+        except (OSError, ValueError):
+            return None
+
+    def close(self) -> None:
+        """
+        Unmaps the file of this tablebase, if it is mapped. The tablebase is empty
+        afterwards.
+        """
+        if self._mmap is not None:
+            self._keys.release()
+            self._values.release()
+            self._mmap.close()
+            self._mmap = None
+        self._keys = array('Q')
+        self._values = array('h')
@@ -0,0 +1,118 @@
+import random
+import pytest
+from EndgameTablebase import EndgameTablebase
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+from Player import Player
+from PlayerMinimax import PlayerMinimax
+from build_tablebase import build, deals, placements
+
+
+@pytest.fixture(scope='module')
+def tablebase():
+    return build(5, 1)
+
+
+def sample_states(count: int, seed: int):
+    rng = random.Random(seed)
+    masks = list(placements(5, 1))
+    owners = list(deals())
+    states = []
+    while len(states) < count:
+        state = (5, Pieces.G1, Pieces.G2, rng.choice(masks), rng.choice(owners), rng.choice((Pieces.G1, Pieces.G2)))
+        if OnitamaGame.from_state(state).get_winner() is None:
+            states.append(state)
+    return states
+
+
+def exact_value(onitama, depth: int):
+    """
+    Returns the number of plies to the end of the game with perfect play, positive
+    if the player to move wins, or None if that is more than <depth> plies away.
+    """
+    mover = onitama.whose_turn.player_id
+    moves = list(onitama.legal_moves())
+    for move in moves:
+        onitama.move(*move)
+        winner = onitama.get_winner()
+        onitama.undo()
+        if winner is not None and winner.player_id == mover:
+            return 1
+    if depth <= 1:
+        return None
+    best_win = None
+    slowest_loss = 0
+    for move in moves:
+        onitama.move(*move)
+        child = exact_value(onitama, depth - 1)
+        onitama.undo()
+        if child is None:
+            slowest_loss = None
+        elif child < 0 and (best_win is None or 1 - child < best_win):
+            best_win = 1 - child
+        elif child > 0 and slowest_loss is not None:
+            slowest_loss = max(slowest_loss, child)
+    if best_win is not None:
+        return best_win
+    if slowest_loss:
+        return -(slowest_loss + 1)
+    return None
+
+
+def test_values_match_search(tablebase):
+    for state in sample_states(150, 0):
+        onitama = OnitamaGame.from_state(state)
+        value = tablebase.probe(onitama)
+        expected = exact_value(onitama, 4)
+        if expected is None:
+            assert value == 0 or abs(value) > 4
+        else:
+            assert value == expected
+
+
+def test_best_move_is_perfect(tablebase):
+    for state in sample_states(100, 1):
+        onitama = OnitamaGame.from_state(state)
+        value = tablebase.probe(onitama)
+        move = tablebase.best_move(onitama)
+        assert onitama.move(*move)
+        if value == 1:
+            assert onitama.get_winner().player_id == state[5]
+        elif value > 0:
+            assert tablebase.probe(onitama) == -(value - 1)
+        elif value < 0:
+            assert tablebase.probe(onitama) == -value - 1
+
+
+def test_open_memory_maps_saved_file(tablebase, tmp_path):
+    path = str(tmp_path / 'tablebase.bin')
+    tablebase.save(path)
+    opened = EndgameTablebase.open(path)
+    assert (opened.size, opened.max_pieces, len(opened)) == (5, 1, len(tablebase))
+    for state in sample_states(50, 2):
+        onitama = OnitamaGame.from_state(state)
+        assert opened.probe(onitama) == tablebase.probe(onitama)
+    opened.close()
+    assert len(opened) == 0
+    assert EndgameTablebase.open_if_exists(str(tmp_path / 'missing.bin')) is None
+
+
+def test_positions_not_covered(tablebase):
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    assert tablebase.probe(onitama) is None
+    assert tablebase.best_move(onitama) is None
+
+
+def test_player_plays_from_tablebase(tablebase):
+    state = next(state for state in sample_states(100, 3)
+                 if tablebase.probe(OnitamaGame.from_state(state)) == 3)
+    onitama = OnitamaGame.from_state(state)
+    player = PlayerMinimax(onitama.whose_turn.player_id, time_limit=0.0, tablebase=tablebase)
+    onitama.move(*player.choose_move(onitama))
+    onitama.move(*tablebase.best_move(onitama))
+    onitama.move(*player.choose_move(onitama))
+    assert onitama.get_winner().player_id == player.player_id
+
+
+if __name__ == "__main__":
+    pytest.main(['EndgameTablebase_Tests.py'])
@@ -1,7 +1,4 @@
 import pygame
-from pygame.locals import (
-    BLEND_MULT,
-)
 
 from OnitamaGame import OnitamaGame
 from typing import Tuple, Union
@@ -10,6 +7,8 @@ from typing import Tuple, Union
 class Entity:
     """
     An entity to be drawn upon the pygame Screen and rendered onto the GUI.
+    An entity is only redrawn when its appearance has changed since it was last
+    drawn, so the Screen only has to update the areas of the display that changed.
     """
     # Color constants
     COLOR_INVALID: Tuple[int, int, int, int] = (200, 0, 0, 100)
@@ -25,6 +24,8 @@ class Entity:
     img: Union[None, pygame.Surface]
     clicked: bool
     highlighted: bool
+    hovered: bool
+    _drawn: Union[None, Tuple]
 
     def __init__(self, screen: pygame.Surface, onitama: OnitamaGame, width: int = 100, height: int = 100, offset_x: int = 0, offset_y: int = 0):
         """
@@ -40,17 +41,17 @@ class Entity:
         self.img = None
         self.clicked = False
         self.highlighted = False
+        self.hovered = False
+        self._drawn = None
 
     def hover(self, mouse_pos: Tuple[int, int]):
         """
         Check if the mouse position is hovering over this entity.
+        The hovered attribute is updated accordingly and the hover tint
+        is applied the next time this entity is drawn.
         """
-        if self.img_rect and self.img_rect.collidepoint(mouse_pos):
-            color = self.COLOR_VALID
-            self.img.fill(color, special_flags=BLEND_MULT)
-            self.img_rect = self.screen.blit(self.img, self.rect)
-            return True
-        return False
+        self.hovered = bool(self.img_rect and self.img_rect.collidepoint(mouse_pos))
+        return self.hovered
 
     def set_highlight(self, highlighted):
         """
@@ -71,6 +72,37 @@ class Entity:
             mouse_pos) and not self.clicked
         return self.clicked
 
+    def get_area(self) -> Tuple[int, int, int, int]:
+        """
+        Returns the (x, y, width, height) area of the screen this entity covers.
+        """
+        return (*self.rect, self.width, self.height)
+
+    def appearance(self) -> Tuple:
+        """
+        Returns everything the image of this entity depends on.
+        Subclasses extend it with the game state they display.
+        """
+        return (self.clicked, self.highlighted, self.hovered)
+
+    def set_dirty(self) -> None:
+        """
+        Forces this entity to be redrawn on the next call to redraw.
+        """
+        self._drawn = None
+
+    def redraw(self) -> Union[None, pygame.Rect]:
+        """
+        Draw this entity on the screen if its appearance has changed since it was last drawn.
+        Returns the area of the screen that was drawn, or None if nothing was drawn.
+        """
+        appearance = self.appearance()
+        if appearance == self._drawn:
+            return None
+        self.draw()
+        self._drawn = appearance
+        return self.img_rect
+
     def draw(self):
         """
         Draw this entity on the screen.
@@ -0,0 +1,258 @@
+from typing import Dict, List, Tuple
+from MoveRecord import MoveRecord
+from Pieces import Pieces
+from StyleRegistry import StyleRegistry
+
+
+class Evaluator:
+    """
+    An Evaluator class giving a static score to Onitama positions for search
+    players. The score, from player1's point of view, is made of:
+        material: <material> for every monk.
+        temple distance: <temple> for every step, in rows plus columns, that a
+                         grandmaster is closer to the opponent's temple square.
+        piece-square: <advance> for every row a monk has advanced.
+        mobility: <mobility> for every square a player's tokens can reach with the
+                  player's styles, counted from the style tables and ignoring
+                  blocking tokens.
+    Material, temple distance and piece-square terms are combined into one table
+    per token type, generated once per board size and set of weights.
+
+    An Evaluator attached to a game listens to its moves and undos and keeps the
+    table part of the score up to date incrementally, so evaluating a position in
+    a search only adds the mobility term. If the game is changed in another way,
+    such as by set_board, the score is recomputed on the next evaluation, or on the
+    next move or undo, whichever comes first.
+
+    === Attributes ===
+    material: The value of a monk.
+    temple: The value of each step of a grandmaster towards the opponent's temple.
+    advance: The value of each row a monk has advanced.
+    mobility: The value of each square a player's tokens can reach.
+
+    === Private Attributes ===
+    _tables: A cache of the value of every token on every square, indexed by
+             row * size + col, keyed by the board size and the weights.
+    _onitama: The game this evaluator is attached to, or None.
+    _values: The value tables for the size of the attached game.
+    _reach: The number of squares each (style name, player ID) reaches from every
+            square of the attached game's board.
+    _score: The table part of the score of the attached game's position.
+    _hash: The hash of the position <_score> belongs to.
+    _size: The board size the tables were built for.
+    _stack: The move history of the attached game when the score was computed,
+            which set_board and set_state replace.
+    """
+    _tables: Dict[Tuple[int, int, int, int], Dict[str, List[int]]] = {}
+    material: int
+    temple: int
+    advance: int
+    mobility: int
+    _onitama: object
+    _values: Dict[str, List[int]]
+    _reach: Dict[Tuple[str, str], List[int]]
+    _score: int
+    _hash: int
+    _size: int
+    _stack: object
+
+    def __init__(self, material: int = 100, temple: int = 10, advance: int = 2, mobility: int = 1) -> None:
+        """
+        Initializes an Evaluator with the given weights.
+        """
+        self.material = material
+        self.temple = temple
+        self.advance = advance
+        self.mobility = mobility
+        self._onitama = None
+        self._values = {}
+        self._reach = {}
+        self._score = 0
+        self._hash = 0
+        self._size = 0
+        self._stack = None
+
+    def __getstate__(self) -> Dict:
+        """
+        Returns the weights of this evaluator, for pickling it detached.
+        """
+        return {'material': self.material, 'temple': self.temple, 'advance': self.advance,
+                'mobility': self.mobility}
+
+    def __setstate__(self, state: Dict) -> None:
+        """
+        Initializes a detached evaluator with the weights in <state>.
+        """
+        self.__init__(**state)
+
+    def get_tables(self, size: int) -> Dict[str, List[int]]:
+        """
+        Returns the value of every token on every square of a board of <size>, from
+        player1's point of view, indexed by row * size + col. The tables are shared
+        and must not be changed.
+        >>> tables = Evaluator().get_tables(5)
+        >>> tables[Pieces.M1][0], tables[Pieces.M1][4 * 5], tables[Pieces.M2][4 * 5]
+        (100, 108, -100)
+        >>> tables[Pieces.G1][0 * 5 + 2], tables[Pieces.G1][4 * 5 + 2], tables[Pieces.G2][0 * 5 + 2]
+        (-40, 0, 0)
+        >>> tables is Evaluator().get_tables(5)
+        True
+        """
+        key = (size, self.material, self.temple, self.advance)
+        tables = self._tables.get(key)
+        if tables is None:
+            mid = size // 2
+            tables = {token: [0] * (size * size) for token in (Pieces.M1, Pieces.G1, Pieces.M2, Pieces.G2)}
+            for row in range(size):
+                for col in range(size):
+                    square = row * size + col
+                    tables[Pieces.M1][square] = self.material + self.advance * row
+                    tables[Pieces.M2][square] = -(self.material + self.advance * (size - 1 - row))
+                    tables[Pieces.G1][square] = -self.temple * ((size - 1 - row) + abs(col - mid))
+                    tables[Pieces.G2][square] = self.temple * (row + abs(col - mid))
+            self._tables[key] = tables
+        return tables
+
+    def attach(self, onitama) -> None:
+        """
+        Starts keeping the score of <onitama> up to date, detaching from the game
+        this evaluator was attached to, if any.
+        """
+        if self._onitama is not None:
+            self.detach()
+        self._onitama = onitama
+        onitama.add_listener(self)
+        self.refresh()
+
+    def detach(self) -> None:
+        """
+        Stops keeping the score of the attached game up to date.
+        """
+        if self._onitama is not None:
+            self._onitama.remove_listener(self)
+            self._onitama = None
+
+    def refresh(self) -> None:
+        """
+        Recomputes everything this evaluator keeps about the attached game.
+        """
+        onitama = self._onitama
+        self._values = self.get_tables(onitama.size)
+        self._reach = self.get_reach(onitama)
+        self._score = self.table_score(onitama)
+        self._hash = onitama.get_hash()
+        self._size = onitama.size
+        self._stack = onitama.onitama_stack
+
+    def is_current(self) -> bool:
+        """
+        Returns whether the kept tables and score can still be updated move by move:
+        the attached game has the same size and move history as when they were computed.
+        """
+        onitama = self._onitama
+        return onitama.size == self._size and onitama.onitama_stack is self._stack
+
+    def get_reach(self, onitama) -> Dict[Tuple[str, str], List[int]]:
+        """
+        Returns the number of squares each (style name, player ID) of <onitama> reaches
+        from every square of its board, indexed by row * size + col.
+        >>> from OnitamaGame import OnitamaGame
+        >>> Evaluator().get_reach(OnitamaGame(5))[('crab', Pieces.G1)][0]
+        2
+        """
+        reach = {}
+        for style in onitama.get_styles():
+            for player, flipped in ((onitama.player1, True), (onitama.player2, False)):
+                table = StyleRegistry.get_destinations(style, flipped, onitama.size)
+                reach[(style.name, player.player_id)] = [len(dests) for dests in table]
+        return reach
+
+    def table_score(self, onitama) -> int:
+        """
+        Computes the material, temple distance and piece-square part of the score of
+        <onitama> from scratch, from player1's point of view.
+        >>> from OnitamaGame import OnitamaGame
+        >>> Evaluator().table_score(OnitamaGame(5))
+        0
+        """
+        values = self.get_tables(onitama.size)
+        size = onitama.size
+        score = 0
+        for player in (onitama.player1, onitama.player2):
+            for row, col in onitama.get_positions(player.player_id):
+                score += values[onitama.get_token(row, col)][row * size + col]
+        return score
+
+    def mobility_score(self, onitama) -> int:
+        """
+        Returns the mobility part of the score of <onitama>, from player1's point of
+        view. The reach tables are computed again unless this evaluator is attached
+        to <onitama>.
+        """
+        size = onitama.size
+        player1 = onitama.player1.player_id
+        reaches = self._reach if onitama is self._onitama else self.get_reach(onitama)
+        score = 0
+        for style in onitama.get_styles():
+            reach = reaches.get((style.name, style.owner))
+            if reach is None:
+                continue
+            count = 0
+            for row, col in onitama.get_positions(style.owner):
+                count += reach[row * size + col]
+            score += count if style.owner == player1 else -count
+        return self.mobility * score
+
+    def on_move(self, record: MoveRecord) -> None:
+        """
+        Updates the score for the move in <record>, which has just been made.
+        """
+        onitama = self._onitama
+        if not self.is_current():
+            self.refresh()
+            return
+        size = onitama.size
+        values = self._values[onitama.get_token(record.row_d, record.col_d)]
+        origin = record.row_o * size + record.col_o
+        dest = record.row_d * size + record.col_d
+        self._score += values[dest] - values[origin]
+        if record.captured != Pieces.EMPTY:
+            self._score -= self._values[record.captured][dest]
+        self._hash = onitama.get_hash()
+
+    def on_undo(self, record: MoveRecord) -> None:
+        """
+        Updates the score for the move in <record>, which has just been taken back.
+        """
+        onitama = self._onitama
+        if not self.is_current():
+            self.refresh()
+            return
+        size = onitama.size
+        values = self._values[onitama.get_token(record.row_o, record.col_o)]
+        origin = record.row_o * size + record.col_o
+        dest = record.row_d * size + record.col_d
+        self._score += values[origin] - values[dest]
+        if record.captured != Pieces.EMPTY:
+            self._score += self._values[record.captured][dest]
+        self._hash = onitama.get_hash()
+
+    def evaluate(self, onitama) -> int:
+        """
+        Returns the score of <onitama> for the player whose turn it is. If this
+        evaluator is attached to <onitama>, the kept score is used; otherwise the
+        score is computed from scratch and the evaluator stays unattached.
+        >>> from OnitamaGame import OnitamaGame
+        >>> Evaluator().evaluate(OnitamaGame(5))
+        0
+        """
+        if onitama is not self._onitama:
+            score = self.table_score(onitama)
+        else:
+            if onitama.get_hash() != self._hash:
+                self.refresh()
+            score = self._score
+        score += self.mobility_score(onitama)
+        if onitama.whose_turn.player_id == onitama.player2.player_id:
+            return -score
+        return score
@@ -0,0 +1,97 @@
+import pickle
+import random
+import pytest
+from Evaluator import Evaluator
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+from Player import Player
+
+
+def fresh_score(onitama) -> int:
+    return Evaluator().evaluate(onitama)
+
+
+@pytest.mark.parametrize('size', [5, 7, 9])
+def test_incremental_matches_full_score(size):
+    rng = random.Random(size)
+    onitama = OnitamaGame(size, Player(Pieces.G1), Player(Pieces.G2))
+    evaluator = Evaluator()
+    evaluator.attach(onitama)
+    for _ in range(300):
+        moves = list(onitama.legal_moves())
+        if onitama.get_winner() is not None or not moves or rng.random() < 0.3:
+            if onitama.onitama_stack.empty():
+                continue
+            onitama.undo()
+        else:
+            onitama.move(*rng.choice(moves))
+        assert evaluator._score == evaluator.table_score(onitama)
+        assert evaluator.evaluate(onitama) == fresh_score(onitama)
+    evaluator.detach()
+    assert onitama._listeners == []
+
+
+def test_score_is_symmetric():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    evaluator = Evaluator()
+    evaluator.attach(onitama)
+    assert evaluator.evaluate(onitama) == 0
+    onitama.move(0, 2, 1, 2, 'crab')
+    after = evaluator.evaluate(onitama)
+    # Player2 is to move, and player1's grandmaster has come a row closer to its temple.
+    assert after < 0
+    onitama.move(4, 2, 3, 2, 'mantis')
+    assert evaluator.evaluate(onitama) == fresh_score(onitama)
+    evaluator.detach()
+
+
+def test_unattached_evaluation_adds_no_listener():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    onitama.move(0, 2, 1, 2, 'crab')
+    evaluator = Evaluator()
+    evaluator.attach(onitama)
+    attached = evaluator.evaluate(onitama)
+    evaluator.detach()
+    for _ in range(10):
+        assert fresh_score(onitama) == attached
+    assert onitama._listeners == []
+
+
+def test_refreshes_after_set_board():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    evaluator = Evaluator()
+    evaluator.attach(onitama)
+    onitama.set_board(5, [['x', ' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ', ' '], [' ', ' ', 'X', ' ', ' '],
+                          [' ', ' ', ' ', ' ', ' '], [' ', ' ', 'Y', ' ', ' ']])
+    assert evaluator.evaluate(onitama) == fresh_score(onitama)
+    evaluator.detach()
+    onitama.move(*next(onitama.legal_moves()))
+    assert evaluator.evaluate(onitama) == fresh_score(onitama)
+
+
+@pytest.mark.parametrize('size', [5, 7])
+def test_move_after_set_board_rebuilds(size):
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    evaluator = Evaluator()
+    evaluator.attach(onitama)
+    onitama.move(0, 2, 1, 2, 'crab')
+    onitama.set_board(size, OnitamaGame(size).get_board())
+    onitama.move(*next(onitama.legal_moves()))
+    assert evaluator._score == evaluator.table_score(onitama)
+    onitama.undo()
+    assert evaluator._score == evaluator.table_score(onitama)
+    assert evaluator.evaluate(onitama) == fresh_score(onitama)
+    evaluator.detach()
+
+
+def test_pickles_detached_weights():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    evaluator = Evaluator(material=50, mobility=3)
+    evaluator.attach(onitama)
+    copy = pickle.loads(pickle.dumps(evaluator))
+    assert (copy.material, copy.temple, copy.advance, copy.mobility) == (50, 10, 2, 3)
+    assert copy._onitama is None
+
+
+if __name__ == "__main__":
+    pytest.main(['Evaluator_Tests.py'])
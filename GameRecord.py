@@ -0,0 +1,144 @@
+import struct
+from typing import BinaryIO, Iterator, List, Tuple, Union
+from OnitamaGame import OnitamaGame, Move
+from Pieces import Pieces
+from Player import Player
+
+
+class GameRecord:
+    """
+    A GameRecord class holding one game of Onitama played from the starting
+    position: the board size, the initial deal of the styles, the winner and every
+    move, packed by OnitamaGame.encode_move.
+
+    A record is stored as a 12 byte header (the magic bytes b'OG', the format
+    version, the board size, the owner of each of the five styles in the order
+    OnitamaBoard deals them, the result and the number of plies), then one
+    little-endian packed move per ply: 2 bytes each on boards up to 9x9 and 4 bytes
+    on larger ones. Records are self-contained, so files of records can simply be
+    appended to and concatenated.
+
+    === Attributes ===
+    size: The board size of the game.
+    deal: The owner of each style at the start of the game.
+    winner: The ID of the player who won, or None if the game was drawn or unfinished.
+    moves: The packed move of every ply, in order.
+    """
+    MAGIC: bytes = b'OG'
+    VERSION: int = 1
+    HEADER: struct.Struct = struct.Struct('<2sBB5sBH')
+    RESULTS: Tuple[Union[str, None], str, str] = (None, Pieces.G1, Pieces.G2)
+    # The most plies the header can count
+    MAX_PLIES: int = 0xFFFF
+    size: int
+    deal: Tuple[str, ...]
+    winner: Union[str, None]
+    moves: List[int]
+
+    def __init__(self, size: int, deal: Tuple[str, ...], winner: Union[str, None] = None,
+                 moves: Union[List[int], None] = None) -> None:
+        """
+        Initializes a record of a game of <size> with the styles dealt as in <deal>.
+        """
+        self.size = size
+        self.deal = tuple(deal)
+        self.winner = winner
+        self.moves = [] if moves is None else moves
+
+    def move_format(self) -> str:
+        """
+        Returns the struct format code of one packed move of this record.
+        >>> deal = ('X', 'X', 'Y', 'Y', ' ')
+        >>> GameRecord(5, deal).move_format(), GameRecord(11, deal).move_format()
+        ('H', 'I')
+        """
+        squares = self.size * self.size
+        return 'H' if len(self.deal) * squares * squares <= 1 << 16 else 'I'
+
+    def to_bytes(self) -> bytes:
+        """
+        Returns this record in the binary format.
+        Raises ValueError if the winner is not one of the standard player IDs, or
+        if the game has more than MAX_PLIES plies.
+        >>> record = GameRecord(5, ('X', 'X', 'Y', 'Y', ' '), 'X', [57, 600])
+        >>> data = record.to_bytes()
+        >>> len(data)
+        16
+        >>> import io
+        >>> copy = next(GameRecord.read_all(io.BytesIO(data)))
+        >>> copy.size, copy.deal, copy.winner, copy.moves
+        (5, ('X', 'X', 'Y', 'Y', ' '), 'X', [57, 600])
+        >>> GameRecord(5, ('X', 'X', 'Y', 'Y', ' '), 'Z').to_bytes()
+        Traceback (most recent call last):
+        ...
+        ValueError: the winner 'Z' is not one of the player IDs 'X' and 'Y'
+        """
+        if self.winner not in self.RESULTS:
+            raise ValueError(f'the winner {self.winner!r} is not one of the player IDs '
+                             f'{Pieces.G1!r} and {Pieces.G2!r}')
+        if len(self.moves) > self.MAX_PLIES:
+            raise ValueError(f'a game record holds at most {self.MAX_PLIES} plies, not {len(self.moves)}')
+        header = self.HEADER.pack(self.MAGIC, self.VERSION, self.size, ''.join(self.deal).encode('ascii'),
+                                  self.RESULTS.index(self.winner), len(self.moves))
+        return header + struct.pack(f'<{len(self.moves)}{self.move_format()}', *self.moves)
+
+    @classmethod
+    def read_all(cls, stream: BinaryIO) -> Iterator['GameRecord']:
+        """
+        Yields the records in <stream> one at a time, reading only as far as the
+        record being yielded.
+        Raises ValueError if the stream holds something other than whole records.
+        """
+        while True:
+            header = stream.read(cls.HEADER.size)
+            if not header:
+                return
+            if len(header) < cls.HEADER.size:
+                raise ValueError('truncated game record')
+            magic, version, size, deal, result, plies = cls.HEADER.unpack(header)
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(f'not a game record of version {cls.VERSION}')
+            record = cls(size, tuple(deal.decode('ascii')), cls.RESULTS[result])
+            move = struct.Struct(f'<{plies}{record.move_format()}')
+            data = stream.read(move.size)
+            if len(data) < move.size:
+                raise ValueError('truncated game record')
+            record.moves = list(move.unpack(data))
+            yield record
+
+    @classmethod
+    def read_file(cls, path: str) -> Iterator['GameRecord']:
+        """
+        Yields the records in the file at <path> one at a time.
+        """
+        with open(path, 'rb') as f:
+            yield from cls.read_all(f)
+
+    def start(self, player1: Union[Player, None] = None, player2: Union[Player, None] = None) -> OnitamaGame:
+        """
+        Returns a new game in the starting position of this record.
+        """
+        onitama = OnitamaGame(self.size, player1 if player1 is not None else Player(Pieces.G1),
+                              player2 if player2 is not None else Player(Pieces.G2))
+        state = onitama.get_state()
+        onitama.set_state(state[:4] + (self.deal, state[5]))
+        return onitama
+
+    def replay(self, onitama: Union[OnitamaGame, None] = None) -> Iterator[Tuple[Move, OnitamaGame]]:
+        """
+        Yields every move of this record with the game after the move is made on it,
+        one ply at a time. The same game is yielded every time, so it must not be
+        changed while the generator is being consumed. The game starts from
+        <onitama>, which must be in this record's starting position, or a new game.
+        Raises ValueError if a move of the record is not legal.
+        >>> record = GameRecord(5, ('X', 'X', 'Y', 'Y', ' '), None, [57])
+        >>> [(move, onitama.get_token(1, 2)) for move, onitama in record.replay()]
+        [((0, 2, 1, 2, 'crab'), 'X')]
+        """
+        if onitama is None:
+            onitama = self.start()
+        for code in self.moves:
+            move = onitama.decode_move(code)
+            if not onitama.move(*move):
+                raise ValueError(f'illegal move {move} in game record')
+            yield move, onitama
@@ -0,0 +1,86 @@
+from typing import BinaryIO, Union
+from GameRecord import GameRecord
+from MoveRecord import MoveRecord
+from OnitamaGame import OnitamaGame
+
+
+class GameRecordWriter:
+    """
+    A GameRecordWriter class that records games as they are played and writes
+    them to a binary stream as GameRecords. It listens to OnitamaGame.move and
+    OnitamaGame.undo, so moves taken back, such as the moves of a search made on
+    the game, are dropped from the record again. Each record is written when its
+    game is finished, so a stream can hold any number of games one after another.
+
+    === Attributes ===
+    stream: The binary stream records are written to.
+
+    === Private Attributes ===
+    _onitama: The game being recorded, or None.
+    _record: The record of the game being recorded, or None.
+    """
+    stream: BinaryIO
+    _onitama: Union[OnitamaGame, None]
+    _record: Union[GameRecord, None]
+
+    def __init__(self, stream: BinaryIO) -> None:
+        """
+        Initializes a writer of records to <stream>.
+        """
+        self.stream = stream
+        self._onitama = None
+        self._record = None
+
+    def attach(self, onitama: OnitamaGame) -> None:
+        """
+        Starts recording <onitama>, finishing the game being recorded if there is one.
+        Raises ValueError if <onitama> is not in the starting position of its size,
+        with any deal of the styles.
+        """
+        if self._onitama is not None:
+            self.finish()
+        fresh = OnitamaGame(onitama.size).get_state()
+        state = onitama.get_state()
+        if not onitama.onitama_stack.empty() or state[3] != fresh[3] or state[5] != fresh[5]:
+            raise ValueError('only games in their starting position can be recorded')
+        self._onitama = onitama
+        self._record = GameRecord(onitama.size, state[4])
+        onitama.add_listener(self)
+
+    def on_move(self, record: MoveRecord) -> None:
+        """
+        Adds the move in <record> to the record of the game.
+        """
+        self._record.moves.append(self._onitama.encode_move(
+            (record.row_o, record.col_o, record.row_d, record.col_d, record.style_name)))
+
+    def on_undo(self, record: MoveRecord) -> None:
+        """
+        Drops the last move from the record of the game.
+        """
+        self._record.moves.pop()
+
+    def finish(self) -> Union[GameRecord, None]:
+        """
+        Stops recording the game, writes its record to the stream with the game's
+        current winner, and returns the record. Returns None if no game is being
+        recorded.
+        Raises ValueError, after it has stopped recording, if the game cannot be
+        stored as a GameRecord.
+        """
+        if self._onitama is None:
+            return None
+        onitama, record = self._onitama, self._record
+        onitama.remove_listener(self)
+        self._onitama = None
+        self._record = None
+        winner = onitama.get_winner()
+        record.winner = None if winner is None else winner.player_id
+        self.write(record)
+        return record
+
+    def write(self, record: GameRecord) -> None:
+        """
+        Writes <record> to the stream.
+        """
+        self.stream.write(record.to_bytes())
@@ -0,0 +1,98 @@
+import io
+import random
+import pytest
+from GameRecord import GameRecord
+from GameRecordWriter import GameRecordWriter
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+from Player import Player
+from PlayerMinimax import PlayerMinimax
+
+
+def play_random(onitama: OnitamaGame, seed: int, max_plies: int = 200) -> None:
+    rng = random.Random(seed)
+    for _ in range(max_plies):
+        moves = list(onitama.legal_moves())
+        if not moves or onitama.get_winner() is not None:
+            return
+        onitama.move(*rng.choice(moves))
+
+
+def test_replay_matches_played_game():
+    stream = io.BytesIO()
+    writer = GameRecordWriter(stream)
+    boards = []
+    for size, seed in ((5, 0), (7, 1), (11, 2)):
+        onitama = OnitamaGame(size, Player(Pieces.G1), Player(Pieces.G2))
+        writer.attach(onitama)
+        play_random(onitama, seed)
+        writer.finish()
+        boards.append((onitama.get_board(), onitama.get_hash(), onitama.get_winner()))
+    stream.seek(0)
+    records = GameRecord.read_all(stream)
+    for record, (board, key, winner) in zip(records, boards):
+        onitama = record.start()
+        for _ in record.replay(onitama):
+            pass
+        assert onitama.get_board() == board
+        assert onitama.get_hash() == key
+        assert record.winner == (None if winner is None else winner.player_id)
+    assert next(records, None) is None
+
+
+def test_searched_moves_are_not_recorded():
+    onitama = OnitamaGame(5, PlayerMinimax(Pieces.G1, time_limit=0.05), Player(Pieces.G2))
+    writer = GameRecordWriter(io.BytesIO())
+    writer.attach(onitama)
+    played = [onitama.player1.choose_move(onitama)]
+    onitama.move(*played[0])
+    played.append(next(onitama.legal_moves()))
+    onitama.move(*played[1])
+    onitama.move(*next(onitama.legal_moves()))
+    onitama.undo()
+    record = writer.finish()
+    assert [move for move, _ in record.replay()] == played
+
+
+def test_deal_is_recorded():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    state = onitama.get_state()
+    deal = (Pieces.EMPTY, Pieces.G1, Pieces.G2, Pieces.G2, Pieces.G1)
+    onitama.set_state(state[:4] + (deal, state[5]))
+    writer = GameRecordWriter(io.BytesIO())
+    writer.attach(onitama)
+    play_random(onitama, 3, 10)
+    writer.finish()
+    record = next(GameRecord.read_all(io.BytesIO(writer.stream.getvalue())))
+    assert record.deal == deal
+    assert record.start().get_state() == onitama.from_state(state[:4] + (deal, state[5])).get_state()
+    for _ in record.replay():
+        pass
+
+
+def test_attach_needs_starting_position():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    onitama.move(*next(onitama.legal_moves()))
+    with pytest.raises(ValueError):
+        GameRecordWriter(io.BytesIO()).attach(onitama)
+
+
+def test_read_rejects_truncated_records():
+    data = GameRecord(5, ('X', 'X', 'Y', 'Y', ' '), None, [57, 57]).to_bytes()
+    with pytest.raises(ValueError):
+        list(GameRecord.read_all(io.BytesIO(data[:-1])))
+    with pytest.raises(ValueError):
+        list(GameRecord.read_all(io.BytesIO(b'XX' + data[2:])))
+
+
+def test_unrecordable_games_raise_value_error():
+    deal = ('X', 'X', 'Y', 'Y', ' ')
+    with pytest.raises(ValueError):
+        GameRecord(5, deal, None, [57] * (GameRecord.MAX_PLIES + 1)).to_bytes()
+    assert len(GameRecord(5, deal, None, [57] * GameRecord.MAX_PLIES).to_bytes()) == 12 + 2 * GameRecord.MAX_PLIES
+    with pytest.raises(ValueError):
+        GameRecord(5, deal, 'Z').to_bytes()
+
+
+if __name__ == "__main__":
+    pytest.main(['GameRecord_Tests.py'])
@@ -0,0 +1,78 @@
+from typing import Any, Dict, List, Tuple, Union
+
+
+class HitGrid:
+    """
+    A HitGrid class that finds the entity under a point of the screen in constant
+    time, for dispatching mouse hovers and clicks. The screen is divided into a
+    grid of equal cells, and every cell lists the entities whose area overlaps it,
+    so a lookup only tests the few entities of the one cell the point falls in,
+    however many entities there are. With the cells the size of a board tile and
+    the grid's origin at the board's corner, every tile is exactly one cell.
+
+    === Attributes ===
+    cell_width: The width of a cell.
+    cell_height: The height of a cell.
+    origin: The screen coordinate of the corner of the cell (0, 0).
+
+    === Private Attributes ===
+    _cells: The (x, y, width, height) area and the entity of every entity overlapping
+            each cell, keyed by the cell's (column, row), in the order they were added.
+    """
+    cell_width: int
+    cell_height: int
+    origin: Tuple[int, int]
+    _cells: Dict[Tuple[int, int], List[Tuple[Tuple[int, int, int, int], Any]]]
+
+    def __init__(self, cell_width: int, cell_height: int, origin: Tuple[int, int] = (0, 0)) -> None:
+        """
+        Initializes an empty grid of cells of the given size with cell (0, 0) at <origin>.
+        """
+        self.cell_width = cell_width
+        self.cell_height = cell_height
+        self.origin = origin
+        self._cells = {}
+
+    def cell(self, pos: Tuple[int, int]) -> Tuple[int, int]:
+        """
+        Returns the (column, row) of the cell holding the point <pos>.
+        >>> grid = HitGrid(100, 100, (250, 150))
+        >>> grid.cell((250, 150)), grid.cell((349, 449)), grid.cell((249, 150))
+        ((0, 0), (0, 2), (-1, 0))
+        """
+        return (pos[0] - self.origin[0]) // self.cell_width, (pos[1] - self.origin[1]) // self.cell_height
+
+    def add(self, entity: Any, area: Tuple[int, int, int, int]) -> None:
+        """
+        Adds <entity> covering the (x, y, width, height) <area> to the grid. Where
+        areas overlap, the entity added last is found.
+        """
+        x, y, width, height = area
+        if width <= 0 or height <= 0:
+            return
+        col_first, row_first = self.cell((x, y))
+        col_last, row_last = self.cell((x + width - 1, y + height - 1))
+        for row in range(row_first, row_last + 1):
+            for col in range(col_first, col_last + 1):
+                self._cells.setdefault((col, row), []).append((area, entity))
+
+    def clear(self) -> None:
+        """
+        Removes every entity from the grid.
+        """
+        self._cells = {}
+
+    def find(self, pos: Tuple[int, int]) -> Union[Any, None]:
+        """
+        Returns the entity whose area holds the point <pos>, or None if there is none.
+        >>> grid = HitGrid(100, 100, (250, 150))
+        >>> grid.add('tile', (250, 150, 100, 100))
+        >>> grid.add('card', (25, 350, 200, 125))
+        >>> grid.find((300, 200)), grid.find((224, 474)), grid.find((225, 400))
+        ('tile', 'card', None)
+        """
+        px, py = pos
+        for (x, y, width, height), entity in reversed(self._cells.get(self.cell(pos), ())):
+            if x <= px < x + width and y <= py < y + height:
+                return entity
+        return None
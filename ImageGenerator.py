@@ -1,43 +1,114 @@
-import pygame
-from typing import Dict
+from __future__ import annotations
+from typing import Dict, Tuple, Union, TYPE_CHECKING
+from SpriteAtlas import SpriteAtlas
+
+if TYPE_CHECKING:
+    import pygame
 
 
 class ImageGenerator:
     """
     A class which is responsible for generating pygame images. 
+    pygame is only used through the module passed to the constructor, so the game
+    rules, which use the piece constants of the subclasses, can run without it.
+    Images are loaded lazily, the first time they are used: from the sprite atlas
+    built by build_atlas.py if it holds the image at the requested size, and
+    otherwise by decoding and scaling its PNG.
+    Tinted and rotated variants of the images are rendered once and cached, so
+    drawing them is a plain blit.
     """
     EMPTY: str = ' '
     img_dir = './assets/img'
-    # Contains the image mapping for each piece
+    atlas_path = './assets/atlas.bin'
+    # The filename of each image every generator of this class has, by key
+    FILES: Dict[str, str] = {EMPTY: 'space'}
+    # Contains the opened sprite atlas for each path, or None if there is none
+    _atlases: Dict[str, Union[SpriteAtlas, None]] = {}
+    # Contains the filename of every image added, by key
+    filenames: Dict[str, str]
+    # Contains the images loaded so far, by key
     images: Dict[str, pygame.Surface]
+    # Contains the rendered variants of the images, keyed by image key, tints and rotation
+    variants: Dict[Tuple[str, Tuple[Tuple[int, int, int, int], ...], int], pygame.Surface]
+    # The size the images are scaled to, or None to keep the size of the files
+    size: Union[Tuple[int, int], None]
 
     def __init__(self, pygame: pygame) -> None:
         """
         Initialize the pygame image for EMPTY which is the default return value for get_image.
         """
-        self.images = {
-            self.EMPTY:  pygame.image.load(f'{self.img_dir}/space.png').convert(),
-        }
+        self.pygame = pygame
+        self.filenames = {}
+        self.images = {}
+        self.variants = {}
+        self.size = None
+        self.add_images(ImageGenerator.FILES)
 
     def add_images(self, images: Dict[str, str]) -> None:
         """
-        Generate and add images based on their key and filenames.
+        Add images based on their key and filenames. They are loaded on first use.
         """
         for key, filename in images.items():
-            self.images[key] = pygame.image.load(
-                f'{self.img_dir}/{filename}.png').convert()
+            self.filenames[key] = filename
+            self.images.pop(key, None)
 
     def scale_images(self, width: int, height: int) -> None:
         """
         Scale all of the images with the given width and height.
         """
-        # Scale the images
-        for key in self.images:
-            self.images[key] = pygame.transform.smoothscale(
-                self.images[key], (width, height))
+        self.size = (width, height)
+        self.images = {}
+        self.variants = {}
+
+    def get_atlas(self) -> Union[SpriteAtlas, None]:
+        """
+        Returns the sprite atlas at atlas_path, opening it on first use, or None if
+        it has not been built.
+        """
+        if self.atlas_path not in self._atlases:
+            self._atlases[self.atlas_path] = SpriteAtlas.open_if_exists(self.atlas_path)
+        return self._atlases[self.atlas_path]
+
+    def load(self, key: str) -> pygame.Surface:
+        """
+        Returns the image based on the key, loading it if it is used for the first time.
+        The image is shared and must not be changed.
+        """
+        img = self.images.get(key)
+        if img is None:
+            filename = self.filenames[key]
+            atlas = self.get_atlas()
+            pixels = atlas.get(filename, *self.size) if atlas and self.size else None
+            if pixels is not None:
+                img = self.pygame.image.frombuffer(pixels, self.size, 'RGB').convert()
+            else:
+                img = self.pygame.image.load(f'{self.img_dir}/{filename}.png').convert()
+                if self.size:
+                    img = self.pygame.transform.smoothscale(img, self.size)
+            self.images[key] = img
+        return img
 
     def get_image(self, key: str) -> pygame.Surface:
         """
         Returns the pygame image based on the key.
         """
-        return self.images.get(key, self.EMPTY).copy()
+        return self.load(key).copy()
+
+    def get_variant(self, key: str, tints: Tuple[Tuple[int, int, int, int], ...] = (),
+                    rotation: int = 0) -> pygame.Surface:
+        """
+        Returns the image based on the key, rotated by <rotation> degrees and then
+        multiplied by each color in <tints> in order.
+        The variant is rendered the first time it is asked for and cached, so the
+        returned image is shared and must not be changed.
+        """
+        variant_key = (key, tints, rotation)
+        img = self.variants.get(variant_key)
+        if img is None:
+            img = self.load(key).copy()
+            if rotation:
+                img = self.pygame.transform.rotate(img, rotation)
+            for tint in tints:
+                img.fill(tint, special_flags=self.pygame.BLEND_MULT)
+            self.variants[variant_key] = img
+        return img
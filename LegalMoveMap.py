@@ -0,0 +1,61 @@
+from typing import Dict, Set, Tuple, Union
+
+
+class LegalMoveMap:
+    """
+    A LegalMoveMap class that keeps the legal destination squares of a game's
+    current position, keyed by origin square and style name, for the GUI to look
+    up which tiles to highlight and which clicks are moves. Squares are numbered
+    row * size + col. The map is built from OnitamaGame.legal_moves once per
+    position and reused until the game's hash changes, such as after a move or undo.
+
+    === Private Attributes ===
+    _map: The legal destination squares by origin square and style name, with None
+          for any style, or None if no position has been mapped yet.
+    _key: The hash of the position <_map> belongs to.
+    """
+    _map: Union[Dict[Tuple[int, Union[str, None]], Set[int]], None]
+    _key: int
+
+    def __init__(self) -> None:
+        """
+        Initializes an empty LegalMoveMap.
+        """
+        self._map = None
+        self._key = 0
+
+    def get(self, onitama) -> Dict[Tuple[int, Union[str, None]], Set[int]]:
+        """
+        Returns the legal destination squares of the current position of <onitama>,
+        keyed by origin square and style name, or None for any style. The map is
+        shared and must not be changed.
+        >>> from OnitamaGame import OnitamaGame
+        >>> legal = LegalMoveMap()
+        >>> onitama = OnitamaGame(5)
+        >>> legal.get(onitama)[(2, 'crab')], legal.get(onitama)[(2, None)]
+        ({7}, {7})
+        >>> legal.get(onitama) is legal.get(onitama)
+        True
+        """
+        key = onitama.get_hash()
+        if self._map is None or self._key != key:
+            size = onitama.size
+            self._map = {}
+            for row_o, col_o, row_d, col_d, style_name in onitama.legal_moves():
+                origin = size * row_o + col_o
+                dest = size * row_d + col_d
+                self._map.setdefault((origin, style_name), set()).add(dest)
+                self._map.setdefault((origin, None), set()).add(dest)
+            self._key = key
+        return self._map
+
+    def destinations(self, onitama, row: int, col: int, style_name: Union[str, None] = None) -> Set[int]:
+        """
+        Returns the legal destination squares of the token at <row>, <col> of
+        <onitama> with the style <style_name>, or with any style if it is None.
+        >>> from OnitamaGame import OnitamaGame
+        >>> legal = LegalMoveMap()
+        >>> legal.destinations(OnitamaGame(5), 0, 2, 'crab'), legal.destinations(OnitamaGame(5), 0, 2, 'dragon')
+        ({7}, set())
+        """
+        return self.get(onitama).get((onitama.size * row + col, style_name), set())
@@ -0,0 +1,50 @@
+import random
+import pytest
+from LegalMoveMap import LegalMoveMap
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+from Player import Player
+
+
+def expected_map(onitama):
+    size = onitama.size
+    expected = {}
+    for row_o, col_o, row_d, col_d, style_name in onitama.legal_moves():
+        for key in ((size * row_o + col_o, style_name), (size * row_o + col_o, None)):
+            expected.setdefault(key, set()).add(size * row_d + col_d)
+    return expected
+
+
+@pytest.mark.parametrize('size', [5, 7])
+def test_matches_legal_moves_after_moves_and_undos(size):
+    rng = random.Random(size)
+    onitama = OnitamaGame(size, Player(Pieces.G1), Player(Pieces.G2))
+    legal = LegalMoveMap()
+    for _ in range(100):
+        moves = list(onitama.legal_moves())
+        if onitama.get_winner() is not None or not moves or rng.random() < 0.3:
+            if onitama.onitama_stack.empty():
+                continue
+            onitama.undo()
+        else:
+            onitama.move(*rng.choice(moves))
+        assert legal.get(onitama) == expected_map(onitama)
+
+
+def test_map_is_rebuilt_only_when_position_changes():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    legal = LegalMoveMap()
+    before = legal.get(onitama)
+    assert legal.get(onitama) is before
+    onitama.move(0, 2, 1, 2, 'crab')
+    after = legal.get(onitama)
+    assert after is not before
+    assert legal.destinations(onitama, 0, 2) == set()
+    assert legal.destinations(onitama, 4, 2) == after.get((22, None), set())
+    onitama.undo()
+    assert legal.get(onitama) == before
+    assert legal.destinations(onitama, 0, 2, 'crab') == {7}
+
+
+if __name__ == "__main__":
+    pytest.main(['LegalMoveMap_Tests.py'])
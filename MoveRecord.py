@@ -0,0 +1,32 @@
+from typing import Union
+
+
+class MoveRecord:
+    """
+    A MoveRecord class holding everything needed to take back one move of Onitama:
+    the origin and destination coordinates, the style that was used, the token that
+    was captured, the style that was exchanged for it and the player who moved.
+    """
+    row_o: int
+    col_o: int
+    row_d: int
+    col_d: int
+    style_name: str
+    captured: str
+    exchanged: Union[str, None]
+    player: str
+
+    def __init__(self, row_o: int, col_o: int, row_d: int, col_d: int, style_name: str, captured: str,
+                 exchanged: Union[str, None], player: str):
+        """
+        Initializes a MoveRecord class. <exchanged> is the name of the style that was
+        the extra style before the move, or None if no style was exchanged.
+        """
+        self.row_o = row_o
+        self.col_o = col_o
+        self.row_d = row_d
+        self.col_d = col_d
+        self.style_name = style_name
+        self.captured = captured
+        self.exchanged = exchanged
+        self.player = player
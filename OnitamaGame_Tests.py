@@ -150,5 +150,115 @@ def test_undo_move():
     assert test == onitama.get_board()
 
 
+def test_get_tokens_tracks_move_and_undo():
+    onitama = OnitamaGame()
+    onitama.set_board(5, board6)
+    before = onitama.player1.get_tokens()
+    assert before == [(0, 1), (0, 3), (0, 4), (2, 3), (3, 2)]
+    assert onitama.move(0, 1, 1, 1, 'crab') == True
+    assert (1, 1) in onitama.player1.get_tokens()
+    assert (1, 1) not in onitama.player2.get_tokens()
+    onitama.undo()
+    assert onitama.player1.get_tokens() == before
+    assert (1, 1) in onitama.player2.get_tokens()
+
+
+def test_legal_moves_match_move():
+    onitama = OnitamaGame(7)
+    for _ in range(6):
+        moves = set(onitama.legal_moves())
+        for style_name in [sty.name for sty in onitama.whose_turn.get_styles()]:
+            for row_o, col_o in onitama.whose_turn.get_tokens():
+                for row_d in range(onitama.size):
+                    for col_d in range(onitama.size):
+                        candidate = (row_o, col_o, row_d, col_d, style_name)
+                        legal = onitama.move(*candidate)
+                        if legal:
+                            onitama.undo()
+                        assert legal == (candidate in moves)
+        onitama.move(*sorted(moves)[len(moves) // 2])
+
+
+def test_undo_restores_captures_and_styles():
+    onitama = OnitamaGame()
+    history = []
+    for i in range(12):
+        moves = list(onitama.legal_moves())
+        history.append((onitama.get_board(), [(sty.name, sty.owner) for sty in onitama.get_styles()],
+                        onitama.whose_turn.player_id))
+        assert onitama.move(*moves[(7 * i) % len(moves)]) == True
+    while history:
+        onitama.undo()
+        board, styles, player_id = history.pop()
+        assert onitama.get_board() == board
+        assert [(sty.name, sty.owner) for sty in onitama.get_styles()] == styles
+        assert onitama.whose_turn.player_id == player_id
+    assert onitama.onitama_stack.empty()
+
+
+def test_hash_is_incremental():
+    onitama = OnitamaGame(7)
+    start = onitama.get_hash()
+    seen = {start}
+    for i in range(20):
+        moves = list(onitama.legal_moves())
+        assert onitama.move(*moves[(3 * i) % len(moves)]) == True
+        assert onitama.get_hash() == onitama.compute_hash()
+        seen.add(onitama.get_hash())
+    assert len(seen) > 1
+    for _ in range(20):
+        onitama.undo()
+        assert onitama.get_hash() == onitama.compute_hash()
+    assert onitama.get_hash() == start
+    onitama.set_board(5, board6)
+    assert onitama.get_hash() == onitama.compute_hash()
+
+
+def reference_winner(onitama: OnitamaGame):
+    """
+    The winner of <onitama>, worked out by scanning the whole board.
+    """
+    board = onitama.get_board()
+    size = len(board)
+    mid = size // 2
+    if board[size - 1][mid] == Pieces.G1:
+        return onitama.player1
+    if board[0][mid] == Pieces.G2:
+        return onitama.player2
+    tokens = [token for row in board for token in row]
+    if onitama.whose_turn is onitama.player2:
+        return None if Pieces.G2 in tokens else onitama.player1
+    return None if Pieces.G1 in tokens else onitama.player2
+
+
+def test_get_winner_matches_board_scan():
+    import random
+    rng = random.Random(11)
+    for size in (5, 7):
+        for _ in range(30):
+            onitama = OnitamaGame(size)
+            plies = 0
+            while onitama.get_winner() is None and plies < 150:
+                onitama.move(*rng.choice(list(onitama.legal_moves())))
+                plies += 1
+                assert onitama.get_winner() is reference_winner(onitama)
+            while not onitama.onitama_stack.empty():
+                onitama.undo()
+                assert onitama.get_winner() is reference_winner(onitama)
+
+
+def test_style_tables_match_style_moves():
+    for size in (5, 7, 9):
+        onitama = OnitamaGame(size)
+        for style in onitama.get_styles():
+            for player, sign in ((onitama.player1, -1), (onitama.player2, 1)):
+                table = onitama._destinations[(style.name, player.player_id)]
+                for row in range(size):
+                    for col in range(size):
+                        expected = [(row + sign * d_row, col + sign * d_col) for d_row, d_col in style.get_moves()]
+                        expected = [(r, c) for r, c in expected if 0 <= r < size and 0 <= c < size]
+                        assert list(table[row * size + col]) == expected
+
+
 if __name__ == "__main__":
     pytest.main(['OnitamaGame_Tests.py'])
@@ -1,18 +1,19 @@
-from typing import List, Tuple, Optional
-from Style import Style
+from typing import List, Optional
+from MoveRecord import MoveRecord
 
 
 class OnitamaStack:
     """An OnitamaStack class.
 
-    Stores data in a last-in, first-out order. When removing an item from the
-    stack, the most recently-added item is the one that is removed.
+    Stores the MoveRecords of the moves made in a game in a last-in, first-out
+    order. When removing an item from the stack, the most recently-added item is
+    the one that is removed.
 
     === Private Attributes ===
     _item: a list of elements in the stack.
            The end of the list represents the top of the stack.
     """
-    _items: List
+    _items: List[MoveRecord]
 
     def __init__(self) -> None:
         """Initialize a new empty stack."""
@@ -26,36 +27,52 @@ class OnitamaStack:
         """
         return self._items == []
 
-    def push(self, board: List[List[str]], style: List[Style]) -> None:
+    def push(self, record: MoveRecord) -> None:
         """Add a new element to the top of this stack.
         >>> s = OnitamaStack()
         >>> s.empty()
         True
-        >>> b = [['x', 'x', 'X', 'x', 'x'], [' ', ' ', ' ', ' ', ' '],\
-         [' ', ' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ', ' '],\
-         ['y', 'y', 'Y', 'y', 'y']]
-        >>> sty = [Style([(-1, 0), (0, -2), (0, 2)], 'crab', 'X')]
-        >>> s.push(b, sty)
+        >>> s.push(MoveRecord(0, 2, 1, 2, 'crab', ' ', 'dragon', 'X'))
         >>> s.empty()
         False
         """
-        self._items.append((board, style))
+        self._items.append(record)
 
-    def pop(self) -> Optional[Tuple]:
+    def pop(self) -> Optional[MoveRecord]:
         """
         Remove and return the element at the top of this stack.
         Returns None if this stack is empty.
         >>> s = OnitamaStack()
         >>> s.pop()
-        >>> b = [['x', 'x', 'X', 'x', 'x'], [' ', ' ', ' ', ' ', ' '],\
-         [' ', ' ', ' ', ' ', ' '], [' ', ' ', ' ', ' ', ' '],\
-         ['y', 'y', 'Y', 'y', 'y']]
-        >>> sty = [Style([(-1, 0), (0, -2), (0, 2)], 'crab', 'X')]
-        >>> s.push(b, sty)
-        >>> s.pop() == (b, sty)
+        >>> record = MoveRecord(0, 2, 1, 2, 'crab', ' ', 'dragon', 'X')
+        >>> s.push(record)
+        >>> s.pop() is record
         True
         >>> s.empty()
         True
         """
         if not self.empty():
             return self._items.pop()
+
+    def peek(self) -> Optional[MoveRecord]:
+        """
+        Return the element at the top of this stack without removing it.
+        Returns None if this stack is empty.
+        >>> s = OnitamaStack()
+        >>> s.peek()
+        >>> s.push(MoveRecord(0, 2, 1, 2, 'crab', ' ', 'dragon', 'X'))
+        >>> s.peek().style_name
+        'crab'
+        """
+        if not self.empty():
+            return self._items[-1]
+        return None
+
+    def __len__(self) -> int:
+        """Return the number of elements in this stack.
+        >>> s = OnitamaStack()
+        >>> s.push(MoveRecord(0, 2, 1, 2, 'crab', ' ', 'dragon', 'X'))
+        >>> len(s)
+        1
+        """
+        return len(self._items)
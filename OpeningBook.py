@@ -0,0 +1,140 @@
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from typing import Dict, Union
+from OnitamaGame import Move
+
+
+class OpeningBook:
+    """
+    An OpeningBook class mapping the Zobrist hash of an opening position to the
+    move to play there, for one board size. Because the styles are always dealt
+    the same way, every game starts from the same position and the book covers
+    the first few plies of all of them.
+
+    A book is stored on disk as a 12 byte header (the magic bytes b'ONBK', the
+    format version, the board size, the number of plies covered and the number of
+    entries), then the sorted position hashes as little-endian unsigned 64-bit
+    integers, then the moves, packed by OnitamaGame.encode_move, as little-endian
+    unsigned 32-bit integers in the same order. Lookups are binary searches.
+
+    === Attributes ===
+    size: The board size the book was built for.
+    plies: The number of plies from the starting position the book covers.
+
+    === Private Attributes ===
+    _keys: The sorted position hashes.
+    _moves: The packed move of the position at the same index of <_keys>.
+    """
+    MAGIC: bytes = b'ONBK'
+    VERSION: int = 1
+    HEADER: struct.Struct = struct.Struct('<4sBBHI')
+    size: int
+    plies: int
+    _keys: array
+    _moves: array
+
+    def __init__(self, size: int, plies: int, entries: Dict[int, int]) -> None:
+        """
+        Initializes a book for boards of <size>, covering <plies> plies, from
+        <entries> mapping position hashes to packed moves.
+        >>> book = OpeningBook(5, 1, {7: 57, 3: 80})
+        >>> len(book), list(book._keys), list(book._moves)
+        (2, [3, 7], [80, 57])
+        """
+        self.size = size
+        self.plies = plies
+        keys = sorted(entries)
+        self._keys = array('Q', keys)
+        self._moves = array('I', [entries[key] for key in keys])
+
+    def __len__(self) -> int:
+        """
+        Returns the number of positions in this book.
+        """
+        return len(self._keys)
+
+    def get(self, key: int) -> Union[int, None]:
+        """
+        Returns the packed move stored for the position hash <key>, or None if the
+        position is not in this book.
+        >>> book = OpeningBook(5, 1, {7: 57, 3: 80})
+        >>> book.get(7), book.get(5)
+        (57, None)
+        """
+        index = bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return self._moves[index]
+        return None
+
+    def probe(self, onitama) -> Union[Move, None]:
+        """
+        Returns the book move for the current position of <onitama>, or None if the
+        position is not in this book. A stored move that is not legal in the
+        position, as after a hash collision, is ignored.
+        """
+        if onitama.size != self.size:
+            return None
+        code = self.get(onitama.get_hash())
+        if code is None:
+            return None
+        squares = self.size * self.size
+        if code >= len(onitama.get_styles()) * squares * squares:
+            return None
+        move = onitama.decode_move(code)
+        if move not in set(onitama.legal_moves()):
+            return None
+        return move
+
+    def save(self, path: str) -> None:
+        """
+        Writes this book to the file at <path>.
+        """
+        keys = array('Q', self._keys)
+        moves = array('I', self._moves)
+        if sys.byteorder == 'big':
+            keys.byteswap()
+            moves.byteswap()
+        with open(path, 'wb') as f:
+            f.write(self.HEADER.pack(self.MAGIC, self.VERSION, self.size, self.plies, len(keys)))
+            f.write(keys.tobytes())
+            f.write(moves.tobytes())
+
+    @classmethod
+    def load(cls, path: str) -> 'OpeningBook':
+        """
+        Returns the book stored in the file at <path>.
+        Raises ValueError if the file is not a book of this format.
+        """
+        with open(path, 'rb') as f:
+            data = f.read()
+        if len(data) < cls.HEADER.size:
+            raise ValueError(f'{path} is not an opening book')
+        magic, version, size, plies, count = cls.HEADER.unpack_from(data)
+        if magic != cls.MAGIC or version != cls.VERSION:
+            raise ValueError(f'{path} is not an opening book of version {cls.VERSION}')
+        start = cls.HEADER.size
+        middle = start + 8 * count
+        if len(data) != middle + 4 * count:
+            raise ValueError(f'{path} is truncated')
+        book = cls(size, plies, {})
+        book._keys.frombytes(data[start:middle])
+        book._moves.frombytes(data[middle:])
+        if sys.byteorder == 'big':
+            book._keys.byteswap()
+            book._moves.byteswap()
+        return book
+
+    @classmethod
+    def load_if_exists(cls, path: str) -> Union['OpeningBook', None]:
+        """
+        Returns the book stored at <path>, or None if there is no readable book there.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls.load(path)
+        except (OSError, ValueError):
+            return None
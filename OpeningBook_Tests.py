@@ -0,0 +1,88 @@
+import pytest
+from OnitamaGame import OnitamaGame
+from OpeningBook import OpeningBook
+from Pieces import Pieces
+from Player import Player
+from PlayerMinimax import PlayerMinimax
+from build_book import build, opening_positions
+
+
+def test_encode_move_round_trip():
+    for size in (5, 7):
+        onitama = OnitamaGame(size, Player(Pieces.G1), Player(Pieces.G2))
+        codes = set()
+        for move in onitama.legal_moves():
+            code = onitama.encode_move(move)
+            assert onitama.decode_move(code) == move
+            codes.add(code)
+        assert len(codes) == len(list(onitama.legal_moves()))
+
+
+def test_opening_positions_cover_every_line():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    reached = set()
+
+    # Follow every line, without merging transpositions, to fewer than 4 plies.
+    def visit(depth):
+        if depth >= 4 or onitama.get_winner() is not None:
+            return
+        reached.add(onitama.get_hash())
+        for move in list(onitama.legal_moves()):
+            onitama.move(*move)
+            visit(depth + 1)
+            onitama.undo()
+
+    visit(0)
+    positions = opening_positions(5, 4)
+    keys = {OnitamaGame.from_state(state).get_hash() for state in positions}
+    assert len(keys) == len(positions)
+    assert keys == reached
+
+
+def test_book_save_and_load(tmp_path):
+    book = build(5, 2, 0.01)
+    assert len(book) == len(opening_positions(5, 2))
+    path = str(tmp_path / 'book.bin')
+    book.save(path)
+    loaded = OpeningBook.load(path)
+    assert (loaded.size, loaded.plies, len(loaded)) == (5, 2, len(book))
+    assert list(loaded._keys) == list(book._keys)
+    assert list(loaded._moves) == list(book._moves)
+
+
+def test_probe_covers_opening_plies():
+    book = build(5, 2, 0.01)
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    move = book.probe(onitama)
+    assert move in set(onitama.legal_moves())
+    for reply in list(onitama.legal_moves()):
+        onitama.move(*reply)
+        assert book.probe(onitama) in set(onitama.legal_moves())
+        onitama.move(*next(onitama.legal_moves()))
+        # Past the plies the book covers.
+        assert book.probe(onitama) is None
+        onitama.undo()
+        onitama.undo()
+    assert book.probe(OnitamaGame(7, Player(Pieces.G1), Player(Pieces.G2))) is None
+
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / 'not_a_book.bin'
+    path.write_bytes(b'not a book at all')
+    with pytest.raises(ValueError):
+        OpeningBook.load(str(path))
+    assert OpeningBook.load_if_exists(str(path)) is None
+    assert OpeningBook.load_if_exists(str(tmp_path / 'missing.bin')) is None
+
+
+def test_player_plays_book_move():
+    onitama = OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2))
+    move = (0, 2, 1, 2, 'crab')
+    book = OpeningBook(5, 1, {onitama.get_hash(): onitama.encode_move(move)})
+    # A search this short could not have settled on the book move by itself.
+    player = PlayerMinimax(Pieces.G1, time_limit=0.0, book=book)
+    assert player.choose_move(onitama) == move
+
+
+if __name__ == "__main__":
+    pytest.main(['OpeningBook_Tests.py'])
@@ -0,0 +1,54 @@
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pickle import PicklingError
+from typing import Any, Callable, List, Union
+
+
+class ParallelSearch:
+    """
+    A ParallelSearch class that runs independent search tasks on a pool of worker
+    processes and returns their results in order. The pool is started on first use
+    and kept for later calls. If there is only one worker, or the pool cannot be
+    used, the tasks are run one after another in the calling process instead.
+
+    === Attributes ===
+    workers: The number of worker processes to use.
+
+    === Private Attributes ===
+    _executor: The pool of worker processes, or None if it has not been started.
+    """
+    workers: int
+    _executor: Union[ProcessPoolExecutor, None]
+
+    def __init__(self, workers: int = 1) -> None:
+        """
+        Initializes a ParallelSearch that uses <workers> processes.
+        """
+        self.workers = max(1, workers)
+        self._executor = None
+
+    def map(self, fn: Callable[[Any], Any], tasks: List[Any]) -> List[Any]:
+        """
+        Returns the result of calling <fn> on every task in <tasks>. <fn> must be a
+        module-level function and every task must be picklable.
+        >>> ParallelSearch(1).map(abs, [-1, 2, -3])
+        [1, 2, 3]
+        """
+        if self.workers > 1 and len(tasks) > 1:
+            try:
+                if self._executor is None:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                return list(self._executor.map(fn, tasks))
+            except (OSError, BrokenProcessPool, PicklingError, NotImplementedError):
+                # Fall back to searching in this process from now on.
+                self.shutdown()
+                self.workers = 1
+        return [fn(task) for task in tasks]
+
+    def shutdown(self) -> None:
+        """
+        Stops the worker processes, if they were started.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,7 +1,11 @@
-import pygame
+from __future__ import annotations
+from typing import Dict, Tuple, TYPE_CHECKING
 
 from ImageGenerator import ImageGenerator
 
+if TYPE_CHECKING:
+    import pygame
+
 
 class Pieces(ImageGenerator):
     """
@@ -17,6 +21,7 @@ class Pieces(ImageGenerator):
     === Private Attributes ===
     _BLACK: DON'T WORRY ABOUT IT! (ITALIAN ACCENT)
     _WHITE: DON'T WORRY ABOUT IT! (ITALIAN ACCENT)
+    _tiles: The rendered tile images, keyed by piece, square color and tints.
 
     """
     _BLACK: str = 'black'
@@ -26,22 +31,24 @@ class Pieces(ImageGenerator):
     G1: str = 'X'
     G2: str = 'Y'
     EMPTY: str = ' '
+    FILES: Dict[str, str] = {
+        _BLACK:  'black',
+        _WHITE:  'white',
+        M1: 'b_monk',
+        M2: 'w_monk',
+        G1: 'cat1',
+        G2: 'cat2'
+    }
+    _tiles: Dict[Tuple[str, str, Tuple[Tuple[int, int, int, int], ...]], pygame.Surface]
 
     def __init__(self, pygame: pygame, width: int, height: int) -> None:
         """
         Initialize all of the pygame images based on the images in the assets folder.
         """
         super().__init__(pygame)
-        images = {
-            self._BLACK:  'black',
-            self._WHITE:  'white',
-            self.M1: 'b_monk',
-            self.M2: 'w_monk',
-            self.G1: 'cat1',
-            self.G2: 'cat2'
-        }
-        self.add_images(images)
+        self.add_images(self.FILES)
         self.scale_images(width, height)
+        self._tiles = {}
 
     def get_image(self, piece: str, i: int = -1, j: int = -1) -> pygame.Surface:
         """
@@ -53,4 +60,28 @@ class Pieces(ImageGenerator):
                 piece = self._BLACK
             else:
                 piece = self._WHITE
-        return self.images.get(piece, self._WHITE).copy()
+        return self.load(piece if piece in self.FILES else self._WHITE).copy()
+
+    def get_tile(self, piece: str, i: int, j: int,
+                 tints: Tuple[Tuple[int, int, int, int], ...] = ()) -> pygame.Surface:
+        """
+        Returns the image of the tile at coordinate (i, j) holding <piece>: the piece,
+        multiplied by each color in <tints>, drawn over the square's background,
+        or the tinted background if the tile is empty.
+        Tile images are rendered once and cached, so the returned image is shared
+        and must not be changed.
+        """
+        square = self._BLACK if i % 2 == j % 2 else self._WHITE
+        key = (piece, square, tints)
+        img = self._tiles.get(key)
+        if img is None:
+            if piece == self.EMPTY:
+                img = self.get_variant(square, tints)
+            else:
+                img = self.get_variant(square).copy()
+                # The variant is shared, so the colorkey goes on a copy of it.
+                token = self.get_variant(piece, tints).copy()
+                token.set_colorkey((0, 0, 0))
+                img.blit(token, (0, 0))
+            self._tiles[key] = img
+        return img
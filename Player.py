@@ -12,14 +12,17 @@ class Player:
 
     === Attributes ===
     player_id: This player's ID
+    stopped: Whether this player has been asked to stop searching for a move as soon as possible.
     """
     player_id: str
+    stopped: bool
 
     def __init__(self, player_id: str) -> None:
         """
         Initialize this Player
         """
         self.player_id = player_id
+        self.stopped = False
 
     def get_turn(self) -> Union[Turn, Union]:
         """
@@ -30,15 +33,9 @@ class Player:
 
     def get_tokens(self) -> List[Tuple]:
         """
-        Returns the list of position where this player's token is in.
+        Returns the list of position where this player's token is in, in row-major order.
         """
-        board = self.onitama.get_board()
-        tokens = []
-        for i, row in enumerate(board):
-            for j, token in enumerate(row):
-                if token.lower() == self.player_id.lower():
-                    tokens.append((i, j))
-        return tokens
+        return sorted(self.onitama.get_positions(self.player_id))
 
     def get_styles(self) -> List[Style]:
         """
@@ -54,21 +51,14 @@ class Player:
         """
         Returns the dictionary of this player's style name with turns that are valid for each style.
         """
-        styles = self.get_styles()
-        tokens = self.get_tokens()
         turns = {}
-        for sty in styles:
+        for sty in self.get_styles():
             turns[sty.name] = []
-            for row, col in tokens:
-                for d_row, d_col in sty.get_moves():
-                    # Flip move direction if player is X
-                    if self.player_id == Pieces.G1:
-                        d_row *= -1
-                        d_col *= -1
-                    # Check is_legal_move
-                    if self.onitama.is_legal_move(row, col, row + d_row, col + d_col):
-                        turns[sty.name].append(Turn(row, col, row + d_row,
-                                                    col + d_col, sty.name, self.player_id))
+        # Only the player whose turn it is has legal moves.
+        if self.onitama.whose_turn.player_id != self.player_id:
+            return turns
+        for row_o, col_o, row_d, col_d, style_name in self.onitama.legal_moves():
+            turns[style_name].append(Turn(row_o, col_o, row_d, col_d, style_name, self.player_id))
 
         return turns
 
@@ -108,3 +98,13 @@ class PlayerRandom(Player):
         if len(turns) == 0:
             return None
         return turns[randint(0, len(turns) - 1)]
+
+    def choose_move(self, onitama) -> Union[Tuple, None]:
+        """
+        Returns a random legal move of <onitama> as a (row_o, col_o, row_d, col_d, style_name)
+        tuple, or None if there is no legal move.
+        """
+        moves = list(onitama.legal_moves())
+        if len(moves) == 0:
+            return None
+        return moves[randint(0, len(moves) - 1)]
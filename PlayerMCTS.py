@@ -0,0 +1,315 @@
+from __future__ import annotations
+from math import log, sqrt
+from random import Random
+from time import perf_counter
+from typing import Dict, List, Tuple, Union
+from Player import Player
+from Turn import Turn
+from OnitamaGame import OnitamaGame
+from ParallelSearch import ParallelSearch
+from OpeningBook import OpeningBook
+from EndgameTablebase import EndgameTablebase
+
+
+class MCTSNode:
+    """
+    A node of a Monte Carlo search tree, standing for the position reached by
+    playing <move> from the position of its parent.
+
+    === Attributes ===
+    move: The move that leads from the parent to this node, or None for the root.
+    parent: The parent node, or None for the root.
+    mover: The ID of the player who made <move>.
+    key: The Zobrist hash of this node's position.
+    children: A mapping from each expanded move to its child node.
+    untried: The legal moves that have not been expanded yet.
+    visits: The number of playouts that passed through this node.
+    wins: The number of those playouts won by <mover>, with draws counted as half.
+    """
+    move: Union[Tuple, None]
+    parent: Union[MCTSNode, None]
+    mover: str
+    key: int
+    children: Dict[Tuple, MCTSNode]
+    untried: List[Tuple]
+    visits: int
+    wins: float
+
+    def __init__(self, onitama, move: Union[Tuple, None], parent: Union[MCTSNode, None], mover: str) -> None:
+        """
+        Initializes a node for the current position of <onitama>.
+        """
+        self.move = move
+        self.parent = parent
+        self.mover = mover
+        self.key = onitama.get_hash()
+        self.children = {}
+        self.untried = [] if onitama.get_winner() is not None else list(onitama.legal_moves())
+        self.visits = 0
+        self.wins = 0.0
+
+    def uct_child(self, exploration: float) -> MCTSNode:
+        """
+        Returns the child with the highest upper confidence bound.
+        """
+        scale = exploration * sqrt(log(self.visits))
+        best = None
+        best_score = -1.0
+        for child in self.children.values():
+            score = child.wins / child.visits + scale / sqrt(child.visits)
+            if score > best_score:
+                best = child
+                best_score = score
+        return best
+
+
+class PlayerMCTS(Player):
+    """
+    A Player who chooses its move with Monte Carlo Tree Search, using the UCT rule
+    to pick which line to explore and random playouts to score it. Playouts are
+    played and taken back with OnitamaGame.move and OnitamaGame.undo, so no board
+    is copied. The subtree under the position reached after the opponent's reply
+    is kept for the next call to get_turn.
+
+    With more than one worker, each worker process grows its own tree from the
+    current position with its own random seed, and the visit counts of the root
+    moves are added up to choose the move. Trees are not kept between moves then.
+    If an opening book is given, positions found in it are played from the book
+    without searching, and likewise positions covered by an endgame tablebase are
+    played perfectly from it. A search running on another thread ends early, as if
+    out of time, once <stopped> is set. While the opponent is thinking, the player
+    can ponder: grow the tree of the opponent's position, which is kept and
+    searched on from the node of the reply the opponent actually plays. If that is
+    the reply predicted by pondering, the time spent pondering counts towards the
+    time limit of the next move, down to a floor of PONDER_HIT_SHARE of it.
+
+    === Attributes ===
+    player_id: This player's ID
+    stopped: Whether this player has been asked to stop searching for a move as soon as possible.
+    iterations: The maximum number of playouts per move, or None for no limit.
+    time_limit: The number of seconds this player may think about a move, or None for no limit.
+    exploration: The exploration constant of the UCT rule.
+    max_playout: The number of plies after which a playout is scored as a draw.
+    workers: The number of processes to search with.
+    book: The opening book consulted before searching, or None.
+    tablebase: The endgame tablebase consulted before searching, or None.
+
+    === Private Attributes ===
+    _root: The root of the search tree kept from the last move or ponder, or None.
+    _random: The random number generator used for expansion and playouts.
+    _pool: The worker processes used when <workers> is more than 1.
+    _prediction: The hash of the position after the reply predicted by the last ponder, or None.
+    _pondered: The number of seconds the last ponder ran for.
+    """
+    # The least share of the time limit a move gets after a ponder hit
+    PONDER_HIT_SHARE: float = 0.5
+    player_id: str
+    stopped: bool
+    iterations: Union[int, None]
+    time_limit: Union[float, None]
+    exploration: float
+    max_playout: int
+    workers: int
+    book: Union[OpeningBook, None]
+    tablebase: Union[EndgameTablebase, None]
+    _root: Union[MCTSNode, None]
+    _random: Random
+    _pool: ParallelSearch
+    _prediction: Union[int, None]
+    _pondered: float
+
+    def __init__(self, player_id: str, iterations: Union[int, None] = None, time_limit: Union[float, None] = 1.0,
+                 exploration: float = 1.4, max_playout: int = 200, seed: Union[int, None] = None,
+                 workers: int = 1, book: Union[OpeningBook, None] = None,
+                 tablebase: Union[EndgameTablebase, None] = None) -> None:
+        """
+        Initializes this Player. At least one of <iterations> and <time_limit>
+        should be given; if neither is, 1000 playouts are made per move.
+        """
+        super().__init__(player_id)
+        if iterations is None and time_limit is None:
+            iterations = 1000
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.exploration = exploration
+        self.max_playout = max_playout
+        self.workers = workers
+        self.book = book
+        self.tablebase = tablebase
+        self._root = None
+        self._random = Random(seed)
+        self._pool = ParallelSearch(workers)
+        self._prediction = None
+        self._pondered = 0.0
+
+    def get_turn(self) -> Union[Turn, None]:
+        """
+        Returns the most visited Turn after searching.
+        Returns None if there is no valid move.
+        """
+        move = self.choose_move(self.onitama)
+        if move is None:
+            return None
+        return Turn(*move, self.player_id)
+
+    def choose_move(self, onitama) -> Union[Tuple, None]:
+        """
+        Searches <onitama> from the point of view of the player whose turn it is and
+        returns the most visited move as a (row_o, col_o, row_d, col_d, style_name)
+        tuple, or None if there is no legal move.
+        """
+        # Only the move right after a ponder can be a ponder hit.
+        time_limit = self.time_limit
+        if time_limit is not None and self._prediction is not None and self._prediction == onitama.get_hash():
+            time_limit = max(time_limit * self.PONDER_HIT_SHARE, time_limit - self._pondered)
+        self._prediction = None
+        if self.book is not None:
+            move = self.book.probe(onitama)
+            if move is not None:
+                self._root = None
+                return move
+        if self.tablebase is not None:
+            move = self.tablebase.best_move(onitama)
+            if move is not None:
+                self._root = None
+                return move
+        if self._pool.workers > 1:
+            settings = {'iterations': self.iterations, 'time_limit': self.time_limit,
+                        'exploration': self.exploration, 'max_playout': self.max_playout}
+            tasks = [(onitama.get_state(), settings, self._random.getrandbits(32)) for _ in range(self._pool.workers)]
+            totals = {}
+            for visits in self._pool.map(_search_tree, tasks):
+                for move, count in visits.items():
+                    totals[move] = totals.get(move, 0) + count
+            self._root = None
+            if not totals:
+                return next(onitama.legal_moves(), None)
+            return max(totals, key=totals.get)
+        root = self._find_root(onitama)
+        if not root.untried and not root.children:
+            self._root = None
+            return None
+        deadline = None if time_limit is None else perf_counter() + time_limit
+        count = 0
+        while self.iterations is None or count < self.iterations:
+            if self.stopped or (deadline is not None and perf_counter() > deadline):
+                break
+            self._iterate(onitama, root)
+            count += 1
+        if not root.children:
+            return root.untried[0]
+        best = max(root.children.values(), key=lambda child: child.visits)
+        best.parent = None
+        self._root = best
+        return best.move
+
+    def ponder(self, onitama, time_limit: Union[float, None] = None) -> None:
+        """
+        Grows the search tree of <onitama>, in which it is the opponent's turn, until
+        <stopped> is set or for at most <time_limit> seconds, and keeps it for the next
+        call to choose_move. The replies that look best for the opponent are explored
+        the most, and the most visited one is the predicted reply. Does nothing when
+        searching with several workers, whose trees are not kept.
+        """
+        if self._pool.workers > 1:
+            return
+        root = self._root = self._find_root(onitama)
+        if not root.untried and not root.children:
+            return
+        started = perf_counter()
+        deadline = None if time_limit is None else started + time_limit
+        while not self.stopped and (deadline is None or perf_counter() <= deadline):
+            self._iterate(onitama, root)
+        self._pondered = perf_counter() - started
+        # The predicted reply is the most visited one.
+        if root.children:
+            self._prediction = max(root.children.values(), key=lambda child: child.visits).key
+
+    def root_visits(self, onitama) -> Dict[Tuple, int]:
+        """
+        Searches <onitama> from a new tree and returns the number of visits of every
+        root move.
+        """
+        self._root = None
+        root = self._root = self._find_root(onitama)
+        self.choose_move(onitama)
+        return {move: child.visits for move, child in root.children.items()}
+
+    def _find_root(self, onitama) -> MCTSNode:
+        """
+        Returns the node of the kept tree matching the current position of <onitama>,
+        looking at most two plies below the kept root, or a new root if there is none.
+        """
+        key = onitama.get_hash()
+        frontier = [self._root] if self._root is not None else []
+        for _ in range(3):
+            for node in frontier:
+                if node.key == key:
+                    node.parent = None
+                    return node
+            frontier = [child for node in frontier for child in node.children.values()]
+        return MCTSNode(onitama, None, None, onitama.other_player(onitama.whose_turn).player_id)
+
+    def _iterate(self, onitama, root: MCTSNode) -> None:
+        """
+        Runs one selection, expansion, playout and backpropagation step from <root>,
+        leaving <onitama> as it was.
+        """
+        node = root
+        made = 0
+        # Selection
+        while not node.untried and node.children:
+            node = node.uct_child(self.exploration)
+            onitama.move(*node.move)
+            made += 1
+        # Expansion
+        if node.untried:
+            move = node.untried.pop(self._random.randrange(len(node.untried)))
+            mover = onitama.whose_turn.player_id
+            onitama.move(*move)
+            made += 1
+            child = MCTSNode(onitama, move, node, mover)
+            node.children[move] = child
+            node = child
+        # Playout
+        winner = self._playout(onitama)
+        # Backpropagation
+        while node is not None:
+            node.visits += 1
+            if winner is None:
+                node.wins += 0.5
+            elif winner == node.mover:
+                node.wins += 1.0
+            node = node.parent
+        for _ in range(made):
+            onitama.undo()
+
+    def _playout(self, onitama) -> Union[str, None]:
+        """
+        Plays random moves on <onitama> until the game ends or <self.max_playout>
+        plies have been made, takes them all back, and returns the ID of the winner,
+        or None for a draw.
+        """
+        made = 0
+        winner = onitama.get_winner()
+        while winner is None and made < self.max_playout:
+            moves = list(onitama.legal_moves())
+            if not moves:
+                break
+            onitama.move(*moves[self._random.randrange(len(moves))])
+            made += 1
+            winner = onitama.get_winner()
+        for _ in range(made):
+            onitama.undo()
+        return None if winner is None else winner.player_id
+
+
+def _search_tree(task: Tuple) -> Dict[Tuple, int]:
+    """
+    Grows one search tree in a worker process and returns the root visit counts. A
+    task is the state of the game, the settings of the PlayerMCTS and a random seed.
+    """
+    state, settings, seed = task
+    onitama = OnitamaGame.from_state(state)
+    player = PlayerMCTS(onitama.whose_turn.player_id, seed=seed, **settings)
+    return player.root_visits(onitama)
@@ -0,0 +1,93 @@
+import pytest
+from OnitamaGame import OnitamaGame
+from PlayerMCTS import PlayerMCTS
+from Player import Player, PlayerRandom
+from Pieces import Pieces
+
+board_temple = [['x', ' ', ' ', 'x', 'x'],
+                [' ', ' ', 'Y', ' ', ' '],
+                [' ', ' ', ' ', ' ', ' '],
+                [' ', 'y', 'X', ' ', ' '],
+                ['y', ' ', ' ', 'y', 'y']]
+
+
+def test_takes_temple():
+    player = PlayerMCTS(Pieces.G1, iterations=300, time_limit=None, seed=0)
+    onitama = OnitamaGame(5, player, Player(Pieces.G2))
+    onitama.set_board(5, board_temple)
+    turn = player.get_turn()
+    assert onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+    assert onitama.get_winner() is player
+
+
+def test_search_leaves_game_unchanged():
+    player = PlayerMCTS(Pieces.G1, iterations=200, time_limit=None, seed=1)
+    onitama = OnitamaGame(5, player, Player(Pieces.G2))
+    board = onitama.get_board()
+    key = onitama.get_hash()
+    assert player.get_turn() is not None
+    assert onitama.get_board() == board
+    assert onitama.get_hash() == key
+    assert onitama.onitama_stack.empty()
+
+
+def test_iteration_budget():
+    player = PlayerMCTS(Pieces.G1, iterations=150, time_limit=None, seed=2)
+    onitama = OnitamaGame(5, player, Player(Pieces.G2))
+    root = player._root = player._find_root(onitama)
+    player.choose_move(onitama)
+    assert root.visits == 150
+    assert sum(child.visits for child in root.children.values()) == 150
+
+
+def test_reuses_subtree():
+    player = PlayerMCTS(Pieces.G1, iterations=400, time_limit=None, seed=3)
+    opponent = PlayerRandom(Pieces.G2)
+    onitama = OnitamaGame(5, player, opponent)
+    turn = player.get_turn()
+    onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+    reply = max(player._root.children.values(), key=lambda child: child.visits).move
+    onitama.move(*reply)
+    root = player._find_root(onitama)
+    assert root.visits > 0
+    assert root.key == onitama.get_hash()
+    assert root.parent is None
+
+
+def test_ponder_tree_is_reused():
+    player = PlayerMCTS(Pieces.G2, iterations=50, time_limit=None, seed=5)
+    onitama = OnitamaGame(5, PlayerRandom(Pieces.G1), player)
+    player.ponder(onitama, time_limit=0.2)
+    pondered = player._root
+    assert pondered.key == onitama.get_hash() and pondered.visits > 0
+    reply = max(pondered.children.values(), key=lambda child: child.visits)
+    visits = reply.visits
+    onitama.move(*reply.move)
+    turn = player.get_turn()
+    assert onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+    assert reply.visits == visits + 50
+
+
+def test_ponder_hit_keeps_searching():
+    player = PlayerMCTS(Pieces.G2, time_limit=0.1, seed=6)
+    onitama = OnitamaGame(5, PlayerRandom(Pieces.G1), player)
+    # Ponder for longer than the time limit, which leaves only the floor of it.
+    player.ponder(onitama, time_limit=0.3)
+    reply = max(player._root.children.values(), key=lambda child: child.visits)
+    visits = reply.visits
+    onitama.move(*reply.move)
+    assert onitama.get_hash() == reply.key
+    assert onitama.move(*player.choose_move(onitama))
+    assert reply.visits > visits
+
+
+def test_parallel_search():
+    player = PlayerMCTS(Pieces.G1, iterations=100, time_limit=None, seed=4, workers=2)
+    onitama = OnitamaGame(5, player, Player(Pieces.G2))
+    turn = player.get_turn()
+    player._pool.shutdown()
+    assert onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+
+
+if __name__ == "__main__":
+    pytest.main(['PlayerMCTS_Tests.py'])
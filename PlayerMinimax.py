@@ -0,0 +1,406 @@
+from __future__ import annotations
+from time import perf_counter
+from typing import Dict, List, Tuple, Union
+from Pieces import Pieces
+from Player import Player
+from Turn import Turn
+from OnitamaGame import OnitamaGame
+from ParallelSearch import ParallelSearch
+from OpeningBook import OpeningBook
+from EndgameTablebase import EndgameTablebase
+from Evaluator import Evaluator
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+# The endgame tablebases opened by the searches of this process, by path
+_tablebases: Dict[str, EndgameTablebase] = {}
+
+
+class PlayerMinimax(Player):
+    """
+    A Player who searches for its move with iterative-deepening negamax and
+    alpha-beta pruning. Each iteration searches one ply deeper than the last until
+    the time budget runs out, and the move of the deepest finished iteration is played.
+    With more than one worker, the root moves are split between worker processes,
+    which search them independently and report back their results by depth.
+    Searched positions are kept in a bounded transposition table keyed by the
+    game's Zobrist hash, which also supplies the first move to try in each position.
+    If an opening book is given, positions found in it are played from the book
+    without searching. If an endgame tablebase is given, positions it covers are
+    played perfectly from it, and are scored from it instead of searched below the root.
+    Positions at the search horizon are scored by an Evaluator, which is attached to
+    the game during a search so that it is updated incrementally by every move.
+    A search running on another thread ends early, as if out of time, once
+    <stopped> is set. While the opponent is thinking, the player can ponder: search
+    the opponent's position so that the transposition table already holds the
+    positions after the opponent's likely replies when its own turn comes. If the
+    opponent then plays the reply predicted by pondering, the time spent pondering
+    counts towards the time limit of the next move, down to a floor of
+    PONDER_HIT_SHARE of it, and the search does not run out of time before it has
+    finished the depth pondering already reached for the position.
+
+    === Attributes ===
+    player_id: This player's ID
+    stopped: Whether this player has been asked to stop searching for a move as soon as possible.
+    time_limit: The number of seconds this player may think about a move.
+    max_depth: The deepest iteration this player will search to.
+    tt_size: The maximum number of positions kept in the transposition table.
+    workers: The number of processes to search with.
+    book: The opening book consulted before searching, or None.
+    tablebase: The endgame tablebase consulted before and during searching, or None.
+    evaluator: The static evaluation of positions at the search horizon.
+
+    === Private Attributes ===
+    _tt: The transposition table, mapping a position hash to its
+         (depth, score, bound, best move). The oldest entries are evicted first.
+         Win and loss scores are stored as distances from the position itself.
+    _history: A count of how often each move caused a cutoff, used to order moves.
+    _deadline: The time at which the current search must stop.
+    _nodes: The number of positions visited by the current search.
+    _pool: The worker processes used when <workers> is more than 1.
+    _prediction: The hash of the position after the reply predicted by the last ponder, or None.
+    _pondered: The number of seconds the last ponder ran for.
+    """
+    WIN: int = 1000000
+    EXACT: int = 0
+    LOWER: int = 1
+    UPPER: int = 2
+    # Scores beyond this are wins or losses a known number of plies away
+    MATE: int = WIN // 2
+    # The least share of the time limit a move gets after a ponder hit
+    PONDER_HIT_SHARE: float = 0.5
+    player_id: str
+    stopped: bool
+    time_limit: float
+    max_depth: int
+    tt_size: int
+    workers: int
+    book: Union[OpeningBook, None]
+    tablebase: Union[EndgameTablebase, None]
+    evaluator: Evaluator
+    _tt: Dict[int, Tuple[int, int, int, Union[Tuple, None]]]
+    _history: Dict[Tuple, int]
+    _deadline: float
+    _nodes: int
+    _pool: ParallelSearch
+    _prediction: Union[int, None]
+    _pondered: float
+
+    def __init__(self, player_id: str, time_limit: float = 1.0, max_depth: int = 64, tt_size: int = 1 << 18,
+                 workers: int = 1, book: Union[OpeningBook, None] = None,
+                 tablebase: Union[EndgameTablebase, None] = None,
+                 evaluator: Union[Evaluator, None] = None) -> None:
+        """
+        Initializes this Player. A default Evaluator is used if no <evaluator> is given.
+        """
+        super().__init__(player_id)
+        self.time_limit = time_limit
+        self.max_depth = max_depth
+        self.tt_size = tt_size
+        self.workers = workers
+        self.book = book
+        self.tablebase = tablebase
+        self.evaluator = evaluator if evaluator is not None else Evaluator()
+        self._tt = {}
+        self._history = {}
+        self._deadline = 0.0
+        self._nodes = 0
+        self._pool = ParallelSearch(workers)
+        self._prediction = None
+        self._pondered = 0.0
+
+    def get_turn(self) -> Union[Turn, None]:
+        """
+        Returns the best Turn found within the time limit.
+        Returns None if there is no valid move.
+        """
+        move = self.choose_move(self.onitama)
+        if move is None:
+            return None
+        return Turn(*move, self.player_id)
+
+    def choose_move(self, onitama) -> Union[Tuple, None]:
+        """
+        Searches <onitama> from the point of view of the player whose turn it is and
+        returns the best move found as a (row_o, col_o, row_d, col_d, style_name) tuple,
+        or None if there is no legal move.
+        """
+        # Only the move right after a ponder can be a ponder hit.
+        time_limit = self.time_limit
+        min_depth = 0
+        if self._prediction is not None and self._prediction == onitama.get_hash():
+            time_limit = max(self.time_limit * self.PONDER_HIT_SHARE, time_limit - self._pondered)
+            entry = self._tt.get(onitama.get_hash())
+            min_depth = entry[0] if entry is not None else 0
+        self._prediction = None
+        if self.book is not None:
+            move = self.book.probe(onitama)
+            if move is not None:
+                return move
+        if self.tablebase is not None:
+            move = self.tablebase.best_move(onitama)
+            if move is not None:
+                return move
+        moves = list(onitama.legal_moves())
+        if not moves:
+            return None
+        if self._pool.workers > 1 and len(moves) > 1:
+            count = min(self._pool.workers, len(moves))
+            settings = {'time_limit': self.time_limit, 'max_depth': self.max_depth, 'tt_size': self.tt_size,
+                        'tablebase': None if self.tablebase is None else self.tablebase.path,
+                        'evaluator': self.evaluator}
+            tasks = [(onitama.get_state(), moves[i::count], settings) for i in range(count)]
+            results = self._pool.map(_search_moves, tasks)
+        else:
+            results = [self.search(onitama, moves, time_limit, min_depth)]
+        return self._merge(results, moves[0])
+
+    def ponder(self, onitama, time_limit: Union[float, None] = None) -> None:
+        """
+        Searches <onitama>, in which it is the opponent's turn, until <stopped> is set
+        or for at most <time_limit> seconds, to fill the transposition table for this
+        player's next search. Alpha-beta spends most of the time on the replies that
+        look best for the opponent, and the best of them is the predicted reply.
+        Does nothing when searching with several workers, whose tables are not kept.
+        """
+        moves = list(onitama.legal_moves())
+        if not moves or self._pool.workers > 1:
+            return
+        started = perf_counter()
+        self.search(onitama, moves, float('inf') if time_limit is None else time_limit)
+        self._pondered = perf_counter() - started
+        # The predicted reply is the best move for the opponent found so far.
+        entry = self._tt.get(onitama.get_hash())
+        if entry is not None and entry[3] is not None:
+            onitama.move(*entry[3])
+            self._prediction = onitama.get_hash()
+            onitama.undo()
+
+    def search(self, onitama, moves: List[Tuple], time_limit: Union[float, None] = None,
+               min_depth: int = 0) -> Dict[int, Tuple[int, Tuple]]:
+        """
+        Runs iterative deepening on <onitama> for <time_limit> seconds, or this player's
+        time limit if it is None, considering only the root <moves>, and returns the
+        best (score, move) of every finished depth. Depths up to <min_depth> are
+        finished even after the time is up, unless <stopped> is set.
+        """
+        deadline = perf_counter() + (self.time_limit if time_limit is None else time_limit)
+        self._nodes = 0
+        self._history = {}
+        results = {}
+        self.evaluator.attach(onitama)
+        try:
+            for depth in range(1, self.max_depth + 1):
+                self._deadline = float('inf') if depth <= min_depth else deadline
+                try:
+                    score, move = self._search_root(onitama, moves, depth)
+                except SearchTimeout:
+                    break
+                results[depth] = (score, move)
+                # A forced win or loss will not change with a deeper search.
+                if self._is_proven(score):
+                    break
+        finally:
+            self.evaluator.detach()
+        return results
+
+    def _is_proven(self, score: int) -> bool:
+        """
+        Returns whether <score> is a forced win or loss.
+        """
+        return abs(score) >= self.WIN - self.max_depth
+
+    def _merge(self, results: List[Dict[int, Tuple[int, Tuple]]], default: Tuple) -> Tuple:
+        """
+        Returns the best move from the search <results> of disjoint sets of root
+        moves. Scores are compared at the deepest depth every unproven search
+        finished, while proven results are compared as they are. Returns <default>
+        if no search finished a single depth.
+        """
+        finished = [result for result in results if result]
+        if not finished:
+            return default
+        unproven = [max(result) for result in finished if not self._is_proven(result[max(result)][0])]
+        common = min(unproven) if unproven else self.max_depth
+        best_score, best = -self.WIN - 1, default
+        for result in finished:
+            depth = max(result)
+            if not self._is_proven(result[depth][0]):
+                depth = common
+            score, move = result[depth]
+            if score > best_score:
+                best_score, best = score, move
+        return best
+
+    def evaluate(self, onitama) -> int:
+        """
+        Returns the static score of <onitama> for the player whose turn it is, as
+        given by this player's Evaluator.
+        """
+        return self.evaluator.evaluate(onitama)
+
+    def _order_moves(self, onitama, moves: List[Tuple], tt_move: Union[Tuple, None]) -> List[Tuple]:
+        """
+        Returns <moves> sorted so that the transposition table move comes first,
+        then captures, then the moves with the best cutoff history.
+        """
+        def key(move: Tuple) -> int:
+            if move == tt_move:
+                return -(1 << 40)
+            captured = onitama.get_token(move[2], move[3])
+            if captured != Pieces.EMPTY:
+                return -(1 << 30) - (1 if captured.isupper() else 0)
+            return -self._history.get(move, 0)
+
+        return sorted(moves, key=key)
+
+    def _search_root(self, onitama, moves: List[Tuple], depth: int) -> Tuple[int, Union[Tuple, None]]:
+        """
+        Searches the root <moves> to <depth> and returns the best score and move.
+        """
+        entry = self._tt.get(onitama.get_hash())
+        moves = self._order_moves(onitama, moves, entry[3] if entry else None)
+        alpha = -self.WIN - 1
+        beta = self.WIN + 1
+        best = None
+        for move in moves:
+            onitama.move(*move)
+            try:
+                score = -self._negamax(onitama, depth - 1, -beta, -alpha, 1)
+            finally:
+                onitama.undo()
+            if score > alpha:
+                alpha = score
+                best = move
+        self._store(onitama.get_hash(), depth, alpha, self.EXACT, best)
+        return alpha, best
+
+    def _negamax(self, onitama, depth: int, alpha: int, beta: int, ply: int) -> int:
+        """
+        Returns the negamax score of <onitama> for the player whose turn it is,
+        searched <depth> plies deep within the window (<alpha>, <beta>).
+        """
+        self._nodes += 1
+        if self._nodes & 1023 == 0 and (self.stopped or perf_counter() > self._deadline):
+            raise SearchTimeout
+
+        winner = onitama.get_winner()
+        if winner is not None:
+            if winner.player_id == onitama.whose_turn.player_id:
+                return self.WIN - ply
+            return -(self.WIN - ply)
+        if self.tablebase is not None and self.tablebase.covers(onitama):
+            value = self.tablebase.get(onitama.get_hash())
+            if value is not None:
+                if value > 0:
+                    return self.WIN - (ply + value)
+                if value < 0:
+                    return -(self.WIN - (ply - value))
+                return 0
+        if depth <= 0:
+            return self.evaluate(onitama)
+
+        key = onitama.get_hash()
+        entry = self._tt.get(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, tt_move = entry
+            entry_score = self._from_tt(entry_score, ply)
+            if entry_depth >= depth:
+                if bound == self.EXACT:
+                    return entry_score
+                if bound == self.LOWER and entry_score >= beta:
+                    return entry_score
+                if bound == self.UPPER and entry_score <= alpha:
+                    return entry_score
+
+        moves = list(onitama.legal_moves())
+        if not moves:
+            return 0
+
+        original_alpha = alpha
+        best_score = -self.WIN - 1
+        best_move = None
+        for move in self._order_moves(onitama, moves, tt_move):
+            onitama.move(*move)
+            try:
+                score = -self._negamax(onitama, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                onitama.undo()
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                self._history[move] = self._history.get(move, 0) + depth * depth
+                break
+
+        if best_score <= original_alpha:
+            bound = self.UPPER
+        elif best_score >= beta:
+            bound = self.LOWER
+        else:
+            bound = self.EXACT
+        self._store(key, depth, self._to_tt(best_score, ply), bound, best_move)
+        return best_score
+
+    def _to_tt(self, score: int, ply: int) -> int:
+        """
+        Returns <score>, found <ply> plies from the root, as stored in the
+        transposition table: a win or loss counts its plies from the position
+        itself instead of from the root, so it is right wherever the position recurs.
+        >>> player = PlayerMinimax(Pieces.G1)
+        >>> player._to_tt(player.WIN - 5, 2), player._to_tt(-(player.WIN - 5), 2)
+        (999997, -999997)
+        >>> player._to_tt(40, 2)
+        40
+        """
+        if score > self.MATE:
+            return score + ply
+        if score < -self.MATE:
+            return score - ply
+        return score
+
+    def _from_tt(self, score: int, ply: int) -> int:
+        """
+        Returns the transposition table <score> of a position reached <ply> plies
+        from the root, with wins and losses counted from the root again.
+        >>> player = PlayerMinimax(Pieces.G1)
+        >>> player._from_tt(player._to_tt(player.WIN - 5, 2), 4) == player.WIN - 7
+        True
+        """
+        if score > self.MATE:
+            return score - ply
+        if score < -self.MATE:
+            return score + ply
+        return score
+
+    def _store(self, key: int, depth: int, score: int, bound: int, move: Union[Tuple, None]) -> None:
+        """
+        Stores a search result in the transposition table, evicting the oldest
+        entry if the table is full.
+        """
+        if key not in self._tt and len(self._tt) >= self.tt_size:
+            del self._tt[next(iter(self._tt))]
+        self._tt[key] = (depth, score, bound, move)
+
+
+def _search_moves(task: Tuple) -> Dict[int, Tuple[int, Tuple]]:
+    """
+    Searches the root moves of one task in a worker process. A task is the state
+    of the game, the root moves to search and the settings of the PlayerMinimax,
+    with the tablebase given by the path of its file. Each tablebase is opened
+    once per process and kept open for the later tasks.
+    """
+    state, moves, settings = task
+    path = settings.get('tablebase')
+    if path is not None and path not in _tablebases:
+        _tablebases[path] = EndgameTablebase.open(path)
+    settings = dict(settings, tablebase=None if path is None else _tablebases[path])
+    onitama = OnitamaGame.from_state(state)
+    player = PlayerMinimax(onitama.whose_turn.player_id, **settings)
+    return player.search(onitama, moves)
@@ -0,0 +1,139 @@
+import time
+import pytest
+from OnitamaGame import OnitamaGame
+from PlayerMinimax import PlayerMinimax
+from Player import Player
+from Pieces import Pieces
+
+board_temple = [['x', ' ', ' ', 'x', 'x'],
+                [' ', ' ', 'Y', ' ', ' '],
+                [' ', ' ', ' ', ' ', ' '],
+                [' ', 'y', 'X', ' ', ' '],
+                ['y', ' ', ' ', 'y', 'y']]
+
+board_capture = [['x', ' ', ' ', 'x', 'x'],
+                 [' ', ' ', ' ', ' ', ' '],
+                 [' ', ' ', 'X', 'x', ' '],
+                 [' ', 'Y', ' ', ' ', ' '],
+                 ['y', ' ', ' ', 'y', 'y']]
+
+
+def make_game(board, player1, player2):
+    onitama = OnitamaGame(5, player1, player2)
+    onitama.set_board(5, board)
+    return onitama
+
+
+def test_takes_temple():
+    player = PlayerMinimax(Pieces.G1, time_limit=0.5)
+    onitama = make_game(board_temple, player, Player(Pieces.G2))
+    turn = player.get_turn()
+    assert turn.player == Pieces.G1
+    assert onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+    assert onitama.get_winner() is player
+
+
+def test_captures_grandmaster():
+    player = PlayerMinimax(Pieces.G2, time_limit=0.5)
+    onitama = make_game(board_capture, Player(Pieces.G1), player)
+    onitama.set_state(onitama.get_state()[:-1] + (Pieces.G2,))
+    assert onitama.whose_turn is player
+    assert onitama.get_hash() == onitama.compute_hash()
+    turn = player.get_turn()
+    assert (turn.row_d, turn.col_d) == (2, 2)
+    assert onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+    assert onitama.get_winner() is player
+
+
+def test_transposed_win_keeps_its_distance():
+    player = PlayerMinimax(Pieces.G1, time_limit=10.0)
+    onitama = make_game(board_temple, player, Player(Pieces.G2))
+    player._deadline = time.perf_counter() + 10.0
+    player.evaluator.attach(onitama)
+    # The win in one is stored when the position is reached 3 plies from the root...
+    assert player._negamax(onitama, 2, -player.WIN - 1, player.WIN + 1, 3) == player.WIN - 4
+    # ...and found in the table, one ply away, when it is reached 1 ply from the root.
+    assert player._negamax(onitama, 2, -player.WIN - 1, player.WIN + 1, 1) == player.WIN - 2
+    player.evaluator.detach()
+
+
+def test_search_leaves_game_unchanged():
+    player = PlayerMinimax(Pieces.G1, time_limit=0.2, max_depth=3)
+    onitama = OnitamaGame(5, player, Player(Pieces.G2))
+    board = onitama.get_board()
+    key = onitama.get_hash()
+    turn = player.get_turn()
+    assert onitama.get_board() == board
+    assert onitama.get_hash() == key
+    assert onitama.onitama_stack.empty()
+    assert onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+
+
+def test_transposition_table_is_bounded():
+    player = PlayerMinimax(Pieces.G1, time_limit=0.3, tt_size=50)
+    OnitamaGame(7, player, Player(Pieces.G2))
+    assert player.get_turn() is not None
+    assert len(player._tt) <= 50
+
+
+def test_parallel_search_finds_win():
+    player = PlayerMinimax(Pieces.G1, time_limit=0.5, workers=2)
+    onitama = make_game(board_temple, player, Player(Pieces.G2))
+    turn = player.get_turn()
+    player._pool.shutdown()
+    assert onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+    assert onitama.get_winner() is player
+
+
+def test_merge_compares_common_depth():
+    player = PlayerMinimax(Pieces.G1, max_depth=10)
+    a, b, c = (0, 0, 1, 0, 'crab'), (0, 1, 1, 1, 'crab'), (0, 2, 1, 2, 'crab')
+    results = [{1: (5, a), 2: (1, a), 3: (50, a)},
+               {1: (3, b), 2: (4, b)},
+               {1: (-player.WIN + 1, c)}]
+    assert player._merge(results, c) == b
+    assert player._merge([{}, {}], c) == c
+
+
+def test_ponder_fills_table_for_replies():
+    player = PlayerMinimax(Pieces.G2, max_depth=3)
+    onitama = OnitamaGame(5, Player(Pieces.G1), player)
+    state = onitama.get_state()
+    player.ponder(onitama, time_limit=5.0)
+    assert onitama.get_state() == state
+    for move in onitama.legal_moves():
+        onitama.move(*move)
+        assert onitama.get_hash() in player._tt
+        onitama.undo()
+
+
+def test_ponder_hit_counts_pondered_time():
+    player = PlayerMinimax(Pieces.G2, time_limit=0.5)
+    onitama = OnitamaGame(5, Player(Pieces.G1), player)
+    player.ponder(onitama, time_limit=0.5)
+    predicted = player._tt[onitama.get_hash()][3]
+    onitama.move(*predicted)
+    assert player._prediction == onitama.get_hash()
+    started = time.perf_counter()
+    assert onitama.move(*player.choose_move(onitama))
+    assert time.perf_counter() - started < 0.45
+    assert player._prediction is None
+
+
+def test_ponder_hit_searches_as_deep_as_cold_search():
+    player = PlayerMinimax(Pieces.G2, time_limit=0.5)
+    onitama = OnitamaGame(5, Player(Pieces.G1), player)
+    # Ponder for longer than the time limit, which leaves only the floor of it.
+    player.ponder(onitama, time_limit=1.0)
+    onitama.move(*player._tt[onitama.get_hash()][3])
+    started = time.perf_counter()
+    assert player.choose_move(onitama) is not None
+    assert time.perf_counter() - started >= 0.5 * player.PONDER_HIT_SHARE
+    cold = PlayerMinimax(Pieces.G2, time_limit=0.5)
+    copy = OnitamaGame.from_state(onitama.get_state(), Player(Pieces.G1), cold)
+    assert cold.choose_move(copy) is not None
+    assert player._tt[onitama.get_hash()][0] >= cold._tt[copy.get_hash()][0]
+
+
+if __name__ == "__main__":
+    pytest.main(['PlayerMinimax_Tests.py'])
@@ -0,0 +1,155 @@
+from typing import Iterable, Iterator, List, Tuple, Union
+import numpy as np
+from numpy.lib.format import open_memmap
+from BitBoard import BitBoard
+from GameRecord import GameRecord
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+
+
+class PositionEncoder:
+    """
+    A PositionEncoder class that converts Onitama positions of one board size into
+    rows of a fixed-shape NumPy structured array, and back. Each row holds:
+        board: one 0/1 plane per token type, in BitBoard.TOKENS order, of shape
+               (4, size, size).
+        styles: the owner of each style in OnitamaBoard's order, as 0 for the
+                extra style, 1 for player1 and 2 for player2.
+        turn: 0 if it is player1's turn and 1 if it is player2's.
+        result: the result of the game the position was taken from, as 0 for a
+                draw or unknown, 1 if player1 won and 2 if player2 won.
+        hash: the Zobrist hash of the position.
+
+    Arrays are saved as .npy files and can be loaded memory-mapped, so datasets
+    larger than memory can be filtered and aggregated with vectorized operations.
+
+    === Attributes ===
+    size: The board size of the positions.
+    dtype: The structured dtype of one encoded position.
+    """
+    OWNERS: Tuple[str, str, str] = (Pieces.EMPTY, Pieces.G1, Pieces.G2)
+    size: int
+    dtype: np.dtype
+
+    def __init__(self, size: int) -> None:
+        """
+        Initializes an encoder of positions on boards of the given <size>.
+        >>> PositionEncoder(5).dtype.itemsize
+        115
+        """
+        self.size = size
+        self.dtype = np.dtype([('board', np.uint8, (len(BitBoard.TOKENS), size, size)),
+                               ('styles', np.uint8, (5,)), ('turn', np.uint8), ('result', np.uint8),
+                               ('hash', np.uint64)])
+
+    def from_states(self, states: List[Tuple], hashes: Union[Iterable[int], None] = None,
+                    results: Union[Iterable[Union[str, None]], None] = None) -> np.ndarray:
+        """
+        Returns the encoding of every state in <states>, as returned by
+        OnitamaGame.get_state, with the position hashes in <hashes> and the IDs of
+        the games' winners in <results> if they are given.
+        >>> encoded = PositionEncoder(5).from_states([OnitamaGame(5).get_state()])
+        >>> encoded['board'][0, 1]
+        array([[0, 0, 1, 0, 0],
+               [0, 0, 0, 0, 0],
+               [0, 0, 0, 0, 0],
+               [0, 0, 0, 0, 0],
+               [0, 0, 0, 0, 0]], dtype=uint8)
+        >>> encoded['styles'][0].tolist(), int(encoded['turn'][0])
+        ([1, 1, 2, 2, 0], 0)
+        """
+        squares = self.size * self.size
+        width = (squares + 7) // 8
+        count = len(states)
+        encoded = np.zeros(count, dtype=self.dtype)
+        if count == 0:
+            return encoded
+        data = b''.join(mask.to_bytes(width, 'little') for state in states for mask in state[3])
+        bits = np.unpackbits(np.frombuffer(data, dtype=np.uint8).reshape(count, len(BitBoard.TOKENS), width),
+                             axis=2, bitorder='little')
+        encoded['board'] = bits[:, :, :squares].reshape(count, len(BitBoard.TOKENS), self.size, self.size)
+        encoded['styles'] = [[self.OWNERS.index(owner) for owner in state[4]] for state in states]
+        encoded['turn'] = [0 if state[5] == state[1] else 1 for state in states]
+        if hashes is not None:
+            encoded['hash'] = np.fromiter(hashes, dtype=np.uint64, count=count)
+        if results is not None:
+            encoded['result'] = [self.OWNERS.index(winner) if winner is not None else 0 for winner in results]
+        return encoded
+
+    def encode(self, games: Iterable[OnitamaGame]) -> np.ndarray:
+        """
+        Returns the encoding of the current position of every game in <games>.
+        """
+        states = []
+        hashes = []
+        for onitama in games:
+            states.append(onitama.get_state())
+            hashes.append(onitama.get_hash())
+        return self.from_states(states, hashes)
+
+    def to_state(self, row: np.void) -> Tuple:
+        """
+        Returns the state, as taken by OnitamaGame.set_state, of an encoded <row>.
+        >>> encoder = PositionEncoder(7)
+        >>> state = OnitamaGame(7).get_state()
+        >>> encoder.to_state(encoder.from_states([state])[0]) == state
+        True
+        """
+        squares = self.size * self.size
+        planes = np.asarray(row['board']).reshape(len(BitBoard.TOKENS), squares)
+        masks = tuple(int.from_bytes(np.packbits(plane, bitorder='little').tobytes(), 'little') for plane in planes)
+        owners = tuple(self.OWNERS[code] for code in row['styles'])
+        turn = Pieces.G2 if row['turn'] else Pieces.G1
+        return self.size, Pieces.G1, Pieces.G2, masks, owners, turn
+
+    def record_positions(self, record: GameRecord) -> Iterator[OnitamaGame]:
+        """
+        Yields the game in the starting position of <record> and after every ply.
+        """
+        onitama = record.start()
+        yield onitama
+        for _, onitama in record.replay(onitama):
+            yield onitama
+
+    def export_records(self, records_path: str, output_path: str, chunk: int = 1 << 16) -> int:
+        """
+        Encodes every position of every game of this encoder's size in the file of
+        GameRecords at <records_path>, labelled with the game's result, and writes
+        them to the .npy file at <output_path> <chunk> positions at a time. Returns
+        the number of positions written.
+        """
+        count = sum(len(record.moves) + 1 for record in GameRecord.read_file(records_path)
+                    if record.size == self.size)
+        output = open_memmap(output_path, mode='w+', dtype=self.dtype, shape=(count,))
+        written = 0
+        states, hashes, results = [], [], []
+        for record in GameRecord.read_file(records_path):
+            if record.size != self.size:
+                continue
+            for onitama in self.record_positions(record):
+                states.append(onitama.get_state())
+                hashes.append(onitama.get_hash())
+                results.append(record.winner)
+                if len(states) == chunk:
+                    output[written:written + chunk] = self.from_states(states, hashes, results)
+                    written += chunk
+                    states, hashes, results = [], [], []
+        output[written:] = self.from_states(states, hashes, results)
+        output.flush()
+        del output
+        return count
+
+    @staticmethod
+    def save(path: str, encoded: np.ndarray) -> None:
+        """
+        Writes the <encoded> positions to the .npy file at <path>.
+        """
+        np.save(path, encoded)
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> np.ndarray:
+        """
+        Returns the encoded positions in the .npy file at <path>, memory-mapped
+        read-only unless <mmap> is False.
+        """
+        return np.load(path, mmap_mode='r' if mmap else None)
@@ -0,0 +1,66 @@
+import random
+import pytest
+from GameRecordWriter import GameRecordWriter
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+from Player import Player
+
+np = pytest.importorskip('numpy')
+from PositionEncoder import PositionEncoder  # noqa: E402
+
+
+def random_games(size: int, count: int, seed: int):
+    rng = random.Random(seed)
+    games = []
+    for _ in range(count):
+        onitama = OnitamaGame(size, Player(Pieces.G1), Player(Pieces.G2))
+        for _ in range(rng.randrange(0, 30)):
+            moves = list(onitama.legal_moves())
+            if not moves or onitama.get_winner() is not None:
+                break
+            onitama.move(*rng.choice(moves))
+        games.append(onitama)
+    return games
+
+
+def test_encode_matches_board():
+    for size in (5, 7, 9):
+        encoder = PositionEncoder(size)
+        games = random_games(size, 40, size)
+        encoded = encoder.encode(games)
+        assert encoded.shape == (40,)
+        for onitama, row in zip(games, encoded):
+            board = onitama.get_board()
+            for plane, token in enumerate((Pieces.M1, Pieces.G1, Pieces.M2, Pieces.G2)):
+                expected = [[1 if board[r][c] == token else 0 for c in range(size)] for r in range(size)]
+                assert row['board'][plane].tolist() == expected
+            assert int(row['hash']) == onitama.get_hash()
+            assert encoder.to_state(row) == onitama.get_state()
+
+
+def test_export_records_memory_maps(tmp_path):
+    records = tmp_path / 'games.bin'
+    rng = random.Random(0)
+    with open(records, 'wb') as f:
+        writer = GameRecordWriter(f)
+        for onitama in [OnitamaGame(5, Player(Pieces.G1), Player(Pieces.G2)) for _ in range(5)]:
+            writer.attach(onitama)
+            while onitama.get_winner() is None:
+                onitama.move(*rng.choice(list(onitama.legal_moves())))
+            writer.finish()
+    encoder = PositionEncoder(5)
+    output = str(tmp_path / 'positions.npy')
+    count = encoder.export_records(str(records), output, chunk=7)
+    positions = encoder.load(output)
+    assert isinstance(positions, np.memmap)
+    assert len(positions) == count
+    starts = positions[positions['hash'] == OnitamaGame(5).get_hash()]
+    assert len(starts) == 5
+    assert set(positions['result'].tolist()) <= {1, 2}
+    # Only the last position of a game can be missing a grandmaster.
+    grandmasters = positions['board'][:, [1, 3]].sum(axis=(1, 2, 3))
+    assert int((grandmasters == 2).sum()) >= count - 5
+
+
+if __name__ == "__main__":
+    pytest.main(['PositionEncoder_Tests.py'])
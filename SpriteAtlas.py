@@ -0,0 +1,143 @@
+import mmap
+import os
+import struct
+from typing import Dict, List, Tuple, Union
+
+
+class SpriteAtlas:
+    """
+    A SpriteAtlas class holding sprites that have already been decoded and scaled,
+    as raw 24-bit RGB pixels, so the GUI can turn them into images without
+    decoding or scaling PNGs at startup. A sprite is found by the name of the PNG it
+    was made from and the size it was scaled to.
+
+    An atlas is stored on disk as an 8 byte header (the magic bytes b'ONSA', the
+    format version and the number of sprites), then for every sprite its name, width,
+    height and the offset of its pixels in the file, then the pixels of every sprite,
+    row by row. The file is memory-mapped rather than read, so a sprite's pixels are
+    only loaded when it is first used.
+
+    === Attributes ===
+    path: The file this atlas was opened from.
+
+    === Private Attributes ===
+    _mmap: The memory-mapped file, or None if it has been closed.
+    _index: The offset of the pixels of every sprite, keyed by (name, width, height).
+    """
+    MAGIC: bytes = b'ONSA'
+    VERSION: int = 1
+    HEADER: struct.Struct = struct.Struct('<4sBxH')
+    ENTRY: struct.Struct = struct.Struct('<24sHHI')
+    # The most bytes of a sprite's name an entry holds
+    NAME_LENGTH: int = 24
+    path: str
+    _mmap: Union[mmap.mmap, None]
+    _index: Dict[Tuple[str, int, int], int]
+
+    def __init__(self, path: str, data: mmap.mmap, index: Dict[Tuple[str, int, int], int]) -> None:
+        """
+        Initializes an atlas of the file at <path>, mapped as <data>, with the sprite
+        offsets in <index>. Use SpriteAtlas.open to open an atlas file.
+        """
+        self.path = path
+        self._mmap = data
+        self._index = index
+
+    def __len__(self) -> int:
+        """
+        Returns the number of sprites in this atlas.
+        """
+        return len(self._index)
+
+    def get(self, name: str, width: int, height: int) -> Union[memoryview, None]:
+        """
+        Returns the RGB pixels of the sprite made from the PNG <name> scaled to
+        <width> x <height>, row by row, or None if this atlas does not hold it.
+        The pixels are a view of the mapped file and are only valid until it is closed.
+        """
+        offset = self._index.get((name, width, height))
+        if offset is None or self._mmap is None:
+            return None
+        return memoryview(self._mmap)[offset:offset + 3 * width * height]
+
+    @classmethod
+    def write(cls, path: str, sprites: List[Tuple[str, int, int, bytes]]) -> None:
+        """
+        Writes an atlas of <sprites>, given as (name, width, height, RGB pixels), to
+        the file at <path>.
+        Raises ValueError if a sprite's pixels do not match its size, or if its name
+        is not ASCII or is longer than NAME_LENGTH bytes.
+        >>> import tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), 'atlas.bin')
+        >>> SpriteAtlas.write(path, [('black', 2, 1, bytes(6)), ('crab', 1, 1, b'abc')])
+        >>> atlas = SpriteAtlas.open(path)
+        >>> len(atlas), bytes(atlas.get('crab', 1, 1)), atlas.get('crab', 2, 2)
+        (2, b'abc', None)
+        >>> atlas.close()
+        >>> SpriteAtlas.write(path, [('a' * 25, 1, 1, b'abc')])
+        Traceback (most recent call last):
+        ...
+        ValueError: the sprite name 'aaaaaaaaaaaaaaaaaaaaaaaaa' is longer than 24 bytes
+        """
+        offset = cls.HEADER.size + cls.ENTRY.size * len(sprites)
+        entries = []
+        for name, width, height, pixels in sprites:
+            if len(pixels) != 3 * width * height:
+                raise ValueError(f'the pixels of {name} are not {width}x{height} RGB')
+            encoded = name.encode('ascii')
+            if len(encoded) > cls.NAME_LENGTH:
+                raise ValueError(f'the sprite name {name!r} is longer than {cls.NAME_LENGTH} bytes')
+            entries.append(cls.ENTRY.pack(encoded, width, height, offset))
+            offset += len(pixels)
+        with open(path, 'wb') as f:
+            f.write(cls.HEADER.pack(cls.MAGIC, cls.VERSION, len(sprites)))
+            f.write(b''.join(entries))
+            for sprite in sprites:
+                f.write(sprite[3])
+
+    @classmethod
+    def open(cls, path: str) -> 'SpriteAtlas':
+        """
+        Returns the atlas stored in the file at <path>, memory-mapped.
+        Raises ValueError if the file is not an atlas of this format.
+        """
+        with open(path, 'rb') as f:
+            header = f.read(cls.HEADER.size)
+            if len(header) < cls.HEADER.size:
+                raise ValueError(f'{path} is not a sprite atlas')
+            magic, version, count = cls.HEADER.unpack(header)
+            if magic != cls.MAGIC or version != cls.VERSION:
+                raise ValueError(f'{path} is not a sprite atlas of version {cls.VERSION}')
+            table = f.read(cls.ENTRY.size * count)
+            if len(table) < cls.ENTRY.size * count:
+                raise ValueError(f'{path} is truncated')
+            f.seek(0, 2)
+            length = f.tell()
+            index = {}
+            for name, width, height, offset in cls.ENTRY.iter_unpack(table):
+                if offset + 3 * width * height > length:
+                    raise ValueError(f'{path} is truncated')
+                index[(name.rstrip(b'\0').decode('ascii'), width, height)] = offset
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return cls(path, data, index)
+
+    @classmethod
+    def open_if_exists(cls, path: str) -> Union['SpriteAtlas', None]:
+        """
+        Returns the atlas stored at <path>, or None if there is no readable atlas there.
+        """
+        if not os.path.exists(path):
+            return None
+        try:
+            return cls.open(path)
+        except (OSError, ValueError):
+            return None
+
+    def close(self) -> None:
+        """
+        Unmaps the file of this atlas. The atlas is empty afterwards.
+        """
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._index = {}
@@ -0,0 +1,40 @@
+import pytest
+from SpriteAtlas import SpriteAtlas
+
+
+def test_write_and_open(tmp_path):
+    path = str(tmp_path / 'atlas.bin')
+    sprites = [('black', 3, 2, bytes(range(18))), ('crab', 2, 2, bytes(range(100, 112))),
+               ('crab', 1, 1, b'xyz'), ('c' * 23 + 'a', 1, 1, b'abc')]
+    SpriteAtlas.write(path, sprites)
+    atlas = SpriteAtlas.open(path)
+    assert len(atlas) == 4
+    for name, width, height, pixels in sprites:
+        assert bytes(atlas.get(name, width, height)) == pixels
+    assert atlas.get('crab', 3, 3) is None
+    assert atlas.get('horse', 1, 1) is None
+    assert atlas.get('c' * 24, 1, 1) is None
+    atlas.close()
+    assert atlas.get('black', 3, 2) is None
+
+
+def test_rejects_bad_files(tmp_path):
+    with pytest.raises(ValueError):
+        SpriteAtlas.write(str(tmp_path / 'bad.bin'), [('crab', 2, 2, bytes(3))])
+    with pytest.raises(ValueError):
+        SpriteAtlas.write(str(tmp_path / 'bad.bin'), [('c' * 25, 1, 1, bytes(3))])
+    path = tmp_path / 'atlas.bin'
+    SpriteAtlas.write(str(path), [('crab', 2, 2, bytes(12))])
+    data = path.read_bytes()
+    path.write_bytes(data[:-1])
+    with pytest.raises(ValueError):
+        SpriteAtlas.open(str(path))
+    path.write_bytes(b'ONBK' + data[4:])
+    with pytest.raises(ValueError):
+        SpriteAtlas.open(str(path))
+    assert SpriteAtlas.open_if_exists(str(path)) is None
+    assert SpriteAtlas.open_if_exists(str(tmp_path / 'missing.bin')) is None
+
+
+if __name__ == "__main__":
+    pytest.main(['SpriteAtlas_Tests.py'])
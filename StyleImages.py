@@ -1,7 +1,11 @@
-import pygame
+from __future__ import annotations
+from typing import Dict, TYPE_CHECKING
 
 from ImageGenerator import ImageGenerator
 
+if TYPE_CHECKING:
+    import pygame
+
 
 class StyleImages(ImageGenerator):
     """
@@ -12,18 +16,18 @@ class StyleImages(ImageGenerator):
     HORSE: str = 'horse'
     MANTIS: str = 'mantis'
     ROOSTER: str = 'rooster'
+    FILES: Dict[str, str] = {
+        CRAB:  'crab',
+        DRAGON: 'dragon',
+        HORSE: 'horse',
+        MANTIS: 'mantis',
+        ROOSTER: 'rooster'
+    }
 
     def __init__(self, pygame: pygame, width: int, height: int) -> None:
         """
         Initialize all of the pygame images based on the images in the assets folder.
         """
         super().__init__(pygame)
-        images = {
-            self.CRAB:  'crab',
-            self.DRAGON: 'dragon',
-            self.HORSE: 'horse',
-            self.MANTIS: 'mantis',
-            self.ROOSTER: 'rooster'
-        }
-        self.add_images(images)
+        self.add_images(self.FILES)
         self.scale_images(width, height)
@@ -0,0 +1,53 @@
+from typing import Dict, Tuple
+from Style import Style
+
+# For every origin square, indexed by row * size + col, the squares a style reaches.
+DestinationTable = Tuple[Tuple[Tuple[int, int], ...], ...]
+
+
+class StyleRegistry:
+    """
+    A StyleRegistry class which precomputes, for a style, a board size and whether
+    the style's move pairs are flipped (as they are for player1), the destination
+    squares reachable from every origin square, clipped to the board. Tables are
+    built once and shared by every game.
+
+    === Private Attributes ===
+    _tables: A mapping from (style name, move pairs, flipped, size) to its table.
+    """
+    _tables: Dict[Tuple[str, Tuple[Tuple[int, int], ...], bool, int], DestinationTable] = {}
+
+    @classmethod
+    def get_destinations(cls, style: Style, flipped: bool, size: int) -> DestinationTable:
+        """
+        Returns the destination table of <style> on a board of the given <size>,
+        with the move pairs negated if <flipped>.
+        >>> crab = Style([(-1, 0), (0, -2), (0, 2)], 'crab')
+        >>> table = StyleRegistry.get_destinations(crab, False, 5)
+        >>> table[0]
+        ((0, 2),)
+        >>> table[5 * 2 + 2]
+        ((1, 2), (2, 0), (2, 4))
+        >>> StyleRegistry.get_destinations(crab, True, 5)[0]
+        ((1, 0), (0, 2))
+        >>> table is StyleRegistry.get_destinations(crab, False, 5)
+        True
+        """
+        moves = tuple(style.get_moves())
+        key = (style.name, moves, flipped, size)
+        table = cls._tables.get(key)
+        if table is None:
+            sign = -1 if flipped else 1
+            rows = []
+            for row in range(size):
+                for col in range(size):
+                    dests = []
+                    for d_row, d_col in moves:
+                        row_d = row + sign * d_row
+                        col_d = col + sign * d_col
+                        if 0 <= row_d < size and 0 <= col_d < size:
+                            dests.append((row_d, col_d))
+                    rows.append(tuple(dests))
+            table = tuple(rows)
+            cls._tables[key] = table
+        return table
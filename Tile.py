@@ -1,8 +1,5 @@
 # Import the pygame module
 import pygame
-from pygame.locals import (
-    BLEND_MULT,
-)
 from Entity import Entity
 from OnitamaGame import OnitamaGame
 from Pieces import Pieces
@@ -29,33 +26,22 @@ class Tile(Entity):
         self.row = row
         self.col = col
 
-    def hover(self, mouse_pos: Tuple[int, int]):
-        if self.img_rect and self.img_rect.collidepoint(mouse_pos):
-            token = self.onitama.get_token(self.row, self.col).lower()
-            color = self.COLOR_VALID if token == self.onitama.whose_turn.player_id.lower(
-            ) else self.COLOR_INVALID
-            self.img.fill(color, special_flags=BLEND_MULT)
-            self.img_rect = self.screen.blit(self.img, self.rect)
-            return True
-        return False
+    def appearance(self) -> Tuple:
+        # The player whose turn it is only matters for the tint of clicked and hovered tiles.
+        turn = self.onitama.whose_turn.player_id if self.clicked or self.hovered else None
+        return super().appearance() + (self.onitama.get_token(self.row, self.col), turn)
 
     def draw(self):
         token = self.onitama.get_token(self.row, self.col)
-        self.img = self.pieces.get_image(Pieces.EMPTY, self.row, self.col)
-
-        self.img_rect = self.screen.blit(self.img,
-                                         self.rect)
-        if token != Pieces.EMPTY:
-            # Draw the token image on top of the background
-            self.img = self.pieces.get_image(token, self.row, self.col)
-            self.img.set_colorkey((0, 0, 0))
-
+        # Green if the token belongs to the current player, red otherwise.
+        color = self.COLOR_VALID if token.lower() == self.onitama.whose_turn.player_id.lower(
+        ) else self.COLOR_INVALID
+        tints = []
         if self.clicked:
-            color = self.COLOR_VALID if token.lower() == self.onitama.whose_turn.player_id.lower(
-            ) else self.COLOR_INVALID
-            self.img.fill(color, special_flags=BLEND_MULT)
-            self.img_rect = self.screen.blit(self.img, self.rect)
+            tints.append(color)
         elif self.highlighted:
-            self.img.fill(self.HIGHLIGHTED_COLOR, special_flags=BLEND_MULT)
-            self.img_rect = self.screen.blit(self.img, self.rect)
+            tints.append(self.HIGHLIGHTED_COLOR)
+        if self.hovered:
+            tints.append(color)
+        self.img = self.pieces.get_tile(token, self.row, self.col, tuple(tints))
         self.img_rect = self.screen.blit(self.img, self.rect)
@@ -0,0 +1,82 @@
+from random import Random
+from typing import Dict, List, Tuple
+from Pieces import Pieces
+
+
+class Zobrist:
+    """
+    A Zobrist class holding the random 64-bit keys used to hash Onitama positions.
+    The hash of a position is the XOR of the key of every token on its square, the
+    key of every style with its owner, and the turn key if it is player2's turn.
+
+    Keys are derived from fixed seeds, so the hash of a position is the same in
+    every run and can be stored on disk.
+
+    === Attributes ===
+    size : the board size these keys are for.
+    turn : the key XORed in when it is player2's turn.
+
+    === Private Attributes ===
+    _pieces : a mapping from each piece token to its key on every square, indexed
+              by row * size + col.
+    _styles : a cache of the keys of (style name, owner) pairs.
+    """
+    TOKENS: Tuple[str, str, str, str] = (Pieces.M1, Pieces.G1, Pieces.M2, Pieces.G2)
+    _instances: Dict[int, 'Zobrist'] = {}
+    size: int
+    turn: int
+    _pieces: Dict[str, List[int]]
+    _styles: Dict[Tuple[str, str], int]
+
+    def __init__(self, size: int) -> None:
+        """
+        Generates the keys for a board of the given <size>. Use Zobrist.for_size to
+        share one set of keys between games.
+        """
+        self.size = size
+        rng = Random(f'onitama-zobrist-{size}')
+        self._pieces = {token: [rng.getrandbits(64) for _ in range(size * size)] for token in self.TOKENS}
+        self.turn = rng.getrandbits(64)
+        self._styles = {}
+
+    @classmethod
+    def for_size(cls, size: int) -> 'Zobrist':
+        """
+        Returns the shared keys for a board of the given <size>.
+        >>> Zobrist.for_size(5) is Zobrist.for_size(5)
+        True
+        >>> Zobrist.for_size(5).turn == Zobrist(5).turn
+        True
+        """
+        if size not in cls._instances:
+            cls._instances[size] = cls(size)
+        return cls._instances[size]
+
+    def piece(self, row: int, col: int, token: str) -> int:
+        """
+        Returns the key of <token> on the square at <row> <col>, or 0 for the empty token.
+        >>> z = Zobrist(5)
+        >>> z.piece(0, 0, Pieces.EMPTY)
+        0
+        >>> z.piece(0, 0, Pieces.M1) != z.piece(0, 1, Pieces.M1)
+        True
+        """
+        keys = self._pieces.get(token)
+        if keys is None:
+            return 0
+        return keys[row * self.size + col]
+
+    def style(self, name: str, owner: str) -> int:
+        """
+        Returns the key of the style called <name> being owned by <owner>.
+        >>> z = Zobrist(5)
+        >>> z.style('crab', Pieces.G1) == Zobrist(7).style('crab', Pieces.G1)
+        True
+        >>> z.style('crab', Pieces.G1) != z.style('crab', Pieces.EMPTY)
+        True
+        """
+        key = self._styles.get((name, owner))
+        if key is None:
+            key = Random(f'onitama-zobrist-style-{name}-{owner}').getrandbits(64)
+            self._styles[(name, owner)] = key
+        return key
@@ -0,0 +1,279 @@
+"""
+Benchmark suite for the hot paths of the rules engine. Every benchmark is run on
+5x5, 7x7 and 9x9 boards from a fixed set of positions, and reports operations per
+second, the bytes allocated on top of the live memory while each operation runs,
+per operation, and the peak memory traced while a batch of operations runs.
+
+Results are written as JSON so that they can be compared between commits:
+    python bench.py --output bench_output.json
+    python bench.py --compare bench_output.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import tracemalloc
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Tuple, Union
+from Evaluator import Evaluator
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+from Player import PlayerRandom
+
+SIZES = (5, 7, 9)
+# A benchmark: the items to run it on, and a step that runs it on one item and
+# returns the number of operations it performed
+Benchmark = Tuple[List[Any], Callable[[Any], int]]
+
+
+def sample_positions(size: int, count: int, seed: int) -> List[OnitamaGame]:
+    """
+    Returns <count> games of the given <size>, each advanced by a random number of
+    random moves, for benchmarks to run on.
+    """
+    rng = random.Random(seed)
+    games = []
+    while len(games) < count:
+        onitama = OnitamaGame(size)
+        for _ in range(rng.randrange(0, 4 * size)):
+            moves = list(onitama.legal_moves())
+            if not moves or onitama.get_winner() is not None:
+                break
+            onitama.move(*rng.choice(moves))
+        if onitama.get_winner() is None and next(onitama.legal_moves(), None) is not None:
+            games.append(onitama)
+    return games
+
+
+def run_batch(benchmark: Benchmark) -> int:
+    """
+    Runs the step of <benchmark> on every one of its items and returns the number
+    of operations performed.
+    >>> run_batch(([1, 2, 3], lambda item: item))
+    6
+    """
+    items, step = benchmark
+    ops = 0
+    for item in items:
+        ops += step(item)
+    return ops
+
+
+def measure(benchmark: Benchmark, min_seconds: float) -> Dict[str, float]:
+    """
+    Repeats batches of <benchmark> for at least <min_seconds>, then runs one more
+    batch under tracemalloc. Returns the operations per second, the bytes each step
+    allocated on top of the memory live before it, per operation, and the peak
+    number of bytes traced above the starting point during the batch. Memory a
+    step allocates and frees again, such as a copy of the board, is counted.
+    """
+    ops = 0
+    start = perf_counter()
+    while True:
+        ops += run_batch(benchmark)
+        elapsed = perf_counter() - start
+        if elapsed >= min_seconds:
+            break
+    items, step = benchmark
+    tracemalloc.start()
+    start_bytes = tracemalloc.get_traced_memory()[0]
+    peak_bytes = 0
+    step_bytes = 0
+    count = 0
+    for item in items:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        count += step(item)
+        peak = tracemalloc.get_traced_memory()[1]
+        step_bytes += peak - before
+        peak_bytes = max(peak_bytes, peak - start_bytes)
+    tracemalloc.stop()
+    return {'ops': ops, 'seconds': elapsed, 'ops_per_second': ops / elapsed,
+            'step_bytes_per_op': step_bytes / max(count, 1), 'peak_bytes': peak_bytes}
+
+
+def bench_move(games: List[OnitamaGame]) -> Benchmark:
+    """
+    Makes and takes back the first legal move of every position.
+    """
+    def step(pair: Tuple) -> int:
+        onitama, move = pair
+        onitama.move(*move)
+        onitama.undo()
+        return 1
+    return [(onitama, next(onitama.legal_moves())) for onitama in games], step
+
+
+def bench_undo(games: List[OnitamaGame]) -> Benchmark:
+    """
+    Takes back and replays the last move of every position.
+    """
+    def step(pair: Tuple) -> int:
+        onitama, record = pair
+        onitama.undo()
+        onitama.move(record.row_o, record.col_o, record.row_d, record.col_d, record.style_name)
+        return 1
+    return [(onitama, onitama.onitama_stack.peek()) for onitama in games if not onitama.onitama_stack.empty()], step
+
+
+def bench_get_winner(games: List[OnitamaGame]) -> Benchmark:
+    """
+    Asks every position for its winner.
+    """
+    def step(onitama: OnitamaGame) -> int:
+        onitama.get_winner()
+        return 1
+    return games, step
+
+
+def bench_is_legal_move(games: List[OnitamaGame]) -> Benchmark:
+    """
+    Checks every origin and destination pair of the side to move in every position.
+    """
+    checks = []
+    for onitama in games:
+        origins = sorted(onitama.get_positions(onitama.whose_turn.player_id))
+        checks.append((onitama, [(row, col, row + d_row, col + d_col) for row, col in origins
+                                 for d_row in (-1, 0, 1) for d_col in (-2, 0, 2)]))
+
+    def step(check: Tuple) -> int:
+        onitama, candidates = check
+        for candidate in candidates:
+            onitama.is_legal_move(*candidate)
+        return len(candidates)
+    return checks, step
+
+
+def bench_get_valid_turns(games: List[OnitamaGame]) -> Benchmark:
+    """
+    Builds the valid turns of the side to move in every position.
+    """
+    def step(onitama: OnitamaGame) -> int:
+        onitama.whose_turn.get_valid_turns()
+        return 1
+    return games, step
+
+
+def bench_evaluate(games: List[OnitamaGame]) -> Benchmark:
+    """
+    Evaluates every position after each of its legal moves with an attached
+    Evaluator, taking the move back afterwards, as a search does at its horizon.
+    """
+    evaluator = Evaluator()
+
+    def step(case: Tuple) -> int:
+        onitama, moves = case
+        evaluator.attach(onitama)
+        for move in moves:
+            onitama.move(*move)
+            evaluator.evaluate(onitama)
+            onitama.undo()
+        evaluator.detach()
+        return len(moves)
+    return [(onitama, list(onitama.legal_moves())) for onitama in games], step
+
+
+def bench_random_game(size: int, seed: int, max_plies: int = 300) -> Benchmark:
+    """
+    Plays whole games between two PlayerRandoms, counting plies as operations.
+    """
+    def step(rng: random.Random) -> int:
+        random.seed(rng.random())
+        onitama = OnitamaGame(size, PlayerRandom(Pieces.G1), PlayerRandom(Pieces.G2))
+        plies = 0
+        while onitama.get_winner() is None and plies < max_plies:
+            turn = onitama.whose_turn.get_turn()
+            if turn is None:
+                break
+            onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+            plies += 1
+        return max(plies, 1)
+    return [random.Random(seed)], step
+
+
+def run_benchmarks(sizes=SIZES, positions: int = 50, min_seconds: float = 0.5, seed: int = 0) -> Dict:
+    """
+    Runs every benchmark on every board size and returns the results.
+    """
+    results = {}
+    for size in sizes:
+        games = sample_positions(size, positions, seed)
+        cases = {
+            'move': bench_move(games),
+            'undo': bench_undo(games),
+            'get_winner': bench_get_winner(games),
+            'is_legal_move': bench_is_legal_move(games),
+            'get_valid_turns': bench_get_valid_turns(games),
+            'evaluate': bench_evaluate(games),
+            'random_game_ply': bench_random_game(size, seed),
+        }
+        for name, benchmark in cases.items():
+            results[f'{name}[{size}]'] = measure(benchmark, min_seconds)
+    return results
+
+
+def git_commit() -> Union[str, None]:
+    """
+    Returns the hash of the checked out commit, or None if it is unknown.
+    """
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(baseline: Dict, current: Dict) -> List[str]:
+    """
+    Returns one line per benchmark comparing <current> ops/sec against <baseline>.
+    >>> compare({'results': {'move[5]': {'ops_per_second': 100.0}}},\
+     {'results': {'move[5]': {'ops_per_second': 150.0}}})
+    ['move[5]: 100 -> 150 ops/s (+50.0%)']
+    """
+    lines = []
+    for name, result in current['results'].items():
+        old = baseline['results'].get(name)
+        if old is None:
+            continue
+        change = result['ops_per_second'] / old['ops_per_second'] - 1
+        lines.append(f'{name}: {old["ops_per_second"]:.0f} -> {result["ops_per_second"]:.0f} ops/s ({change:+.1%})')
+    return lines
+
+
+def main(argv: Union[List[str], None] = None) -> None:
+    """
+    Parses the command line in <argv>, runs the benchmarks and writes the results.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark the Onitama rules engine.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(SIZES), help='board sizes to benchmark')
+    parser.add_argument('--positions', type=int, default=50, help='number of sample positions per size')
+    parser.add_argument('--min-seconds', type=float, default=0.5, help='minimum time per benchmark')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the sample positions')
+    parser.add_argument('--output', help='file to write the JSON results to, instead of stdout')
+    parser.add_argument('--compare', help='JSON results of an earlier run to compare against')
+    args = parser.parse_args(argv)
+
+    report = {
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'settings': {'sizes': args.sizes, 'positions': args.positions, 'seed': args.seed},
+        'results': run_benchmarks(args.sizes, args.positions, args.min_seconds, args.seed),
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        for line in compare(baseline, report):
+            print(line, file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Builds the sprite atlas the GUI loads its images from. The images of the pieces
+and squares, the style cards and the background are decoded and scaled once, to
+the sizes the GUI draws them at, and their pixels are written to a single file.
+The GUI memory-maps that file and turns each sprite into an image the first time
+it is drawn, so starting the GUI decodes and scales no PNGs.
+
+The atlas must be rebuilt when the images or the sizes change. Images that are
+not in the atlas at the size they are drawn at are still loaded from their PNGs.
+pygame needs a display to convert images; on a machine without one, set
+SDL_VIDEODRIVER=dummy.
+
+Example:
+    python build_atlas.py --output assets/atlas.bin
+"""
+import argparse
+from typing import List, Tuple, Union
+import pygame
+from ImageGenerator import ImageGenerator
+from Pieces import Pieces
+from SpriteAtlas import SpriteAtlas
+from StyleCard import StyleCard
+from StyleImages import StyleImages
+from Tile import Tile
+from main import Screen
+
+DEFAULT_PATH = ImageGenerator.atlas_path
+
+
+def sprites(tile_size: Tuple[int, int], card_size: Tuple[int, int],
+            screen_size: Tuple[int, int]) -> List[Tuple[str, int, int]]:
+    """
+    Returns the (filename, width, height) of every sprite the GUI draws, with tiles,
+    style cards and the screen of the given sizes.
+    >>> sprites((100, 100), (200, 125), (1000, 800))[-1]
+    ('space', 1000, 800)
+    >>> len(sprites((100, 100), (200, 125), (1000, 800)))
+    12
+    """
+    result = [(filename, *tile_size) for filename in Pieces.FILES.values()]
+    result += [(filename, *card_size) for filename in StyleImages.FILES.values()]
+    result.append((Screen.BG_IMG, *screen_size))
+    return result
+
+
+def render(filename: str, width: int, height: int) -> bytes:
+    """
+    Returns the RGB pixels of the PNG <filename> scaled to <width> x <height>, as
+    the GUI would load it. The display must be initialized.
+    """
+    img = pygame.image.load(f'{ImageGenerator.img_dir}/{filename}.png').convert()
+    img = pygame.transform.smoothscale(img, (width, height))
+    return pygame.image.tobytes(img, 'RGB')
+
+
+def build(path: str, entries: List[Tuple[str, int, int]]) -> None:
+    """
+    Renders every sprite in <entries> and writes them as an atlas to the file at <path>.
+    """
+    pygame.display.init()
+    try:
+        # Converting images needs a display mode, so open a hidden one.
+        pygame.display.set_mode((1, 1), pygame.HIDDEN)
+        SpriteAtlas.write(path, [(filename, width, height, render(filename, width, height))
+                                 for filename, width, height in entries])
+    finally:
+        pygame.display.quit()
+
+
+def main(argv: Union[List[str], None] = None) -> List[Tuple[str, int, int]]:
+    """
+    Parses the command line in <argv>, builds the atlas and writes it to disk.
+    """
+    parser = argparse.ArgumentParser(description='Build the sprite atlas of the Onitama GUI.')
+    parser.add_argument('--tile-size', type=int, nargs=2, default=[Tile.width, Tile.height],
+                        metavar=('WIDTH', 'HEIGHT'), help='size of a board tile')
+    parser.add_argument('--card-size', type=int, nargs=2, default=[StyleCard.width, StyleCard.height],
+                        metavar=('WIDTH', 'HEIGHT'), help='size of a style card')
+    parser.add_argument('--screen-size', type=int, nargs=2, default=[Screen.SCREEN_WIDTH, Screen.SCREEN_HEIGHT],
+                        metavar=('WIDTH', 'HEIGHT'), help='size of the window')
+    parser.add_argument('--output', default=DEFAULT_PATH, help='file to write the atlas to')
+    args = parser.parse_args(argv)
+    sizes = (args.tile_size, args.card_size, args.screen_size)
+    if any(length < 1 for size in sizes for length in size):
+        parser.error('sizes must be positive')
+
+    entries = sprites(*(tuple(size) for size in sizes))
+    build(args.output, entries)
+    print(f'{len(entries)} sprites written to {args.output}')
+    return entries
+
+
+if __name__ == '__main__':
+    main()
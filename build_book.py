@@ -0,0 +1,100 @@
+"""
+Builds the opening book for the standard deal. Every position reachable within
+the given number of plies of the starting position is searched with
+PlayerMinimax, and the best move found is stored under the position's hash.
+
+Example:
+    python build_book.py --size 5 --plies 4 --time-limit 0.5 --workers 4 --output opening_book.bin
+"""
+import argparse
+from typing import Dict, List, Tuple, Union
+from OnitamaGame import OnitamaGame
+from OpeningBook import OpeningBook
+from ParallelSearch import ParallelSearch
+from Pieces import Pieces
+from Player import Player
+from PlayerMinimax import PlayerMinimax
+
+DEFAULT_PATH = 'opening_book.bin'
+
+
+def opening_positions(size: int, plies: int) -> List[Tuple]:
+    """
+    Returns the state of every distinct position, by hash, that can be reached
+    within fewer than <plies> plies of the starting position and is not over.
+    >>> len(opening_positions(5, 1)), len(opening_positions(5, 2))
+    (1, 11)
+    """
+    onitama = OnitamaGame(size, Player(Pieces.G1), Player(Pieces.G2))
+    if plies < 1:
+        return []
+    # Expand ply by ply, so every position is first found at its shallowest ply
+    # and its moves are followed from there.
+    seen = {onitama.get_hash()}
+    states = [onitama.get_state()]
+    frontier = list(states)
+    for _ in range(plies - 1):
+        reached = []
+        for state in frontier:
+            onitama.set_state(state)
+            for move in list(onitama.legal_moves()):
+                onitama.move(*move)
+                key = onitama.get_hash()
+                if key not in seen and onitama.get_winner() is None:
+                    seen.add(key)
+                    reached.append(onitama.get_state())
+                onitama.undo()
+        states += reached
+        frontier = reached
+    return states
+
+
+def _best_move(task: Tuple) -> Tuple[int, Union[int, None]]:
+    """
+    Searches one position in a worker process and returns its hash and the best
+    move packed by encode_move, or None if there is no legal move. A task is the
+    state of the game and the time limit of the search.
+    """
+    state, time_limit = task
+    onitama = OnitamaGame.from_state(state)
+    move = PlayerMinimax(onitama.whose_turn.player_id, time_limit=time_limit).choose_move(onitama)
+    return onitama.get_hash(), None if move is None else onitama.encode_move(move)
+
+
+def build(size: int, plies: int, time_limit: float, workers: int = 1) -> OpeningBook:
+    """
+    Returns a book for boards of <size> covering the first <plies> plies, searching
+    each position for <time_limit> seconds on <workers> processes.
+    """
+    pool = ParallelSearch(workers)
+    tasks = [(state, time_limit) for state in opening_positions(size, plies)]
+    entries: Dict[int, int] = {}
+    for key, code in pool.map(_best_move, tasks):
+        if code is not None:
+            entries[key] = code
+    pool.shutdown()
+    return OpeningBook(size, plies, entries)
+
+
+def main(argv: Union[List[str], None] = None) -> OpeningBook:
+    """
+    Parses the command line in <argv>, builds the book and writes it to disk.
+    """
+    parser = argparse.ArgumentParser(description='Build the Onitama opening book.')
+    parser.add_argument('--size', type=int, default=5, help='board size, odd and at least 5')
+    parser.add_argument('--plies', type=int, default=4, help='number of plies from the start to cover')
+    parser.add_argument('--time-limit', type=float, default=0.5, help='seconds to search each position')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to search with')
+    parser.add_argument('--output', default=DEFAULT_PATH, help='file to write the book to')
+    args = parser.parse_args(argv)
+    if args.size % 2 == 0 or args.size < 5:
+        parser.error('--size must be odd and at least 5')
+
+    book = build(args.size, args.plies, args.time_limit, args.workers)
+    book.save(args.output)
+    print(f'{len(book)} positions written to {args.output}')
+    return book
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Builds the endgame tablebase. Every position of the given board size in which
+neither player has more than K tokens is enumerated under the standard five
+styles, the moves between them are generated once, and the positions are solved
+by retrograde analysis: starting from the positions with an immediately winning
+move, wins and losses are propagated backwards along the moves, one ply at a time.
+Positions that are never reached by this propagation are draws.
+
+The number of positions grows quickly with K. On a 5x5 board, K = 1 (grandmasters
+only) has about 33 thousand positions, while K = 2 has about 20 million.
+
+Example:
+    python build_tablebase.py --size 5 --pieces 1 --output endgame_tablebase.bin
+"""
+import argparse
+from collections import deque
+from itertools import combinations
+from typing import Dict, Iterator, List, Tuple, Union
+from EndgameTablebase import EndgameTablebase
+from OnitamaGame import OnitamaGame
+from Pieces import Pieces
+from Player import Player
+
+DEFAULT_PATH = 'endgame_tablebase.bin'
+
+
+def deals(styles: int = 5) -> Iterator[Tuple[str, ...]]:
+    """
+    Yields every way of dealing <styles> styles: two to player1, two to player2
+    and one to the side, as the owner of every style in order.
+    >>> len(list(deals()))
+    30
+    >>> next(deals())
+    ('X', 'X', 'Y', 'Y', ' ')
+    """
+    indices = range(styles)
+    for first in combinations(indices, 2):
+        rest = [i for i in indices if i not in first]
+        for second in combinations(rest, 2):
+            owners = [Pieces.EMPTY] * styles
+            for i in first:
+                owners[i] = Pieces.G1
+            for i in second:
+                owners[i] = Pieces.G2
+            yield tuple(owners)
+
+
+def placements(size: int, max_pieces: int) -> Iterator[Tuple[int, int, int, int]]:
+    """
+    Yields the token masks, in BitBoard.TOKENS order, of every placement with both
+    grandmasters and at most <max_pieces> - 1 monks per player.
+    >>> len(list(placements(5, 1)))
+    600
+    """
+    squares = size * size
+    for g1 in range(squares):
+        for g2 in range(squares):
+            if g2 == g1:
+                continue
+            free = [i for i in range(squares) if i != g1 and i != g2]
+            for m1_count in range(max_pieces):
+                for m1 in combinations(free, m1_count):
+                    left = [i for i in free if i not in m1]
+                    m1_mask = sum(1 << i for i in m1)
+                    for m2_count in range(max_pieces):
+                        for m2 in combinations(left, m2_count):
+                            yield m1_mask, 1 << g1, sum(1 << i for i in m2), 1 << g2
+
+
+def solve(size: int, max_pieces: int) -> Dict[int, int]:
+    """
+    Returns the value of every position of <size> in which neither player has more
+    than <max_pieces> tokens and the game is not over, keyed by position hash.
+    """
+    onitama = OnitamaGame(size, Player(Pieces.G1), Player(Pieces.G2))
+    keys: List[int] = []
+    index: Dict[int, int] = {}
+    children: List[List[int]] = []
+    values: List[Union[int, None]] = []
+    pending: List[Tuple] = []
+    for masks in placements(size, max_pieces):
+        for owners in deals(len(onitama.get_styles())):
+            for turn in (Pieces.G1, Pieces.G2):
+                onitama.set_state((size, Pieces.G1, Pieces.G2, masks, owners, turn))
+                if onitama.get_winner() is not None:
+                    continue
+                key = onitama.get_hash()
+                if key in index:
+                    continue
+                index[key] = len(keys)
+                keys.append(key)
+                pending.append(onitama.get_state())
+
+    # Generate the moves out of every position, keeping only those into positions
+    # that are not over; a move that ends the game wins it for the mover.
+    queue = deque()
+    for i, state in enumerate(pending):
+        onitama.set_state(state)
+        targets = set()
+        wins = False
+        for move in list(onitama.legal_moves()):
+            onitama.move(*move)
+            if onitama.get_winner() is not None:
+                wins = True
+            else:
+                targets.add(index[onitama.get_hash()])
+            onitama.undo()
+        children.append(list(targets))
+        values.append(1 if wins else None)
+        if wins:
+            queue.append(i)
+
+    parents: List[List[int]] = [[] for _ in keys]
+    for i, targets in enumerate(children):
+        for j in targets:
+            parents[j].append(i)
+    remaining = [len(targets) for targets in children]
+
+    # A position is won if some move leads to a lost position, and lost once every
+    # move leads to a won one. The queue holds positions in order of distance.
+    while queue:
+        j = queue.popleft()
+        value = values[j]
+        for i in parents[j]:
+            if values[i] is not None:
+                continue
+            if value < 0:
+                values[i] = 1 - value
+                queue.append(i)
+            else:
+                remaining[i] -= 1
+                if remaining[i] == 0:
+                    values[i] = -(value + 1)
+                    queue.append(i)
+    return {key: 0 if value is None else value for key, value in zip(keys, values)}
+
+
+def build(size: int, max_pieces: int) -> EndgameTablebase:
+    """
+    Returns the solved tablebase for boards of <size> and at most <max_pieces>
+    tokens per player.
+    """
+    return EndgameTablebase(size, max_pieces, solve(size, max_pieces))
+
+
+def main(argv: Union[List[str], None] = None) -> EndgameTablebase:
+    """
+    Parses the command line in <argv>, builds the tablebase and writes it to disk.
+    """
+    parser = argparse.ArgumentParser(description='Build the Onitama endgame tablebase.')
+    parser.add_argument('--size', type=int, default=5, help='board size, odd and at least 5')
+    parser.add_argument('--pieces', type=int, default=1, help='most tokens per player, grandmaster included')
+    parser.add_argument('--output', default=DEFAULT_PATH, help='file to write the tablebase to')
+    args = parser.parse_args(argv)
+    if args.size % 2 == 0 or args.size < 5:
+        parser.error('--size must be odd and at least 5')
+    if args.pieces < 1:
+        parser.error('--pieces must be at least 1')
+
+    tablebase = build(args.size, args.pieces)
+    tablebase.save(args.output)
+    wins = sum(1 for value in tablebase._values if value > 0)
+    losses = sum(1 for value in tablebase._values if value < 0)
+    print(f'{len(tablebase)} positions written to {args.output}: '
+          f'{wins} wins, {losses} losses, {len(tablebase) - wins - losses} draws for the player to move')
+    return tablebase
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,36 @@
+"""
+Exports every position of a file of GameRecords, as written by selfplay.py
+--record, to a .npy file of PositionEncoder rows that can be memory-mapped.
+
+Example:
+    python selfplay.py --games 1000 --record games.bin
+    python export_positions.py --records games.bin --size 5 --output positions.npy
+"""
+import argparse
+from typing import List, Union
+from PositionEncoder import PositionEncoder
+
+
+def main(argv: Union[List[str], None] = None) -> int:
+    """
+    Parses the command line in <argv>, exports the positions and prints a summary.
+    """
+    parser = argparse.ArgumentParser(description='Export Onitama positions to a NumPy array.')
+    parser.add_argument('--records', required=True, help='file of GameRecords to read')
+    parser.add_argument('--size', type=int, default=5, help='board size of the games to export')
+    parser.add_argument('--output', default='positions.npy', help='.npy file to write the positions to')
+    args = parser.parse_args(argv)
+
+    encoder = PositionEncoder(args.size)
+    count = encoder.export_records(args.records, args.output)
+    positions = encoder.load(args.output)
+    print(f'{count} positions written to {args.output}')
+    if count:
+        tokens = positions['board'].sum(axis=(2, 3), dtype='int64').mean(axis=0)
+        print(f'  mean tokens: x {tokens[0]:.2f}, X {tokens[1]:.2f}, y {tokens[2]:.2f}, Y {tokens[3]:.2f}')
+        print(f'  distinct positions: {len(set(positions["hash"].tolist()))}')
+    return count
+
+
+if __name__ == '__main__':
+    main()
@@ -4,18 +4,28 @@ import pygame
 # Updated to conform to flake8 and black standards
 from pygame.locals import (
     MOUSEBUTTONUP,
+    NOEVENT,
     K_ESCAPE,
     KEYDOWN,
     QUIT,
 )
 from Player import Player, PlayerRandom
+from PlayerMinimax import PlayerMinimax
+from PlayerMCTS import PlayerMCTS
+from OpeningBook import OpeningBook
+from EndgameTablebase import EndgameTablebase
 from OnitamaGame import OnitamaGame
 from Pieces import Pieces
+from BackgroundSearch import BackgroundSearch
 from Button import Button
+from Entity import Entity
+from HitGrid import HitGrid
+from ImageGenerator import ImageGenerator
+from LegalMoveMap import LegalMoveMap
 from StyleImages import StyleImages
 from Tile import Tile
 from StyleCard import StyleCard
-from typing import List, Tuple
+from typing import List, Tuple, Union
 
 
 class Screen:
@@ -26,14 +36,34 @@ class Screen:
     SCREEN_WIDTH: int = 1000
     SCREEN_HEIGHT: int = 800
     BG: Tuple[int, int, int] = (0, 255, 0)
-    BG_IMG: str = './assets/img/space.png'
-    #BG_IMG: str = './assets/img/sayu_cry.gif'
+    # Filename of the background image in ImageGenerator.img_dir, without the .png extension.
+    BG_IMG: str = 'space'
+    # Number of seconds the HvR opponent may think about each move.
+    AI_TIME_LIMIT: float = 1.0
+    # Maximum number of seconds the HvR opponent may ponder on the human's time.
+    PONDER_TIME_LIMIT: float = 60.0
+    # Opening book the HvR opponent plays from, if it has been built with build_book.py.
+    BOOK_PATH: str = './opening_book.bin'
+    # Endgame tablebase the HvR opponent plays from, if it has been built with build_tablebase.py.
+    TABLEBASE_PATH: str = './endgame_tablebase.bin'
+    # Maximum number of frames drawn per second.
+    FPS: int = 60
+    # Number of milliseconds to sleep waiting for input when there is nothing to do.
+    IDLE_WAIT: int = 500
     tiles: List[Tile]
     dest_tiles: List[Tile]
+    # Legal destination squares of the current position by origin square and style name.
+    legal_map: LegalMoveMap
     player_styles: List[StyleCard]
     buttons: List[Button]
+    hit_grid: HitGrid
+    # The entity under the mouse, if any.
+    hovered: Union[Entity, None]
     pieces: Pieces
     style_images: StyleImages
+    search: BackgroundSearch
+    # Time in milliseconds at which the AI player started thinking about its move.
+    ai_started: int
     mouse_pos: Tuple[int, int]
     tile_origin: Tile
     tile_dest: Tile
@@ -58,12 +88,15 @@ class Screen:
             (self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
 
         self.pieces = Pieces(pygame, Tile.width, Tile.height)
-        self.style_images = StyleImages(pygame, 200, 125)
+        self.style_images = StyleImages(pygame, StyleCard.width, StyleCard.height)
         # Load the background
-        img = pygame.image.load(self.BG_IMG).convert()
-        img = pygame.transform.smoothscale(
-            img, (self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
-        self.screen.blit(img, (0, 0))
+        background = ImageGenerator(pygame)
+        background.add_images({self.BG_IMG: self.BG_IMG})
+        background.scale_images(self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
+        self.screen.blit(background.load(self.BG_IMG), (0, 0))
+        self.search = BackgroundSearch()
+        self.ai_started = 0
+        self.buttons = []
         self.reset()  # Initialize the game, tiles and style cards.
         # Create buttons that will be needed for the game.
         # Different Game Modes
@@ -74,6 +107,7 @@ class Screen:
         undo = Button(self.screen, self.onitama, 775, 475, 'Undo')
         reset = Button(self.screen, self.onitama, 775, 575, 'Reset')
         self.buttons = [hvh, hvr, rvr, undo, reset]
+        self.init_hit_grid()
         # Update the display
         self.draw()
         pygame.display.flip()
@@ -95,6 +129,16 @@ class Screen:
                          offset_y=offset_y
                          ))
 
+    def init_hit_grid(self) -> None:
+        """
+        Index the areas of the tiles, style cards and buttons for hover and click dispatch.
+        The grid's cells are the board's tiles, so a tile is found straight from its row and column.
+        """
+        self.hit_grid = HitGrid(Tile.width, Tile.height, self.tiles[0].rect)
+        for entity in self.tiles + self.player_styles + self.buttons:
+            self.hit_grid.add(entity, entity.get_area())
+        self.hovered = None
+
     def init_player_styles(self, offset_x=0, offset_y=12) -> None:
         """
         Initialize all of the player styles of Onitama.
@@ -173,8 +217,10 @@ class Screen:
         """
         Reset all clicked status on the tiles and style cards.
         """
-        for tile in self.tiles:
-            tile.clicked = False
+        # Only the origin and destination tiles can have been clicked.
+        for tile in (self.tile_origin, self.tile_dest):
+            if tile:
+                tile.clicked = False
 
         for sty in self.player_styles:
             sty.clicked = False
@@ -188,9 +234,11 @@ class Screen:
         """
         Reset this game of Onitama to a new game and reset all relevant variables to their initial state.
         """
+        self.search.cancel()
         self.onitama = OnitamaGame()
         self.tiles = []
         self.dest_tiles = []
+        self.legal_map = LegalMoveMap()
         self.tile_origin = None
         self.tile_dest = None
         offset_x = (self.SCREEN_WIDTH -
@@ -201,6 +249,7 @@ class Screen:
         self.init_tiles(offset_x, offset_y)
         self.init_player_styles(offset_x=offset_x)
         self.update_styles()
+        self.init_hit_grid()
         self.set_op(0)
 
     def check_winner(self) -> None:
@@ -211,15 +260,30 @@ class Screen:
             # TODO: Add who won somewhere on the screen.
             self.game_running = False
 
+    def is_ai_turn(self) -> bool:
+        """
+        Returns whether the game is running and it is an AI player's turn.
+        """
+        return self.game_running and isinstance(self.onitama.whose_turn, (PlayerRandom, PlayerMinimax, PlayerMCTS))
+
     def move_ai(self) -> None:
         """
         Make an AI player's move on onitama if needed.
+        The move is searched for in the background, and made once the search has finished.
         """
-        if isinstance(self.onitama.whose_turn, PlayerRandom):
-            # time delay in milliseconds for the AI when watching RvR simulation is 500, 250 for HvR
-            time_delay = 500 if self.game_mode == 2 else 250
-            pygame.time.delay(time_delay)
-            turn = self.onitama.whose_turn.get_turn()
+        if not self.is_ai_turn():
+            return
+        # The AI player thinks on a worker thread so the GUI keeps responding.
+        if not self.search.is_pending():
+            if self.search.start(self.onitama.whose_turn, self.onitama):
+                self.ai_started = pygame.time.get_ticks()
+            return
+        # time delay in milliseconds for the AI when watching RvR simulation is 500, 250 for HvR
+        time_delay = 500 if self.game_mode == 2 else 250
+        if pygame.time.get_ticks() - self.ai_started < time_delay:
+            return
+        finished, turn = self.search.poll()
+        if finished:
             if turn is not None:
                 self.onitama.move(turn.row_o, turn.col_o,
                                   turn.row_d, turn.col_d, turn.style_name)
@@ -227,6 +291,16 @@ class Screen:
                 self.reset_clicks()
             self.check_winner()
 
+    def ponder(self) -> None:
+        """
+        Let the AI opponent of HvR think on the human player's time if it is not already.
+        """
+        if self.game_mode != 1 or not self.game_running or self.is_ai_turn() or self.search.is_pending():
+            return
+        op = self.onitama.other_player(self.onitama.whose_turn)
+        if isinstance(op, (PlayerMinimax, PlayerMCTS)):
+            self.search.ponder(op, self.onitama, self.PONDER_TIME_LIMIT)
+
     def move(self) -> None:
         """
         Make a human player's move on onitama.
@@ -237,6 +311,8 @@ class Screen:
         col_d = self.tile_dest.col
         style_name = self.chosen_style.style_name
         if self.onitama.move(row_o, col_o, row_d, col_d, style_name):
+            # Stop the AI player pondering so that it can search the actual position.
+            self.search.cancel()
             self.update_styles()
             self.reset_clicks()
 
@@ -246,12 +322,15 @@ class Screen:
         """
         Undo's a move in Onitama and update's the styles as well as resets clicks on the tiles and style cards.
         """
+        self.search.cancel()
         if not self.game_running:
             self.game_running = True
             self.set_op(0)
         self.onitama.undo()
         if self.game_mode == 1:
-            self.onitama.undo()
+            # Undo can come while the AI player is thinking, so take back moves until it is the human player's turn.
+            while self.is_ai_turn() and not self.onitama.onitama_stack.empty():
+                self.onitama.undo()
         self.update_styles()
         self.reset_clicks()
 
@@ -259,6 +338,7 @@ class Screen:
         """
         Set's the other player's Player Type depending on the game mode.
         """
+        self.search.cancel()
         self.game_mode = game_mode
         curr_turn = self.onitama.whose_turn.player_id
         if game_mode == 0 or game_mode == 2:
@@ -275,11 +355,13 @@ class Screen:
                 self.onitama.whose_turn = self.onitama.player2
             return
 
-        # Set the other player to PlayerRandom
+        # Set the other player to PlayerMinimax
         op = self.onitama.other_player(self.onitama.whose_turn)
         if not op:
             return
-        player = PlayerRandom(op.player_id)
+        player = PlayerMinimax(op.player_id, time_limit=self.AI_TIME_LIMIT,
+                               book=OpeningBook.load_if_exists(self.BOOK_PATH),
+                               tablebase=EndgameTablebase.open_if_exists(self.TABLEBASE_PATH))
         player.set_onitama(self.onitama)
         if self.onitama.whose_turn == self.onitama.player1:
             self.onitama.player2 = player
@@ -304,6 +386,16 @@ class Screen:
         elif btn.text == 'RvR':
             self.set_op(2)
 
+    def is_dest_tile(self, tile: Tile) -> bool:
+        """
+        Returns whether <tile> is a legal destination for the selected origin tile and style.
+        """
+        if not self.tile_origin or not self.chosen_style:
+            return False
+        dests = self.legal_map.destinations(self.onitama, self.tile_origin.row, self.tile_origin.col,
+                                            self.chosen_style.style_name)
+        return self.onitama.size * tile.row + tile.col in dests
+
     def update_dest_tiles(self) -> None:
         """
         Highlights the tiles which are valid destination spots for the currently selectiled piece if possible.
@@ -311,104 +403,82 @@ class Screen:
         if not self.tile_origin:
             return
         # Highlight the pieces which are valid destinations
-        valid_turns = self.onitama.whose_turn.get_valid_turns()
-        turns = []
-
         # Check if a style has been chosen and only display those turns.
-        if self.chosen_style and self.chosen_style.style_name in valid_turns:
-            turns = valid_turns[self.chosen_style.style_name]
-        else:
-            for style_name in valid_turns:
-                turns.extend(valid_turns[style_name])
-        # Get all indices of tiles which are valid destinations for the chosen piece.
-        highlighted = set()
-        for turn in turns:
-            if (turn.row_o, turn.col_o) == (self.tile_origin.row, self.tile_origin.col):
-                highlighted.add(self.onitama.size *
-                                turn.row_d + turn.col_d)
-        # For each index, add the tile itself to the destination tiles.
+        style_name = self.chosen_style.style_name if self.chosen_style else None
+        # For each valid destination of the chosen piece, add the tile itself to the destination tiles.
         self.dest_tiles = []
-        for i in highlighted:
+        for i in self.legal_map.destinations(self.onitama, self.tile_origin.row, self.tile_origin.col, style_name):
             self.tiles[i].set_highlight(True)
             self.dest_tiles.append(self.tiles[i])
 
-    def draw(self):
+    def draw(self) -> List[pygame.Rect]:
         """
-        Draw all of the entities onto the screen.
+        Draw the entities whose appearance has changed onto the screen.
+        Returns the areas of the screen that were drawn.
         """
-        # Draw tiles
-        for tile in self.tiles:
-            tile.draw()
-        # Draw the style images.
-        for sty_img in self.player_styles:
-            sty_img.draw()
-
-        # Draw all buttons
-        for btn in self.buttons:
-            btn.draw()
-
         # Update the current game_mode button to highlight it.
-        self.buttons[self.game_mode].set_highlight(True)
+        for i, btn in enumerate(self.buttons):
+            btn.set_highlight(i == self.game_mode)
+        dirty = []
+        # Draw tiles, the style images and all buttons
+        for entity in self.tiles + self.player_styles + self.buttons:
+            rect = entity.redraw()
+            if rect:
+                dirty.append(rect)
+        return dirty
 
     def hover(self):
         """
         Check if any of the entities are being hovered.
         """
         mouse_pos = pygame.mouse.get_pos()
-
-        for tile in self.tiles:
-            # Check if hovered
-            if tile.hover(mouse_pos):
-                return
-        for sty_img in self.player_styles:
-            if sty_img.hover(mouse_pos):
-                return
-        for btn in self.buttons:
-            if btn.hover(mouse_pos):
-                break
+        hovered = self.hit_grid.find(mouse_pos)
+        if hovered is not self.hovered:
+            # Only the previously and currently hovered entities change.
+            if self.hovered:
+                self.hovered.hover(mouse_pos)
+            if hovered:
+                hovered.hover(mouse_pos)
+            self.hovered = hovered
 
     def click(self):
         """
         Check if any of the entities have been clicked.
+        Only the clicked entity and the tiles selected by previous clicks are updated.
         """
         mouse_pos = pygame.mouse.get_pos()
+        hit = self.hit_grid.find(mouse_pos)
         clicked = None
 
         # Check if any of the buttons have been clicked and handle them appropriately.
-        for btn in self.buttons:
-            # Reset all button highlights statuses
-            btn.set_highlight(False)
-            if btn.click(mouse_pos):
-                clicked = btn
-
-        if clicked:
-            self.btn_click(clicked)
+        if isinstance(hit, Button):
+            self.btn_click(hit)
             return
-        # If the game is not running, we do not want any clicks on the game.
-        if not self.game_running:
+        # If the game is not running or an AI player is thinking, we do not want any clicks on the game.
+        if not self.game_running or self.is_ai_turn():
             return
 
-        # Check if any of the tiles have been clicked
-        for tile in self.tiles:
-            # Reset highlight
+        # Reset the highlight of the destination tiles
+        for tile in self.dest_tiles:
             tile.set_highlight(False)
-            # Check if clicked
-            if tile.click(mouse_pos):
-                clicked = tile
 
         # If a tile has been clicked, update the origin tile and destination tiles.
-        if clicked:
-            # Check if this tile is in the highlighted tiles
-            if self.tile_origin and self.chosen_style and self.dest_tiles and clicked in self.dest_tiles:
-                self.tile_dest = clicked
-                self.move()
-            else:
-                self.tile_origin = clicked
-        else:
-            for sty_img in self.player_styles:
-                if sty_img.click(mouse_pos) and sty_img.player_id == self.onitama.whose_turn.player_id:
-                    clicked = sty_img
-            if clicked:
+        if isinstance(hit, Tile):
+            if self.tile_origin and self.tile_origin is not hit:
+                self.tile_origin.clicked = False
+            if hit.click(mouse_pos):
+                clicked = hit
+                # Check if this tile is in the highlighted tiles
+                if self.is_dest_tile(clicked):
+                    self.tile_dest = clicked
+                    self.move()
+                else:
+                    self.tile_origin = clicked
+        elif isinstance(hit, StyleCard):
+            if self.chosen_style and self.chosen_style is not hit:
+                self.chosen_style.clicked = False
+            if hit.click(mouse_pos) and hit.player_id == self.onitama.whose_turn.player_id:
+                clicked = hit
                 self.chosen_style = clicked if self.chosen_style != clicked else None
 
         # Set the clicked attribute to true for the origin tile for green highlighting.
@@ -426,10 +496,15 @@ class Screen:
         This is the main loop of the code.
         """
         # Main loop
-
+        clock = pygame.time.Clock()
         while self.running:
+            events = pygame.event.get()
+            # If there is no input and no AI to move, sleep until there is input.
+            if not events and not self.is_ai_turn():
+                event = pygame.event.wait(self.IDLE_WAIT)
+                events = [event] if event.type != NOEVENT else []
             # for loop through the event queue
-            for event in pygame.event.get():
+            for event in events:
                 # Check for KEYDOWN event
                 if event.type == KEYDOWN:
                     # If the Esc key is pressed, then exit the main loop
@@ -445,12 +520,15 @@ class Screen:
             # If the game is moving, check if we need to move the AI.
             if self.game_running:
                 self.move_ai()
-            # Update the display
-            self.draw()
+                self.ponder()
             self.hover()
-
-            # Update the display
-            pygame.display.flip()
+            # Update only the areas of the display that changed
+            dirty = self.draw()
+            if dirty:
+                pygame.display.update(dirty)
+            # Limit the frame rate
+            clock.tick(self.FPS)
+        self.search.cancel()
 
 
 if __name__ == '__main__':
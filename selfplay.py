@@ -0,0 +1,217 @@
+"""
+Headless self-play runner. Plays a number of games between two Player classes
+without the pygame GUI and reports win rates, game lengths and games per second.
+
+Example:
+    python selfplay.py --games 100 --size 7 --player1 PlayerMinimax --player2 PlayerRandom --time-limit 0.05
+"""
+import argparse
+import io
+import json
+import random
+from time import perf_counter
+from typing import Dict, List, Tuple, Union
+from OnitamaGame import OnitamaGame
+from EndgameTablebase import EndgameTablebase
+from GameRecordWriter import GameRecordWriter
+from OpeningBook import OpeningBook
+from ParallelSearch import ParallelSearch
+from Pieces import Pieces
+from Player import Player, PlayerRandom
+from PlayerMinimax import PlayerMinimax
+from PlayerMCTS import PlayerMCTS
+
+PLAYERS: Dict[str, type] = {
+    'PlayerRandom': PlayerRandom,
+    'PlayerMinimax': PlayerMinimax,
+    'PlayerMCTS': PlayerMCTS,
+}
+# The opening books loaded in this process, by path, shared by every game it plays
+_books: Dict[str, OpeningBook] = {}
+# The endgame tablebases opened in this process, by path, shared by every game it plays
+_tablebases: Dict[str, EndgameTablebase] = {}
+
+
+def load_book(path: Union[str, None]) -> Union[OpeningBook, None]:
+    """
+    Returns the opening book stored at <path>, or None if <path> is None. Each book is
+    loaded once per process and reused by every later game.
+    >>> load_book(None) is None
+    True
+    """
+    if path is None:
+        return None
+    if path not in _books:
+        _books[path] = OpeningBook.load(path)
+    return _books[path]
+
+
+def open_tablebase(path: Union[str, None]) -> Union[EndgameTablebase, None]:
+    """
+    Returns the endgame tablebase stored at <path>, or None if <path> is None. Each
+    tablebase is opened once per process and reused by every later game.
+    >>> open_tablebase(None) is None
+    True
+    """
+    if path is None:
+        return None
+    if path not in _tablebases:
+        _tablebases[path] = EndgameTablebase.open(path)
+    return _tablebases[path]
+
+
+def make_player(name: str, player_id: str, settings: Dict[str, Union[float, int, None]],
+                book: Union[OpeningBook, None] = None,
+                tablebase: Union[EndgameTablebase, None] = None) -> Player:
+    """
+    Returns a new Player of the class called <name> for <player_id>. Search players
+    get the time limit and iteration budget in <settings>, and consult <book> and
+    <tablebase> if they are given.
+    """
+    if name == 'PlayerMinimax':
+        return PlayerMinimax(player_id, time_limit=settings['time_limit'], book=book, tablebase=tablebase)
+    if name == 'PlayerMCTS':
+        return PlayerMCTS(player_id, iterations=settings['iterations'], time_limit=settings['time_limit'],
+                          seed=settings['seed'], book=book, tablebase=tablebase)
+    return PLAYERS[name](player_id)
+
+
+def play_game(task: Tuple) -> Tuple[Union[str, None], int, Union[bytes, None]]:
+    """
+    Plays one game and returns the ID of the winner, or None for a draw, the number
+    of plies played, and the game's GameRecord in its binary format if the settings
+    ask for it to be recorded. A task is the board size, the two player class names,
+    the player settings, the ply limit and the random seed of the game.
+    >>> winner, plies, record = play_game((5, 'PlayerRandom', 'PlayerRandom',\
+     {'time_limit': None, 'iterations': None, 'seed': 0}, 300, 0))
+    >>> winner in (Pieces.G1, Pieces.G2, None) and 0 < plies <= 300, record
+    (True, None)
+    """
+    size, name1, name2, settings, max_plies, seed = task
+    random.seed(seed)
+    settings = dict(settings, seed=seed)
+    book = load_book(settings.get('book'))
+    tablebase = open_tablebase(settings.get('tablebase'))
+    onitama = OnitamaGame(size, make_player(name1, Pieces.G1, settings, book, tablebase),
+                          make_player(name2, Pieces.G2, settings, book, tablebase))
+    writer = None
+    if settings.get('record'):
+        writer = GameRecordWriter(io.BytesIO())
+        writer.attach(onitama)
+    plies = 0
+    while onitama.get_winner() is None and plies < max_plies:
+        turn = onitama.whose_turn.get_turn()
+        if turn is None:
+            break
+        onitama.move(turn.row_o, turn.col_o, turn.row_d, turn.col_d, turn.style_name)
+        plies += 1
+    winner = onitama.get_winner()
+    record = None
+    if writer is not None:
+        writer.finish()
+        record = writer.stream.getvalue()
+    return (None if winner is None else winner.player_id), plies, record
+
+
+def summarize(results: List[Tuple], seconds: float) -> Dict[str, float]:
+    """
+    Returns the win rates, game lengths and games per second of <results>, which
+    start with the winner and the number of plies of each game.
+    >>> summary = summarize([('X', 10), ('Y', 20), (None, 30), ('X', 40)], 2.0)
+    >>> summary['player1_win_rate'], summary['draw_rate'], summary['mean_plies'], summary['games_per_second']
+    (0.5, 0.25, 25.0, 2.0)
+    """
+    games = len(results)
+    winners = [result[0] for result in results]
+    lengths = [result[1] for result in results]
+    return {
+        'games': games,
+        'player1_win_rate': winners.count(Pieces.G1) / games,
+        'player2_win_rate': winners.count(Pieces.G2) / games,
+        'draw_rate': winners.count(None) / games,
+        'mean_plies': sum(lengths) / games,
+        'min_plies': min(lengths),
+        'max_plies': max(lengths),
+        'seconds': seconds,
+        'games_per_second': games / seconds if seconds > 0 else float('inf'),
+    }
+
+
+def run_games(args: argparse.Namespace) -> Dict[str, float]:
+    """
+    Plays the games asked for by the command line <args> on their players, and
+    returns the summary.
+    """
+    settings = {'time_limit': args.time_limit, 'iterations': args.iterations, 'book': args.book,
+                'tablebase': args.tablebase, 'record': args.record is not None}
+    tasks = [(args.size, args.player1, args.player2, settings, args.max_plies, args.seed + i)
+             for i in range(args.games)]
+    pool = ParallelSearch(args.workers)
+    start = perf_counter()
+    results = pool.map(play_game, tasks)
+    summary = summarize(results, perf_counter() - start)
+    pool.shutdown()
+    if args.record:
+        with open(args.record, 'ab') as f:
+            for _, _, record in results:
+                f.write(record)
+    return summary
+
+
+def report(args: argparse.Namespace, summary: Dict[str, float]) -> None:
+    """
+    Prints the <summary> of the games asked for by the command line <args>.
+    """
+    if args.json:
+        print(json.dumps(summary))
+    else:
+        print(f'{args.player1} (X) vs {args.player2} (Y) on {args.size}x{args.size}, {summary["games"]} games')
+        print(f'  X wins: {summary["player1_win_rate"]:.1%}  Y wins: {summary["player2_win_rate"]:.1%}  '
+              f'draws: {summary["draw_rate"]:.1%}')
+        print(f'  plies: mean {summary["mean_plies"]:.1f}, min {summary["min_plies"]}, max {summary["max_plies"]}')
+        print(f'  {summary["games_per_second"]:.2f} games/s ({summary["seconds"]:.2f} s)')
+
+
+def main(argv: Union[List[str], None] = None) -> Dict[str, float]:
+    """
+    Parses the command line in <argv>, plays the games and prints the summary.
+    """
+    parser = argparse.ArgumentParser(description='Play Onitama games between two players without the GUI.')
+    parser.add_argument('--games', type=int, default=100, help='number of games to play')
+    parser.add_argument('--size', type=int, default=5, help='board size, odd and at least 5')
+    parser.add_argument('--player1', choices=sorted(PLAYERS), default='PlayerRandom')
+    parser.add_argument('--player2', choices=sorted(PLAYERS), default='PlayerRandom')
+    parser.add_argument('--time-limit', type=float, default=0.1, help='seconds per move for search players')
+    parser.add_argument('--iterations', type=int, default=None, help='playouts per move for PlayerMCTS')
+    parser.add_argument('--max-plies', type=int, default=300, help='plies after which a game is a draw')
+    parser.add_argument('--workers', type=int, default=1, help='number of processes to play games in')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the first game')
+    parser.add_argument('--book', help='opening book file for search players to consult')
+    parser.add_argument('--tablebase', help='endgame tablebase file for search players to consult')
+    parser.add_argument('--record', help='file to append a GameRecord of every game to')
+    parser.add_argument('--batch', action='store_true',
+                        help='play PlayerRandom games in lockstep with the NumPy BatchSimulator')
+    parser.add_argument('--json', action='store_true', help='print the summary as JSON')
+    args = parser.parse_args(argv)
+    if args.size % 2 == 0 or args.size < 5:
+        parser.error('--size must be odd and at least 5')
+    if args.games < 1:
+        parser.error('--games must be at least 1')
+    if args.batch and (args.player1 != 'PlayerRandom' or args.player2 != 'PlayerRandom' or args.record):
+        parser.error('--batch only plays PlayerRandom against PlayerRandom, without --record')
+
+    if args.batch:
+        from BatchSimulator import BatchSimulator
+        start = perf_counter()
+        winners, plies = BatchSimulator(args.size, args.games, args.max_plies, args.seed).run()
+        results = [((None, Pieces.G1, Pieces.G2)[winner], ply)
+                   for winner, ply in zip(winners.tolist(), plies.tolist())]
+        summary = summarize(results, perf_counter() - start)
+    else:
+        summary = run_games(args)
+    report(args, summary)
+    return summary
+
+
+if __name__ == '__main__':
+    main()